@@ -14,3 +14,14 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.DEBUG:
+    # Serve the admin's static files, as runserver did in development.
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler  # noqa: E402
+    application = ASGIStaticFilesHandler(application)
+
+if settings.WARM_UP_ON_STARTUP:
+    from core.startup import warm_up  # noqa: E402
+    warm_up()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,11 +45,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.routers.ShardRoutingMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
+    'core.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -87,6 +93,107 @@ DATABASES = {
     }
 }
 
+# Read replicas as a comma-separated list of host[:port]; they share the
+# primary's name and credentials. GET requests read from them (see
+# core.routers). Point one at DB_HOST to try the routing with one server.
+REPLICA_DATABASES = []
+for index, replica in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = replica.strip().partition(':')
+    REPLICA_DATABASES.append(f'replica{index}')
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# User shards as a comma-separated list of host[:port][/name], aliased
+# shard1, shard2, ...; `default` is shard 0 and also holds the UserShard
+# directory (see core.sharding). Name defaults to DB_NAME.
+SHARD_DATABASES = ['default']
+for index, shard in enumerate(filter(None, os.environ.get('DB_SHARD_HOSTS', '').split(',')), start=1):
+    address, _, name = shard.strip().partition('/')
+    host, _, port = address.partition(':')
+    name = name or DATABASES['default']['NAME']
+    SHARD_DATABASES.append(f'shard{index}')
+    DATABASES[f'shard{index}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'NAME': f'test_{name}_shard{index}'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.ShardRouter', 'core.routers.ReplicaRouter']
+
+AUTHENTICATION_BACKENDS = ['core.sharding.ShardedModelBackend']
+
+# Seconds a user's reads stay on the primary after they write
+REPLICA_PIN_SECONDS = float(os.environ.get('REPLICA_PIN_SECONDS', '5'))
+
+# Cache shared by every worker, for the read-your-writes pins above and the
+# throttle buckets (core.throttling). Without REDIS_URL each process caches
+# in its own memory, which only holds up with a single process.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# PostgreSQL partitioning of applications, interviews and their tags:
+# `hash` (by user) or `range` (by date); empty leaves the tables as they are.
+# Applied by migration core.0007 or `manage.py partition_tables`.
+DB_PARTITIONING = os.environ.get('DB_PARTITIONING', '')
+DB_PARTITION_COUNT = int(os.environ.get('DB_PARTITION_COUNT', '16'))
+
+# Rejected/accepted applications untouched for this many days are moved to
+# the archive tables by `manage.py archive_applications`.
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '180'))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '500'))
+
+# DELETE on companies, countries and tags hides the object and queues the
+# cascade for `manage.py process_deletions` (per request: ?async=true/false).
+ASYNC_DELETES = os.environ.get('ASYNC_DELETES', 'false').lower() == 'true'
+DELETION_BATCH_SIZE = int(os.environ.get('DELETION_BATCH_SIZE', '1000'))
+DELETION_LEASE_SECONDS = int(os.environ.get('DELETION_LEASE_SECONDS', '60'))
+# Readiness fails once a queued job has waited this long for a worker (0: never).
+DELETION_MAX_LAG_SECONDS = int(os.environ.get('DELETION_MAX_LAG_SECONDS', '600'))
+
+# Delta sync (/api/sync/): cursors are moved back by the overlap so rows
+# committed late are sent twice rather than missed; tombstones of deleted
+# rows are kept this long, older cursors get a full reset.
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', '5'))
+SYNC_TOMBSTONE_DAYS = int(os.environ.get('SYNC_TOMBSTONE_DAYS', '90'))
+
+# Live change events (/api/events/): the NOTIFY channel, the heartbeat that
+# keeps idle streams open through proxies, how many undelivered events a
+# stream may queue before it is told to reset, and how long a `?ticket=`
+# from /api/events/ticket/ may be used to open a stream.
+EVENTS_CHANNEL = os.environ.get('EVENTS_CHANNEL', 'jat_events')
+EVENTS_HEARTBEAT_SECONDS = int(os.environ.get('EVENTS_HEARTBEAT_SECONDS', '15'))
+EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', '100'))
+EVENTS_TICKET_SECONDS = int(os.environ.get('EVENTS_TICKET_SECONDS', '60'))
+
+# POSTs with an Idempotency-Key replay their stored response this long
+# (core.idempotency); `manage.py prune_idempotency_keys` removes older keys.
+IDEMPOTENCY_KEY_HOURS = int(os.environ.get('IDEMPOTENCY_KEY_HOURS', '24'))
+
+# Most operations one POST /api/batch/ may carry (main.batch).
+BATCH_MAX_OPERATIONS = int(os.environ.get('BATCH_MAX_OPERATIONS', '50'))
+
+# Token-bucket throttles (core.throttling): per view `throttle_scope`, the
+# rate per client IP and per user, as N/second|minute|hour|day (bursts of N).
+# Views without a scope are throttled as `write` on unsafe methods only.
+THROTTLE_CACHE = os.environ.get('THROTTLE_CACHE', 'default')
+THROTTLE_RATES = {
+    'login': {'ip': os.environ.get('THROTTLE_LOGIN_IP', '10/min')},
+    'register': {'ip': os.environ.get('THROTTLE_REGISTER_IP', '20/hour')},
+    'write': {'user': os.environ.get('THROTTLE_WRITE_USER', '300/min')},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -136,8 +243,26 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication'
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': ['core.throttling.TokenBucketThrottle'],
+    # Reverse proxies in front of the app; X-Forwarded-For is ignored at 0,
+    # so clients cannot pick their own address for the IP throttles.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', '0')),
 }
 
+# Offered through content negotiation (Accept / Content-Type: application/msgpack).
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].insert(1, 'core.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].insert(1, 'core.renderers.MessagePackParser')
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'JobAppTrack',
     'DESCRIPTION': 'Track job applications with submitted resume version.',
@@ -146,6 +271,61 @@ SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
 
+# Schema generated at build time (see Dockerfile); /api/schema/ generates it
+# once per process when the file is absent. Served with this max-age.
+SCHEMA_FILE = os.environ.get('SCHEMA_FILE', os.path.join(BASE_DIR, 'openapi-schema.json'))
+SCHEMA_CACHE_MAX_AGE = int(os.environ.get('SCHEMA_CACHE_MAX_AGE', '86400'))
+
+# Build URL resolvers, serializer fields and password validators when a
+# worker boots instead of on its first requests (see core.startup.warm_up)
+WARM_UP_ON_STARTUP = os.environ.get('WARM_UP_ON_STARTUP', 'true').lower() == 'true'
+
+# Seconds a fresh process may take to import app.wsgi, warm-up included
+# (checked by core.tests.test_boot_time; see `manage.py importtime`)
+WSGI_BOOT_BUDGET_SECONDS = float(os.environ.get('WSGI_BOOT_BUDGET_SECONDS', '2.0'))
+
+# Seconds a readiness probe result is reused before the probes run again
+READINESS_CACHE_SECONDS = float(os.environ.get('READINESS_CACHE_SECONDS', '5'))
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, MEDIA_URL)
 
+
+# Per-request timing exposed via the Server-Timing header and `core.timing` logs
+
+REQUEST_TIMING = {
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_TIMING_SAMPLE_RATE', '1.0')),
+    'SLOW_REQUEST_MS': float(os.environ.get('REQUEST_TIMING_SLOW_REQUEST_MS', '500')),
+    'SLOW_QUERY_MS': float(os.environ.get('REQUEST_TIMING_SLOW_QUERY_MS', '100')),
+}
+
+# Prometheus metrics; set METRICS_DIR to a shared directory when running
+# several worker processes so /api/metrics/ aggregates all of them. Scrapers
+# send `Authorization: Bearer <METRICS_TOKEN>`; staff users may always read.
+
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', '5'))
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# On-demand profiling of single requests by staff users (X-Profile header)
+
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            # INFO logs every sampled request; WARNING only slow ones.
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
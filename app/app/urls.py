@@ -16,14 +16,18 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from core.check import health_check
+from core.check import health_check, liveness, readiness
+from core.metrics import metrics_view
+from core.lazy import lazy_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/schema/', lazy_view('core.schema_views.CachedSchemaView'), name='schema'),
+    path('api/docs/', lazy_view('core.schema_views.CachedSwaggerView', url_name='schema'), name='swagger-ui'),
     path('api/health/', health_check, name='health-check'),
+    path('api/health/live/', liveness, name='health-live'),
+    path('api/health/ready/', readiness, name='health-ready'),
+    path('api/metrics/', metrics_view, name='metrics'),
     path('api/auth/', include('auth.urls')),
     path('api/', include('main.urls'))
 ]
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.password_validation import validate_password
+from core.models import UserShard
 
 User = get_user_model()
 
@@ -34,6 +35,15 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['public_id', 'email', 'password','name', 'is_staff']
         read_only_fields = ['public_id', 'is_staff']
 
+    def validate_email(self, value):
+        # Users on other shards are only visible through the directory.
+        taken = UserShard.objects.filter(email=value)
+        if self.instance is not None:
+            taken = taken.exclude(user_id=self.instance.pk)
+        if taken.exists():
+            raise serializers.ValidationError('user with this email already exists.')
+        return value
+
     def create(self, validated_data):
         return User.objects.create_user(**validated_data)
 
@@ -5,10 +5,15 @@ from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.urls import reverse
+
+from core.deletion import schedule
+from main.serializers import DeletionJobSerializer
 
 
 class AuthTokenView(APIView):
     serializer_class = AuthTokenSerializer
+    throttle_scope = 'login'
 
     def post(self, request):
         serializer = AuthTokenSerializer(
@@ -38,9 +43,18 @@ class UserDetailView(APIView):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def delete(self, request):
+        # Deactivates the account and revokes its token at once; the user's
+        # rows are removed in the background by `process_deletions`.
+        job = schedule(request.user, request.user)
+        url = request.build_absolute_uri(reverse('deletion-detail', kwargs={'id': job.id}))
+        return Response(DeletionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED,
+                        headers={'Location': url})
+
 
 class UserRegisterView(APIView):
     serializer_class = UserSerializer
+    throttle_scope = 'register'
 
     def post(self, request):
         serializer = UserSerializer(data=request.data)
@@ -4,3 +4,32 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+        from django.core import checks
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+        from rest_framework.authtoken.models import Token
+        from core import check, deletion, metrics, schema, sharding, sync, tagging
+        from core.models import User
+        connection_created.connect(metrics.connection_opened)
+        post_save.connect(sharding.user_saved, sender=User)
+        post_delete.connect(sharding.user_deleted, sender=User)
+        post_save.connect(sharding.token_saved, sender=Token)
+        post_delete.connect(sharding.token_deleted, sender=Token)
+        post_migrate.connect(sharding.offset_sequences, sender=self)
+        for model in tagging.COUNTERS:
+            m2m_changed.connect(tagging.tags_changed, sender=model.tags.through)
+            pre_delete.connect(tagging.owner_deleted, sender=model)
+            m2m_changed.connect(sync.links_changed, sender=model.tags.through)
+        for model in sync.SYNCED:
+            post_delete.connect(sync.row_deleted, sender=model)
+        metrics.register_gauge('jat_deletion_jobs', 'Queued and running background deletions.',
+                               deletion.queue_depth)
+        check.register_probe('deletion_queue', deletion.check_queue)
+        checks.register(schema.check_schema_drift, 'schema', deploy=True)
+        if settings.REPLICA_DATABASES:
+            from core import routers
+            check.register_probe('replicas', routers.check_replicas)
+            checks.register(routers.check_pin_cache, 'caches')
@@ -0,0 +1,110 @@
+"""Hot/cold archival of closed applications.
+
+Rejected and accepted applications untouched for `ARCHIVE_AFTER_DAYS` move,
+together with their interviews and tag links, into `ArchivedApplication`
+and `ArchivedInterview`. Rows keep their ids, so `restore` puts them back
+as they were; only `updated_at` records the restore, for delta syncs.
+Work is done in batches of `ARCHIVE_BATCH_SIZE` applications, each in its
+own transaction on the database holding them.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from core.models import Application, ArchivedApplication, ArchivedInterview, Interview, Tag
+from core.sync import forget
+from core.tagging import reconcile
+
+CLOSED_STATUSES = ('rejected', 'accepted')
+
+
+def _copies(rows, model):
+    """Instances of `model` carrying every field it shares with `rows`."""
+    if not rows:
+        return []
+    names = {field.attname for field in rows[0]._meta.concrete_fields}
+    fields = [field.attname for field in model._meta.concrete_fields if field.attname in names]
+    return [model(**{name: getattr(row, name) for name in fields}) for row in rows]
+
+
+def _copy_links(using, field, target_field, ids):
+    """Copy the tag links of the `ids` rows from `field`'s table to `target_field`'s."""
+    source, target = field.remote_field.through, target_field.remote_field.through
+    owner, target_owner = f'{field.m2m_field_name()}_id', f'{target_field.m2m_field_name()}_id'
+    links = source.objects.using(using).filter(**{f'{owner}__in': ids}).values_list(owner, 'tag_id')
+    target.objects.using(using).bulk_create(
+        [target(**{target_owner: owner_id, 'tag_id': tag_id}) for owner_id, tag_id in links]
+    )
+
+
+def _batches(queryset, using, batch_size, move):
+    """Lock and move `queryset`'s rows `batch_size` at a time; returns (applications, interviews)."""
+    totals = [0, 0]
+    while True:
+        with transaction.atomic(using=using):
+            ids = list(
+                queryset.using(using).order_by('id')
+                .select_for_update(skip_locked=True, of=('self',))
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return tuple(totals)
+            interviews = move(using, ids)
+        totals[0] += len(ids)
+        totals[1] += interviews
+
+
+def _archive_batch(using, ids):
+    applications = list(Application.objects.using(using).filter(id__in=ids))
+    interviews = list(Interview.objects.using(using).filter(application_id__in=ids))
+    ArchivedApplication.objects.using(using).bulk_create(_copies(applications, ArchivedApplication))
+    ArchivedInterview.objects.using(using).bulk_create(_copies(interviews, ArchivedInterview))
+    _copy_links(using, Application._meta.get_field('tags'), ArchivedApplication._meta.get_field('tags'), ids)
+    _copy_links(using, Interview._meta.get_field('tags'), ArchivedInterview._meta.get_field('tags'),
+                [interview.id for interview in interviews])
+    # Cascades to the interviews and both tables of tag links.
+    Application.objects.using(using).filter(id__in=ids).delete()
+    return len(interviews)
+
+
+def _restore_batch(using, ids):
+    applications = list(ArchivedApplication.objects.using(using).filter(id__in=ids))
+    interviews = list(ArchivedInterview.objects.using(using).filter(application_id__in=ids))
+    restored = _copies(applications, Application)
+    Application.objects.using(using).bulk_create(restored)
+    # auto_now_add stamped the insert; put the original creation time back.
+    for application, archived in zip(restored, applications):
+        application.created_at = archived.created_at
+    Application.objects.using(using).bulk_update(restored, ['created_at'])
+    Interview.objects.using(using).bulk_create(_copies(interviews, Interview))
+    forget(Application, ids, using)
+    forget(Interview, [interview.id for interview in interviews], using)
+    _copy_links(using, ArchivedApplication._meta.get_field('tags'), Application._meta.get_field('tags'), ids)
+    _copy_links(using, ArchivedInterview._meta.get_field('tags'), Interview._meta.get_field('tags'),
+                [interview.id for interview in interviews])
+    # The links were bulk-inserted, bypassing the tag usage signals.
+    users = {application.user_id for application in applications}
+    reconcile(Tag.objects.filter(user_id__in=users), using=using)
+    ArchivedApplication.objects.using(using).filter(id__in=ids).delete()
+    return len(interviews)
+
+
+def archivable(older_than_days=None):
+    """Closed applications whose last change is older than the cutoff."""
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Application.objects.filter(status__in=CLOSED_STATUSES, updated_at__lt=cutoff)
+
+
+def archive(queryset=None, using=DEFAULT_DB_ALIAS, batch_size=None):
+    """Move `queryset` (default: `archivable()`) into the archive tables."""
+    queryset = archivable() if queryset is None else queryset
+    return _batches(queryset, using, batch_size or settings.ARCHIVE_BATCH_SIZE, _archive_batch)
+
+
+def restore(queryset=None, using=DEFAULT_DB_ALIAS, batch_size=None):
+    """Move archived applications (default: all of them) back into the live tables."""
+    queryset = ArchivedApplication.objects.all() if queryset is None else queryset
+    return _batches(queryset, using, batch_size or settings.ARCHIVE_BATCH_SIZE, _restore_batch)
@@ -1,13 +1,134 @@
-from rest_framework.decorators import api_view
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
-from rest_framework import serializers
+from rest_framework import serializers, status
 from drf_spectacular.utils import extend_schema
 
+from core import metrics
+
+
 class HealthCheckSerializer(serializers.Serializer):
     serializers.CharField(read_only=True)
 
 
+class ReadinessSerializer(serializers.Serializer):
+    status = serializers.CharField(read_only=True)
+    cached = serializers.BooleanField(read_only=True)
+    checks = serializers.DictField(read_only=True)
+
+
 @extend_schema(responses=HealthCheckSerializer)
 @api_view(["GET"])
 def health_check(request):
     return Response({"status": "ok"})
+
+
+@extend_schema(responses=HealthCheckSerializer)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([])
+def liveness(request):
+    """The process is up and serving requests; touches no database or disk."""
+    return Response({"status": "ok"})
+
+
+def check_database():
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    return {'latency_ms': round((time.perf_counter() - start) * 1000, 3)}
+
+
+def check_migrations():
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        raise RuntimeError(f'{len(plan)} unapplied migrations')
+    return {}
+
+
+def check_media_root():
+    os.makedirs(settings.MEDIA_ROOT, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=settings.MEDIA_ROOT, prefix='.readiness-'):
+        pass
+    return {}
+
+
+# name -> callable returning a dict of details, raising on failure.
+PROBES = {
+    'database': check_database,
+    'migrations': check_migrations,
+    'media_root': check_media_root,
+}
+
+
+def register_probe(name, probe):
+    PROBES[name] = probe
+
+
+class ProbeCache:
+    """Most recent readiness result, shared by every request in the process.
+
+    Only one thread re-runs the probes when the result expires; others keep
+    serving the previous result meanwhile, so a burst of health checks
+    results in a single round of probes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.result = None
+        self.expires = 0.0
+
+    def get(self):
+        ttl = getattr(settings, 'READINESS_CACHE_SECONDS', 5)
+        if self.result is not None and time.monotonic() < self.expires:
+            metrics.record_cache('readiness', hit=True)
+            return self.result, True
+        if not self.lock.acquire(blocking=self.result is None):
+            metrics.record_cache('readiness', hit=True)
+            return self.result, True
+        try:
+            metrics.record_cache('readiness', hit=False)
+            self.result = run_probes()
+            self.expires = time.monotonic() + ttl
+            return self.result, False
+        finally:
+            self.lock.release()
+
+    def clear(self):
+        self.result = None
+        self.expires = 0.0
+
+
+def run_probes():
+    checks = {}
+    healthy = True
+    for name, probe in PROBES.items():
+        try:
+            checks[name] = {'status': 'ok', **probe()}
+        except Exception as exc:
+            healthy = False
+            checks[name] = {'status': 'fail', 'error': str(exc)}
+    return {'status': 'ok' if healthy else 'fail', 'checks': checks}
+
+
+probe_cache = ProbeCache()
+
+
+@extend_schema(responses=ReadinessSerializer)
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([])
+def readiness(request):
+    """Whether this node can serve traffic; probe results are cached briefly."""
+    result, cached = probe_cache.get()
+    code = status.HTTP_200_OK if result['status'] == 'ok' else status.HTTP_503_SERVICE_UNAVAILABLE
+    return Response({**result, 'cached': cached}, status=code)
@@ -0,0 +1,168 @@
+"""Background cascading deletes.
+
+Deleting a company, country, tag or user in one request cascades through
+every application, interview and M2M row below it inside a single
+transaction. `schedule()` instead hides the object at once (its `deleting`
+flag, or `is_active` for users) and queues a `DeletionJob`;
+`manage.py process_deletions` then removes the dependents deepest-first in
+batches of `DELETION_BATCH_SIZE` rows, each batch in its own short
+transaction, and finally the object itself.
+
+Workers hold a job through a lease renewed after every batch, so a job
+whose worker died is picked up again once the lease runs out. Every step
+re-reads what is left, so resuming is safe.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import CASCADE, SET_NULL, Count, F, Min, Q
+from django.db.models.deletion import get_candidate_relations_to_delete
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.models import DeletionJob, Tag
+from core.sharding import shard_databases
+from core.tagging import reconcile
+
+ACTIVE_STATUSES = ('pending', 'running')
+
+
+def schedule(obj, requested_by):
+    """Hide `obj` and queue its deletion on the database it lives on."""
+    using = obj._state.db
+    with transaction.atomic(using=using):
+        if obj._meta.label_lower == settings.AUTH_USER_MODEL.lower():
+            obj.is_active = False
+            obj.save(using=using, update_fields=['is_active'])
+            Token.objects.using(using).filter(user=obj).delete()
+        else:
+            obj.deleting = True
+            # updated_at tells delta syncs the object is gone.
+            obj.save(using=using, update_fields=['deleting', 'updated_at'])
+        return DeletionJob.objects.using(using).create(
+            user_id=requested_by.pk, model=obj._meta.label_lower, object_id=obj.pk,
+        )
+
+
+def hides(model):
+    """Whether `model` has the `deleting` flag `schedule()` hides objects with."""
+    try:
+        model._meta.get_field('deleting')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def visible(queryset):
+    """`queryset` without the objects hidden for a background delete."""
+    return queryset.filter(deleting=False) if hides(queryset.model) else queryset
+
+
+def hidden(obj):
+    return hides(type(obj)) and obj.deleting
+
+
+def steps(model, queryset):
+    """(action, queryset, field) steps that delete `queryset` after its dependents.
+
+    Mirrors what `Collector` would do in one go: CASCADE relations are
+    followed recursively, SET_NULL ones cleared; anything else (PROTECT,
+    DO_NOTHING, ...) is left to the final delete of each batch.
+    """
+    result = []
+    for relation in get_candidate_relations_to_delete(model._meta):
+        field = relation.field
+        on_delete = field.remote_field.on_delete
+        children = field.model._base_manager.db_manager(queryset.db).filter(**{f'{field.name}__in': queryset})
+        if on_delete is CASCADE:
+            result += steps(field.model, children)
+        elif on_delete is SET_NULL:
+            result.append(('null', children, field.name))
+    result.append(('delete', queryset, None))
+    return result
+
+
+def _lease():
+    return timezone.now() + timedelta(seconds=settings.DELETION_LEASE_SECONDS)
+
+
+def claim(using):
+    """Take the oldest pending job, or a running one whose worker went away."""
+    with transaction.atomic(using=using):
+        queryset = DeletionJob.objects.using(using).select_for_update(skip_locked=True)
+        job = (
+            queryset.filter(status='pending').order_by('id').first()
+            or queryset.filter(status='running', lease_expires__lt=timezone.now()).order_by('id').first()
+        )
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = job.started_at or timezone.now()
+        job.lease_expires = _lease()
+        job.save(using=using, update_fields=['status', 'started_at', 'lease_expires'])
+        return job
+
+
+def run(job, batch_size=None):
+    """Carry out `job`; returns it with its final status."""
+    using = job._state.db
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    jobs = DeletionJob.objects.using(using).filter(pk=job.pk)
+    model = apps.get_model(job.model)
+    plan = steps(model, model._base_manager.db_manager(using).filter(pk=job.object_id))
+    try:
+        if job.total is None:
+            job.total = sum(queryset.count() for _, queryset, _ in plan)
+            jobs.update(total=job.total)
+        for action, queryset, field in plan:
+            while True:
+                with transaction.atomic(using=using):
+                    ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+                    if not ids:
+                        break
+                    batch = queryset.model._base_manager.using(using).filter(pk__in=ids)
+                    if action == 'null':
+                        batch.update(**{field: None})
+                    else:
+                        batch.delete()
+                    jobs.update(processed=F('processed') + len(ids), lease_expires=_lease())
+    except Exception as exc:
+        jobs.update(status='failed', error=f'{type(exc).__name__}: {exc}', finished_at=timezone.now())
+    else:
+        # Link rows deleted in bulk bypass the tag usage signals.
+        reconcile(Tag.objects.filter(user_id=job.user_id), using=using)
+        jobs.update(status='done', finished_at=timezone.now())
+    job.refresh_from_db(using=using)
+    return job
+
+
+def queue_depth():
+    """Unfinished jobs by status over every shard, for the metrics gauge."""
+    counts = dict.fromkeys(ACTIVE_STATUSES, 0)
+    for alias in shard_databases():
+        rows = (DeletionJob.objects.using(alias).filter(status__in=ACTIVE_STATUSES)
+                .values_list('status').annotate(n=Count('id')))
+        for status, n in rows:
+            counts[status] += n
+    return [({'status': status}, n) for status, n in counts.items()]
+
+
+def check_queue():
+    """Readiness probe: jobs waiting for a worker, and how long the oldest has waited."""
+    now = timezone.now()
+    waiting, oldest = 0, None
+    for alias in shard_databases():
+        row = DeletionJob.objects.using(alias).filter(
+            Q(status='pending') | Q(status='running', lease_expires__lt=now)
+        ).aggregate(n=Count('id'), oldest=Min('created_at'))
+        waiting += row['n']
+        if row['oldest'] is not None and (oldest is None or row['oldest'] < oldest):
+            oldest = row['oldest']
+    lag = (now - oldest).total_seconds() if oldest else 0.0
+    limit = settings.DELETION_MAX_LAG_SECONDS
+    if limit and lag > limit:
+        raise RuntimeError(f'oldest deletion job has waited {lag:.0f}s (limit {limit}s); is process_deletions running?')
+    return {'waiting': waiting, 'lag_seconds': round(lag, 3)}
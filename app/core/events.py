@@ -0,0 +1,181 @@
+"""Live change events, fanned out through PostgreSQL LISTEN/NOTIFY.
+
+API writes `publish` a small event (model, id, `changed` or `deleted`) with
+NOTIFY on `EVENTS_CHANNEL`, on the database holding the row. NOTIFY is
+transactional: listeners hear of a change once it commits, never of one
+rolled back, and identical events of one transaction arrive once. Events
+carry no row data; clients fetch the rows with /api/sync/.
+
+Each event loop has one `Hub`. While any stream is open it holds one raw
+listening connection per shard primary, read from the loop itself, and
+hands each event to the queues of its user's streams; an idle stream costs
+a queue and a heartbeat every `EVENTS_HEARTBEAT_SECONDS`. A stream whose
+queue overflows, or whose hub loses a connection, gets a `reset` event and
+ends: the client reconnects and syncs again.
+
+Streams need the ASGI application (app.asgi): under WSGI, Django would
+consume the endless response before sending any of it. Clients that
+cannot send the `Authorization` header (browsers' EventSource) exchange
+their token for a short-lived `ticket` to pass in the query string.
+"""
+import asyncio
+import json
+import logging
+import weakref
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.sharding import shard_databases
+
+logger = logging.getLogger(__name__)
+
+RESET = {'action': 'reset'}
+
+TICKET_SALT = 'core.events.ticket'
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def notify(using, payload):
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [settings.EVENTS_CHANNEL, payload])
+
+
+def publish(instance, action):
+    """Tell the streams of `instance`'s owner that it was `changed` or `deleted`."""
+    payload = json.dumps({
+        'user': instance.user_id, 'model': instance._meta.model_name, 'id': instance.pk, 'action': action,
+    }, separators=(',', ':'))
+    notify(instance._state.db or DEFAULT_DB_ALIAS, payload)
+
+
+def ticket(user_id, shard):
+    """A signed `?ticket=` for `user_id`'s stream, valid `EVENTS_TICKET_SECONDS`."""
+    return signing.dumps([user_id, shard], salt=TICKET_SALT)
+
+
+def redeem(value):
+    """`(user_id, shard)` of a ticket, or None if it is forged or expired."""
+    try:
+        user_id, shard = signing.loads(value, salt=TICKET_SALT, max_age=settings.EVENTS_TICKET_SECONDS)
+    except signing.BadSignature:
+        return None
+    return user_id, shard
+
+
+def _listen():
+    """{alias: raw autocommit connection LISTENing on `EVENTS_CHANNEL`} for each PostgreSQL shard."""
+    listeners = {}
+    try:
+        for alias in shard_databases():
+            wrapper = connections[alias]
+            if wrapper.vendor != 'postgresql':
+                continue
+            with wrapper.wrap_database_errors:
+                connection = wrapper.get_new_connection(wrapper.get_connection_params())
+                listeners[alias] = connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN {wrapper.ops.quote_name(settings.EVENTS_CHANNEL)}')
+    except Exception:
+        for connection in listeners.values():
+            connection.close()
+        raise
+    return listeners
+
+
+def _reset(queue):
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait(RESET)
+
+
+class Hub:
+    """The listening connections of one event loop and the streams fed from them."""
+
+    def __init__(self):
+        self.streams = defaultdict(set)
+        self.listeners = {}
+        self.lock = asyncio.Lock()
+
+    async def subscribe(self, user_id):
+        """A queue receiving `user_id`'s events; connects the listeners if needed."""
+        async with self.lock:
+            if not self.listeners:
+                self.listeners = await sync_to_async(_listen, thread_sensitive=False)()
+                loop = asyncio.get_running_loop()
+                for alias, connection in self.listeners.items():
+                    loop.add_reader(connection, self._read, alias)
+        queue = asyncio.Queue(settings.EVENTS_QUEUE_SIZE)
+        self.streams[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        self.streams[user_id].discard(queue)
+        if not self.streams[user_id]:
+            del self.streams[user_id]
+        if not self.streams:
+            self.close()
+
+    def close(self):
+        loop = asyncio.get_running_loop()
+        for connection in self.listeners.values():
+            loop.remove_reader(connection)
+            connection.close()
+        self.listeners = {}
+
+    def dispatch(self, payload):
+        event = json.loads(payload)
+        for queue in self.streams.get(event.pop('user'), ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                _reset(queue)
+
+    def _read(self, alias):
+        connection = self.listeners[alias]
+        try:
+            connection.poll()
+        except connections[alias].Database.Error:
+            logger.warning('Lost the event listener on %s', alias, exc_info=True)
+            self.close()
+            for queues in self.streams.values():
+                for queue in queues:
+                    _reset(queue)
+            return
+        while connection.notifies:
+            self.dispatch(connection.notifies.pop(0).payload)
+
+
+def hub():
+    """The `Hub` of the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _hubs:
+        _hubs[loop] = Hub()
+    return _hubs[loop]
+
+
+async def stream(hub, user_id, queue):
+    """Server-sent events text for what reaches `queue`, with heartbeat comments in between."""
+    try:
+        yield ': connected\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            event = dict(event)
+            action = event.pop('action')
+            yield f'event: {action}\ndata: {json.dumps(event, separators=(",", ":"))}\n\n'
+            if action == RESET['action']:
+                return
+    finally:
+        hub.unsubscribe(user_id, queue)
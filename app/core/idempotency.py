@@ -0,0 +1,111 @@
+"""`Idempotency-Key` support for POST views.
+
+`idempotent` runs a POST carrying the header in one transaction with an
+`IdempotencyKey` row (unique per user and key). A retry gets the stored
+status and body back, marked `Idempotent-Replayed: true`, without running
+the view again; the same key on a different request (method, path, query
+and body, uploaded files included) is refused with `422`.
+
+Concurrent duplicates are serialized by the unique index: the second
+INSERT waits for the first request's transaction and, once it commits,
+fails and replays its response. Requests that raise or answer `5xx` keep
+no row, so they can be retried. Keys expire after `IDEMPOTENCY_KEY_HOURS`;
+`prune_idempotency_keys` deletes expired rows.
+"""
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, router, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.models import IdempotencyKey
+
+HEADER = 'Idempotency-Key'
+
+
+def _cutoff():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_HOURS)
+
+
+def fingerprint(request):
+    """sha256 of what makes a request the same request."""
+    digest = hashlib.sha256(f'{request.method} {request.path}?{request.META.get("QUERY_STRING", "")}\n'.encode())
+    data = request.data
+    if hasattr(data, 'lists'):
+        # Form and multipart bodies; rest_framework merges the files in.
+        for name, values in sorted(data.lists(), key=lambda item: item[0]):
+            digest.update(f'{name}\n'.encode())
+            for value in values:
+                if hasattr(value, 'chunks'):
+                    for chunk in value.chunks():
+                        digest.update(chunk)
+                    value.seek(0)
+                else:
+                    digest.update(f'{value}\n'.encode())
+    else:
+        digest.update(json.dumps(data, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def claim(user_id, key, request_hash, using):
+    """`(row, created)`: a new row for `key`, or the committed one of an earlier request."""
+    IdempotencyKey.objects.using(using).filter(user_id=user_id, key=key, created_at__lt=_cutoff()).delete()
+    try:
+        with transaction.atomic(using=using):
+            row = IdempotencyKey.objects.using(using).create(user_id=user_id, key=key, fingerprint=request_hash)
+            return row, True
+    except IntegrityError:
+        # Our INSERT waited for the request holding the key, which has committed.
+        return IdempotencyKey.objects.using(using).get(user_id=user_id, key=key), False
+
+
+def replay(row):
+    response = HttpResponse(bytes(row.body), status=row.status, content_type=row.content_type or None)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def prune(using=DEFAULT_DB_ALIAS):
+    """Delete keys past `IDEMPOTENCY_KEY_HOURS`; returns how many."""
+    return IdempotencyKey.objects.using(using).filter(created_at__lt=_cutoff()).delete()[0]
+
+
+def idempotent(post):
+    """Decorate an APIView `post` to honour `Idempotency-Key`."""
+
+    @wraps(post)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key is None:
+            return post(view, request, *args, **kwargs)
+        if not key or len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response({HEADER: ['Must be 1 to 255 characters.']}, status=status.HTTP_400_BAD_REQUEST)
+        request_hash = fingerprint(request)
+        using = router.db_for_write(IdempotencyKey)
+        with transaction.atomic(using=using):
+            row, created = claim(request.user.pk, key, request_hash, using)
+            if not created:
+                if row.fingerprint != request_hash:
+                    return Response({HEADER: ['Already used for a different request.']},
+                                    status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+                return replay(row)
+            response = post(view, request, *args, **kwargs)
+            if response.status_code >= 500:
+                row.delete()
+                return response
+            # Render now, as dispatch would, to store the bytes the client gets.
+            response = view.finalize_response(request, response, *args, **kwargs)
+            response.render()
+            row.status = response.status_code
+            row.content_type = response.get('Content-Type', '')
+            row.body = response.content
+            row.save(using=using, update_fields=['status', 'content_type', 'body'])
+        return response
+
+    return wrapper
@@ -0,0 +1,67 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+
+LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+# Imported only when the OpenAPI schema or docs are requested. (The
+# AutoSchema half of drf-spectacular is loaded by @extend_schema itself.)
+LAZY_MODULES = [
+    'drf_spectacular.views',
+    'drf_spectacular.generators',
+]
+
+BOOT_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+json.dump({{"seconds": elapsed, "modules": sorted(sys.modules)}}, sys.stdout)
+'''
+
+
+def run_python(code, *flags, env=None):
+    """Run `code` in a fresh interpreter with the project on its path."""
+    env = {**os.environ, **(env or {})}
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    return subprocess.run(
+        [sys.executable, *flags, '-c', code],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def parse(output):
+    """Rows of (module, self_us, cumulative_us, depth) from `-X importtime` output."""
+    rows = []
+    for line in output.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def aggregate(rows):
+    """Self time and module count per top-level package, most expensive first."""
+    packages = defaultdict(lambda: {'self_us': 0, 'modules': 0})
+    for module, self_us, _, _ in rows:
+        package = packages[module.split('.')[0]]
+        package['self_us'] += self_us
+        package['modules'] += 1
+    return sorted(packages.items(), key=lambda item: item[1]['self_us'], reverse=True)
+
+
+def profile_imports(module, env=None):
+    result = run_python(f'import {module}', '-X', 'importtime', env=env)
+    return parse(result.stderr)
+
+
+def measure_boot(module='app.wsgi', env=None):
+    """Wall time of importing `module` in a fresh process and the modules it loaded."""
+    result = run_python(BOOT_SCRIPT.format(module=module), env=env)
+    return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,21 @@
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """A URL callback that imports a class-based view on its first request.
+
+    Keeps rarely used, import-heavy views (the OpenAPI schema and docs) off
+    the worker boot path. `initkwargs` are passed to `as_view()`.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    # DRF views are CSRF exempt; Django checks this before the view is loaded.
+    wrapper.csrf_exempt = True
+    wrapper.lazy_view_path = dotted_path
+    return wrapper
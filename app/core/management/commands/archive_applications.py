@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from core.archive import archivable, archive, restore
+from core.models import ArchivedApplication
+from core.sharding import shard_databases
+
+
+class Command(BaseCommand):
+    help = 'Move closed applications (and their interviews) to the archive tables, or restore them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('ids', nargs='*', type=int,
+                            help='Only these application ids (default: every matching one).')
+        parser.add_argument('--restore', action='store_true',
+                            help='Move archived applications back instead.')
+        parser.add_argument('--older-than-days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+                            help='Archive applications closed and unchanged for this long.')
+        parser.add_argument('--user', help='Only applications of the user with this email.')
+        parser.add_argument('--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--database', action='append',
+                            help='Database alias to process; repeatable (default: every shard).')
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            queryset, move, verb = ArchivedApplication.objects.all(), restore, 'Restored'
+        else:
+            queryset, move, verb = archivable(options['older_than_days']), archive, 'Archived'
+        if options['ids']:
+            queryset = queryset.filter(id__in=options['ids'])
+        if options['user']:
+            queryset = queryset.filter(user__email=options['user'])
+
+        totals = [0, 0]
+        for alias in options['database'] or shard_databases():
+            applications, interviews = move(queryset, using=alias, batch_size=options['batch_size'])
+            self.stdout.write(f'  {alias}: {applications} applications, {interviews} interviews')
+            totals[0] += applications
+            totals[1] += interviews
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {totals[0]} applications and {totals[1]} interviews.'
+        ))
@@ -0,0 +1,476 @@
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from uuid import uuid4
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.models import (
+    User, Country, Tag, Company, Resume, Application, Interview, DeletionJob,
+    APPLICATION_STATUS_CHOICES,
+)
+from core.archive import archive
+from core.deletion import schedule
+from core.sync import format_cursor
+from core.tagging import reconcile
+
+BENCH_DOMAIN = 'bench.local'
+BENCH_PASSWORD = 'bench-pass-123'
+PDF_BYTES = b'%PDF-1.4\n%bench\n'
+
+
+class Fixture:
+    """Ids of the object graph seeded for one benchmark user."""
+
+    def __init__(self, user, token):
+        self.user = user
+        self.token = token
+        self.countries = []
+        self.tags = []
+        self.companies = []
+        self.resumes = []
+        self.applications = []
+        self.interviews = []
+
+
+def seed_user(run_id, index, graph, password_hash):
+    user = User.objects.create(
+        email=f'bench-{run_id}-{index}@{BENCH_DOMAIN}',
+        name=f'Bench User {index}',
+        password=password_hash,
+    )
+    token = Token.objects.create(user=user)
+    fixture = Fixture(user, token.key)
+
+    countries = Country.objects.bulk_create(
+        Country(user=user, name=f'Country {i}') for i in range(graph['countries'])
+    )
+    tags = Tag.objects.bulk_create(
+        Tag(user=user, name=f'tag-{i}') for i in range(graph['tags'])
+    )
+    companies = Company.objects.bulk_create(
+        Company(
+            user=user,
+            name=f'Company {i}',
+            country=random.choice(countries) if countries else None,
+            link=f'https://company-{i}.example.com',
+        )
+        for i in range(graph['companies'])
+    )
+    resumes = Resume.objects.bulk_create(
+        Resume(user=user, file=f'resumes/bench-{run_id}-{index}-{i}.pdf')
+        for i in range(graph['resumes'])
+    )
+    statuses = [choice for choice, _ in APPLICATION_STATUS_CHOICES]
+    applications = Application.objects.bulk_create(
+        Application(
+            user=user,
+            company=random.choice(companies),
+            country=random.choice(countries) if countries else None,
+            resume=random.choice(resumes) if resumes else None,
+            position=f'Engineer {i}',
+            link=f'https://jobs.example.com/{i}',
+            note='Seeded by the benchmark command',
+            status=random.choice(statuses),
+        )
+        for i in range(graph['applications'])
+    )
+    interviews = Interview.objects.bulk_create(
+        Interview(
+            user=user,
+            application=random.choice(applications),
+            date=date.today() + timedelta(days=i % 30),
+            note=f'Round {i}',
+        )
+        for i in range(graph['interviews'])
+    )
+
+    def link(through_model, field, objs):
+        rows = []
+        for obj in objs:
+            for tag in random.sample(tags, min(3, len(tags))):
+                rows.append(through_model(**{field: obj.id, 'tag_id': tag.id}))
+        through_model.objects.bulk_create(rows)
+
+    link(Company.tags.through, 'company_id', companies)
+    link(Resume.tags.through, 'resume_id', resumes)
+    link(Application.tags.through, 'application_id', applications)
+    link(Interview.tags.through, 'interview_id', interviews)
+    reconcile(Tag.objects.filter(user=user))
+
+    fixture.countries = [obj.id for obj in countries]
+    fixture.tags = [obj.id for obj in tags]
+    fixture.companies = [obj.id for obj in companies]
+    fixture.resumes = [obj.id for obj in resumes]
+    fixture.applications = [obj.id for obj in applications]
+    fixture.interviews = [obj.id for obj in interviews]
+    return fixture
+
+
+class Endpoint:
+    """A benchmarked route.
+
+    `build` returns the (path, data, content_type) for one request made on
+    behalf of `fixture`. `prepare` runs untimed before the request, for
+    endpoints that consume an object (deletes). `stream` endpoints are served
+    over ASGI and timed to their first chunk.
+    """
+
+    def __init__(self, name, url_name, method, build, auth=True, prepare=None, stream=False):
+        self.name = name
+        self.url_name = url_name
+        self.method = method
+        self.build = build
+        self.auth = auth
+        self.prepare = prepare
+        self.stream = stream
+
+
+def _unique():
+    return uuid4().hex[:12]
+
+
+def _json(path, data=None):
+    return path, json.dumps(data) if data is not None else None, 'application/json'
+
+
+def _throwaway_named(model):
+    def prepare(fixture):
+        return model.objects.create(user=fixture.user, name=f'drop-{_unique()}').id
+    return prepare
+
+
+def _throwaway_interview(fixture):
+    return Interview.objects.create(
+        user=fixture.user,
+        application_id=random.choice(fixture.applications),
+        date=date.today(),
+        note='to be deleted',
+    ).id
+
+
+def _archived_application(fixture):
+    application = Application.objects.create(
+        user=fixture.user,
+        company_id=random.choice(fixture.companies),
+        position='Archived Engineer',
+        status='rejected',
+    )
+    archive(Application.objects.filter(id=application.id))
+    return application.id
+
+
+def _deletion_job(fixture):
+    tag = Tag.objects.create(user=fixture.user, name=f'drop-{_unique()}')
+    return schedule(tag, fixture.user).id
+
+
+async def _first_chunk(path, headers):
+    """GET `path` through the ASGI handler, reading only the first chunk of a stream."""
+    response = await AsyncClient().get(path, headers=headers)
+    if response.streaming:
+        content = aiter(response.streaming_content)
+        await anext(content, None)
+        await content.aclose()
+    return response
+
+
+def build_endpoints(run_id):
+    def detail(url_name, ids_attr):
+        return lambda fixture, prepared: reverse(
+            url_name, kwargs={'id': random.choice(getattr(fixture, ids_attr))}
+        )
+
+    def register(fixture, prepared):
+        return _json(reverse('register'), {
+            'email': f'bench-{run_id}-reg-{_unique()}@{BENCH_DOMAIN}',
+            'password': BENCH_PASSWORD,
+            'name': 'Registered',
+        })
+
+    def resume_upload(fixture, prepared):
+        upload = SimpleUploadedFile('bench.pdf', PDF_BYTES, content_type='application/pdf')
+        return reverse('resume-list-create'), {'file': upload, 'tags': ['bench']}, None
+
+    return [
+        Endpoint('auth.register', 'register', 'post', register, auth=False),
+        Endpoint('auth.token', 'token', 'post', lambda f, p: _json(
+            reverse('token'), {'email': f.user.email, 'password': BENCH_PASSWORD}
+        ), auth=False),
+        Endpoint('auth.me.get', 'me', 'get', lambda f, p: _json(reverse('me'))),
+        Endpoint('auth.me.patch', 'me', 'patch', lambda f, p: _json(
+            reverse('me'), {'name': f'Bench {_unique()}'}
+        )),
+        Endpoint('tags.list', 'tags-list-create', 'get',
+                 lambda f, p: _json(reverse('tags-list-create'))),
+        Endpoint('tags.cloud', 'tags-cloud', 'get', lambda f, p: _json(reverse('tags-cloud'))),
+        Endpoint('tags.create', 'tags-list-create', 'post', lambda f, p: _json(
+            reverse('tags-list-create'), {'name': f'tag-{_unique()}'}
+        )),
+        Endpoint('tags.patch', 'tags-update-destroy', 'patch', lambda f, p: _json(
+            detail('tags-update-destroy', 'tags')(f, p), {'name': f'tag-{_unique()}'}
+        )),
+        Endpoint('tags.delete', 'tags-update-destroy', 'delete', lambda f, p: _json(
+            reverse('tags-update-destroy', kwargs={'id': p})
+        ), prepare=_throwaway_named(Tag)),
+        Endpoint('country.list', 'country-list-create', 'get',
+                 lambda f, p: _json(reverse('country-list-create'))),
+        Endpoint('country.create', 'country-list-create', 'post', lambda f, p: _json(
+            reverse('country-list-create'), {'name': f'Country {_unique()}'}
+        )),
+        Endpoint('country.patch', 'country-update-destroy', 'patch', lambda f, p: _json(
+            detail('country-update-destroy', 'countries')(f, p), {'name': f'Country {_unique()}'}
+        )),
+        Endpoint('country.delete', 'country-update-destroy', 'delete', lambda f, p: _json(
+            reverse('country-update-destroy', kwargs={'id': p})
+        ), prepare=_throwaway_named(Country)),
+        Endpoint('company.list', 'company-list-create', 'get',
+                 lambda f, p: _json(reverse('company-list-create'))),
+        Endpoint('company.create', 'company-list-create', 'post', lambda f, p: _json(
+            reverse('company-list-create'),
+            {'name': f'Company {_unique()}', 'country': random.choice(f.countries),
+             'tags': ['bench', 'python']}
+        )),
+        Endpoint('company.get', 'company-update-destroy', 'get', lambda f, p: _json(
+            detail('company-update-destroy', 'companies')(f, p)
+        )),
+        Endpoint('company.patch', 'company-update-destroy', 'patch', lambda f, p: _json(
+            detail('company-update-destroy', 'companies')(f, p),
+            {'link': f'https://{_unique()}.example.com'}
+        )),
+        Endpoint('company.delete', 'company-update-destroy', 'delete', lambda f, p: _json(
+            reverse('company-update-destroy', kwargs={'id': p})
+        ), prepare=_throwaway_named(Company)),
+        Endpoint('resume.list', 'resume-list-create', 'get',
+                 lambda f, p: _json(reverse('resume-list-create'))),
+        Endpoint('resume.create', 'resume-list-create', 'post', resume_upload),
+        Endpoint('resume.get', 'resume-update', 'get', lambda f, p: _json(
+            detail('resume-update', 'resumes')(f, p)
+        )),
+        Endpoint('resume.patch', 'resume-update', 'patch', lambda f, p: _json(
+            detail('resume-update', 'resumes')(f, p), {'tags': ['bench']}
+        )),
+        Endpoint('application.create', 'app-create', 'post', lambda f, p: _json(
+            reverse('app-create'),
+            {'company_id': random.choice(f.companies), 'tag_ids': f.tags[:2],
+             'position': 'Benchmark Engineer', 'status': 'applied'}
+        )),
+        Endpoint('application.get', 'app-detail', 'get', lambda f, p: _json(
+            detail('app-detail', 'applications')(f, p)
+        )),
+        Endpoint('application.patch', 'app-detail', 'patch', lambda f, p: _json(
+            detail('app-detail', 'applications')(f, p), {'status': 'interviewing'}
+        )),
+        Endpoint('application.restore', 'app-restore', 'post', lambda f, p: _json(
+            reverse('app-restore', kwargs={'id': p})
+        ), prepare=_archived_application),
+        Endpoint('interview.list', 'interview-list-create', 'get',
+                 lambda f, p: _json(reverse('interview-list-create'))),
+        Endpoint('interview.create', 'interview-list-create', 'post', lambda f, p: _json(
+            reverse('interview-list-create'),
+            {'application': random.choice(f.applications), 'date': str(date.today()),
+             'note': 'bench', 'tags': ['bench']}
+        )),
+        Endpoint('interview.get', 'interview-detail', 'get', lambda f, p: _json(
+            detail('interview-detail', 'interviews')(f, p)
+        )),
+        Endpoint('interview.patch', 'interview-detail', 'patch', lambda f, p: _json(
+            detail('interview-detail', 'interviews')(f, p), {'note': f'updated {_unique()}'}
+        )),
+        Endpoint('interview.delete', 'interview-detail', 'delete', lambda f, p: _json(
+            reverse('interview-detail', kwargs={'id': p})
+        ), prepare=_throwaway_interview),
+        Endpoint('deletion.get', 'deletion-detail', 'get', lambda f, p: _json(
+            reverse('deletion-detail', kwargs={'id': p})
+        ), prepare=_deletion_job),
+        Endpoint('batch', 'batch', 'post', lambda f, p: _json(reverse('batch'), {'operations': [
+            {'method': 'POST', 'path': reverse('company-list-create'),
+             'body': {'name': f'Company {_unique()}', 'country': random.choice(f.countries)}},
+            {'method': 'POST', 'path': reverse('app-create'),
+             'body': {'company_id': '{{0.id}}', 'position': 'Benchmark Engineer', 'status': 'applied'}},
+            {'method': 'POST', 'path': reverse('interview-list-create'),
+             'body': {'application': '{{1.id}}', 'date': date.today().isoformat(), 'note': 'batched'}},
+        ]})),
+        Endpoint('events.ticket', 'events-ticket', 'post', lambda f, p: _json(reverse('events-ticket'))),
+        Endpoint('events.stream', 'events', 'get', lambda f, p: _json(reverse('events')), stream=True),
+        Endpoint('sync.full', 'sync', 'get', lambda f, p: _json(reverse('sync'))),
+        Endpoint('sync.delta', 'sync', 'get', lambda f, p: _json(
+            f'{reverse("sync")}?since={format_cursor(timezone.now() - timedelta(minutes=1))}'
+        )),
+    ]
+
+
+def uncovered_routes(endpoints):
+    """Names of routes in main/urls.py and auth/urls.py with no endpoint."""
+    covered = {endpoint.url_name for endpoint in endpoints}
+    names = set()
+    for urlconf in ('main.urls', 'auth.urls'):
+        for pattern in get_resolver(urlconf).url_patterns:
+            if pattern.name:
+                names.add(pattern.name)
+    return sorted(names - covered)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Seed benchmark users and measure latency/throughput of every API route.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Requests per endpoint.')
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--companies', type=int, default=20)
+        parser.add_argument('--applications', type=int, default=50)
+        parser.add_argument('--interviews', type=int, default=50)
+        parser.add_argument('--endpoint', action='append', default=[],
+                            help='Only run endpoints whose name starts with this prefix.')
+        parser.add_argument('--output', default='benchmark.json')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the seeded users after the run.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--users, --requests and --concurrency must be positive')
+        random.seed(options['seed'])
+        run_id = uuid4().hex[:8]
+        graph = {
+            'countries': 5,
+            'tags': 15,
+            'companies': options['companies'],
+            'resumes': 3,
+            'applications': options['applications'],
+            'interviews': options['interviews'],
+        }
+
+        endpoints = build_endpoints(run_id)
+        missing = uncovered_routes(endpoints)
+        if missing:
+            self.stderr.write(f'Routes without a benchmark endpoint: {", ".join(missing)}')
+        if options['endpoint']:
+            endpoints = [
+                e for e in endpoints
+                if any(e.name.startswith(prefix) for prefix in options['endpoint'])
+            ]
+
+        self.stdout.write(f'Seeding {options["users"]} users (run {run_id})...')
+        password_hash = make_password(BENCH_PASSWORD)
+        fixtures = [
+            seed_user(run_id, i, graph, password_hash) for i in range(options['users'])
+        ]
+
+        try:
+            results = {}
+            for endpoint in endpoints:
+                results[endpoint.name] = self.run_endpoint(
+                    endpoint, fixtures, options['requests'], options['concurrency']
+                )
+                self.report(endpoint.name, results[endpoint.name])
+        finally:
+            if not options['keep']:
+                # Jobs only hold the user's id, so the cascade leaves them behind.
+                DeletionJob.objects.filter(user_id__in=[fixture.user.id for fixture in fixtures]).delete()
+                User.objects.filter(
+                    email__startswith=f'bench-{run_id}-', email__endswith=f'@{BENCH_DOMAIN}'
+                ).delete()
+
+        output = {
+            'run_id': run_id,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'vendor': connection.vendor,
+            'users': options['users'],
+            'requests_per_endpoint': options['requests'],
+            'concurrency': options['concurrency'],
+            'graph': graph,
+            'endpoints': results,
+        }
+        with open(options['output'], 'w') as fh:
+            json.dump(output, fh, indent=2)
+        self.stdout.write(f'Results written to {options["output"]}')
+
+    def run_endpoint(self, endpoint, fixtures, total, concurrency):
+        latencies = []
+        queries = []
+        errors = []
+        lock = threading.Lock()
+        counter = iter(range(total))
+
+        def worker():
+            from django.db import connection as thread_connection
+            client = Client()
+            try:
+                while True:
+                    with lock:
+                        if next(counter, None) is None:
+                            return
+                    fixture = random.choice(fixtures)
+                    prepared = endpoint.prepare(fixture) if endpoint.prepare else None
+                    path, data, content_type = endpoint.build(fixture, prepared)
+                    extra = {}
+                    if endpoint.auth:
+                        extra['HTTP_AUTHORIZATION'] = f'Token {fixture.token}'
+                    if content_type:
+                        extra['content_type'] = content_type
+                    call = getattr(client, endpoint.method)
+                    with CaptureQueriesContext(thread_connection) as ctx:
+                        start = time.perf_counter()
+                        if endpoint.stream:
+                            response = async_to_sync(_first_chunk)(
+                                path, {'Authorization': extra['HTTP_AUTHORIZATION']} if endpoint.auth else {}
+                            )
+                        elif data is not None:
+                            response = call(path, data, **extra)
+                        else:
+                            response = call(path, **extra)
+                        elapsed = time.perf_counter() - start
+                    with lock:
+                        latencies.append(elapsed)
+                        queries.append(len(ctx.captured_queries))
+                        if response.status_code >= 400:
+                            errors.append(response.status_code)
+            finally:
+                thread_connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(worker) for _ in range(concurrency)]:
+                future.result()
+        wall = time.perf_counter() - started
+
+        return {
+            'requests': len(latencies),
+            'errors': len(errors),
+            'error_statuses': sorted(set(errors)),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+            'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+            'rps': round(len(latencies) / wall, 2) if wall else None,
+            'queries_per_request': round(statistics.fmean(queries), 2),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:<22} p50={result["p50_ms"]:>8.2f}ms p95={result["p95_ms"]:>8.2f}ms '
+            f'p99={result["p99_ms"]:>8.2f}ms rps={result["rps"]:>8.2f} '
+            f'queries={result["queries_per_request"]:>6.2f} errors={result["errors"]}'
+        )
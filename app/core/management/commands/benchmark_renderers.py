@@ -0,0 +1,116 @@
+import io
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework import parsers, renderers
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from core import renderers as fast
+from core.models import APPLICATION_STATUS_CHOICES
+
+STATUSES = [choice for choice, _ in APPLICATION_STATUS_CHOICES]
+
+
+def payload(rows):
+    """A list response of `rows` applications, with the value types our views render."""
+    now = timezone.now()
+    return ReturnList([
+        {
+            'id': i,
+            'public_id': uuid4(),
+            'position': f'Engineer {i}',
+            'status': STATUSES[i % len(STATUSES)],
+            'link': f'https://jobs.example.com/{i}',
+            'note': 'Referred by a former colleague; follow up after the on-site. ' * 2,
+            'salary': Decimal('85000.50') + i,
+            'applied_on': date(2025, 1, 1) + timedelta(days=i % 365),
+            'created_at': now - timedelta(minutes=i),
+            'updated_at': now,
+            'company': {'id': i % 200, 'name': f'Company {i % 200}', 'country': i % 12,
+                        'link': f'https://company-{i % 200}.example.com'},
+            'tags': [i % 15, (i + 1) % 15, (i + 7) % 15],
+        }
+        for i in range(rows)
+    ], serializer=None)
+
+
+def measure(func, repeat):
+    """(best seconds, mean seconds, peak traced bytes) of `func()`."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(timings), statistics.fmean(timings), peak
+
+
+class Command(BaseCommand):
+    help = 'Compare size, render and parse time and peak memory of the renderers on a large list payload.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError('--rows and --repeat must be positive')
+        candidates = [('drf', renderers.JSONRenderer(), parsers.JSONParser())]
+        if fast.orjson is not None:
+            candidates.append(('orjson', fast.JSONRenderer(), fast.JSONParser()))
+        if fast.msgpack is not None:
+            candidates.append(('msgpack', fast.MessagePackRenderer(), fast.MessagePackParser()))
+        if len(candidates) == 1:
+            raise CommandError('Neither orjson nor msgpack is installed; there is nothing to compare.')
+
+        data = payload(options['rows'])
+        rendered = {name: renderer.render(data) for name, renderer, _ in candidates}
+        report = {'rows': options['rows'], 'renderers': {}}
+        if 'orjson' in rendered:
+            report['identical_json'] = rendered['drf'] == rendered['orjson']
+        for name, renderer, parser in candidates:
+            body = rendered[name]
+            render = measure(lambda: renderer.render(data), options['repeat'])
+            parse = measure(lambda: parser.parse(io.BytesIO(body)), options['repeat'])
+            report['renderers'][name] = {
+                'bytes': len(body),
+                'render_best_ms': round(render[0] * 1000, 2),
+                'render_mean_ms': round(render[1] * 1000, 2),
+                'render_peak_kb': round(render[2] / 1024, 1),
+                'parse_best_ms': round(parse[0] * 1000, 2),
+                'parse_mean_ms': round(parse[1] * 1000, 2),
+                'parse_peak_kb': round(parse[2] / 1024, 1),
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f'{report["rows"]} rows')
+        if 'identical_json' in report:
+            self.stdout.write(f'orjson output identical to DRF: {report["identical_json"]}')
+        for name, result in report['renderers'].items():
+            self.stdout.write(
+                f'{name:<8} bytes={result["bytes"]:>9}  render={result["render_best_ms"]:>8.2f}ms peak={result["render_peak_kb"]:>9.1f}KB  '
+                f'parse={result["parse_best_ms"]:>8.2f}ms peak={result["parse_peak_kb"]:>9.1f}KB'
+            )
+        drf = report['renderers']['drf']
+        for name, result in list(report['renderers'].items())[1:]:
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: {result["bytes"] / drf["bytes"]:.0%} of the JSON size, renders '
+                f'{drf["render_best_ms"] / max(result["render_best_ms"], 0.01):.1f}x and parses '
+                f'{drf["parse_best_ms"] / max(result["parse_best_ms"], 0.01):.1f}x as fast as DRF'
+            ))
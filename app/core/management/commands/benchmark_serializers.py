@@ -0,0 +1,114 @@
+import json
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from core.models import Application, Company, Country, Interview, Tag, User
+from main import fastpath
+from main.fieldsets import optimize, read_context
+from main.serializers import CompanySerializer, InterviewReadSerializer, TagSerializer
+
+CASES = [
+    ('tags', TagSerializer, Tag, {}),
+    ('companies', CompanySerializer, Company, {}),
+    ('companies expanded', CompanySerializer, Company, {'expand': 'country_detail,tag_details'}),
+    ('interviews', InterviewReadSerializer, Interview, {}),
+    ('interviews expanded', InterviewReadSerializer, Interview,
+     {'expand': 'tags,application.country,application.tags,application.company.tag_details'}),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed(rows):
+    """A throwaway user owning `rows` of every listed model."""
+    user = User.objects.create(email='bench-serializers@bench.local')
+    countries = Country.objects.bulk_create(Country(user=user, name=f'Country {i}') for i in range(10))
+    tags = Tag.objects.bulk_create(Tag(user=user, name=f'tag-{i}') for i in range(rows))
+    companies = Company.objects.bulk_create(
+        Company(user=user, name=f'Company {i}', country=countries[i % 10], link=f'https://c{i}.example.com')
+        for i in range(rows)
+    )
+    applications = Application.objects.bulk_create(
+        Application(user=user, company=companies[i], country=countries[i % 10], position=f'Engineer {i}',
+                    link=f'https://jobs.example.com/{i}', note='Submitted via portal', status='applied')
+        for i in range(rows)
+    )
+    interviews = Interview.objects.bulk_create(
+        Interview(user=user, application=applications[i], date='2025-01-10', note='Phone screen')
+        for i in range(rows)
+    )
+    for owners, field in [(companies, 'company'), (applications, 'application'), (interviews, 'interview')]:
+        through = type(owners[0]).tags.through
+        through.objects.bulk_create(
+            through(**{f'{field}_id': owner.id, 'tag_id': tags[(i + k) % rows].id})
+            for i, owner in enumerate(owners) for k in range(3)
+        )
+    return user
+
+
+def best(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = 'Compare rows per second of the fast list path and the DRF serializers (seeds and rolls back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if rows < 1 or repeat < 1:
+            raise CommandError('--rows and --repeat must be positive')
+        report = {'rows': rows, 'cases': {}}
+        try:
+            with transaction.atomic():
+                user = seed(rows)
+                for name, serializer_class, model, params in CASES:
+                    report['cases'][name] = self.run_case(user, serializer_class, model, params, repeat)
+                raise Rollback
+        except Rollback:
+            pass
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for name, result in report['cases'].items():
+            self.stdout.write(
+                f'{name:<20} drf={result["drf_rows_per_s"]:>10.0f} rows/s  '
+                f'fast={result["fast_rows_per_s"]:>10.0f} rows/s  {result["speedup"]:>5.1f}x'
+            )
+
+    def run_case(self, user, serializer_class, model, params, repeat):
+        queryset = model.objects.filter(user=user)
+        request = Request(RequestFactory().get('/', params))
+
+        def drf():
+            serializer = serializer_class(many=True, context=read_context(request))
+            serializer.instance = optimize(queryset, serializer)
+            return serializer.data
+
+        def fast():
+            return fastpath.serialize(serializer_class(many=True, context=read_context(request)), queryset)
+
+        if fast() != drf():
+            raise CommandError(f'The fast path differs from {serializer_class.__name__} for {params}')
+        count = queryset.count()
+        drf_s, fast_s = best(drf, repeat), best(fast, repeat)
+        return {
+            'drf_rows_per_s': round(count / drf_s), 'fast_rows_per_s': round(count / fast_s),
+            'speedup': round(drf_s / fast_s, 1),
+        }
@@ -0,0 +1,82 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import throttling
+from core.models import Tag, User
+
+
+class Rollback(Exception):
+    pass
+
+
+def per_call(func, calls, repeat):
+    """Best seconds per call of `func(i)` over `repeat` runs of `calls` calls."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(calls):
+            func(i)
+        elapsed = (time.perf_counter() - start) / calls
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = 'Measure the time the token-bucket throttles add to a write request (seeds and rolls back).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=20000, help='Bucket checks per run.')
+        parser.add_argument('--requests', type=int, default=500, help='PATCH requests per run.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+
+    def handle(self, *args, **options):
+        checks, requests, repeat = options['checks'], options['requests'], options['repeat']
+        if checks < 1 or requests < 1 or repeat < 1:
+            raise CommandError('--checks, --requests and --repeat must be positive')
+        alias = settings.THROTTLE_CACHE
+        report = {'cache': alias, 'check_us': {}, 'request_us': {}}
+        for name, cache in [(alias, throttling.caches[alias]), ('local', throttling._local)]:
+            report['check_us'][name] = per_call(
+                lambda i: throttling.take(cache, {f'benchmark:{i % 1000}': (10 ** 9, 1.0)}), checks, repeat,
+            ) * 1e6
+
+        # Rates nobody reaches, so every request takes the allow path (a read and a write).
+        rate = f'{requests * repeat * 10}/s'
+        try:
+            with transaction.atomic():
+                user = User.objects.create(email='bench-throttling@bench.local')
+                tag = Tag.objects.create(user=user, name='bench-0')
+                client = APIClient(REMOTE_ADDR='10.0.0.1')
+                client.force_authenticate(user)
+                url = reverse('tags-update-destroy', kwargs={'id': tag.id})
+
+                def patch(i):
+                    client.patch(url, {'name': f'bench-{i % 2}'})
+
+                for name, rates in [('unthrottled', {}), ('throttled', {'write': {'ip': rate, 'user': rate}})]:
+                    with override_settings(THROTTLE_RATES=rates):
+                        report['request_us'][name] = per_call(patch, requests, repeat) * 1e6
+                raise Rollback
+        except Rollback:
+            pass
+        base, throttled = report['request_us']['unthrottled'], report['request_us']['throttled']
+        report['overhead_us'] = throttled - base
+        report['overhead_pct'] = 100 * (throttled - base) / base
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for name, micros in report['check_us'].items():
+            self.stdout.write(f'bucket check ({name}): {micros:8.1f} µs')
+        self.stdout.write(
+            f'PATCH /api/tags/{{id}}/: {base:8.1f} µs unthrottled, {throttled:8.1f} µs with IP and user '
+            f'buckets ({report["overhead_us"]:+.1f} µs, {report["overhead_pct"]:+.1f}%)'
+        )
@@ -0,0 +1,64 @@
+import json
+from subprocess import CalledProcessError
+
+from django.core.management import BaseCommand, CommandError
+
+from core.importtime import aggregate, profile_imports
+
+
+class Command(BaseCommand):
+    help = 'Profile the imports done by a cold process and aggregate them per package.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='app.wsgi',
+                            help='Module whose cold import is profiled.')
+        parser.add_argument('--top', type=int, default=15,
+                            help='Number of packages and modules to list.')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+
+    def handle(self, *args, **options):
+        try:
+            rows = profile_imports(options['module'])
+        except CalledProcessError as exc:
+            raise CommandError(f'Importing {options["module"]} failed:\n{exc.stderr}')
+        if not rows:
+            raise CommandError('No -X importtime output was captured.')
+
+        top = options['top']
+        total_us = sum(self_us for _, self_us, _, _ in rows)
+        packages = aggregate(rows)
+        modules = sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+        report = {
+            'module': options['module'],
+            'total_ms': round(total_us / 1000, 1),
+            'module_count': len(rows),
+            'packages': [
+                {'package': name, 'self_ms': round(stats['self_us'] / 1000, 1),
+                 'modules': stats['modules']}
+                for name, stats in packages[:top]
+            ],
+            'modules': [
+                {'module': module, 'self_ms': round(self_us / 1000, 1),
+                 'cumulative_ms': round(cumulative_us / 1000, 1)}
+                for module, self_us, cumulative_us, _ in modules
+            ],
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f'import {report["module"]}: {report["total_ms"]} ms across {report["module_count"]} modules\n'
+        )
+        self.stdout.write(f'{"package":<30} {"self ms":>9} {"share":>6} {"modules":>8}')
+        for package in report['packages']:
+            share = package['self_ms'] / report['total_ms'] * 100 if report['total_ms'] else 0
+            self.stdout.write(
+                f'{package["package"]:<30} {package["self_ms"]:>9.1f} {share:>5.1f}% {package["modules"]:>8}'
+            )
+        self.stdout.write(f'\n{"module":<50} {"self ms":>9} {"cumul ms":>9}')
+        for module in report['modules']:
+            self.stdout.write(
+                f'{module["module"]:<50} {module["self_ms"]:>9.1f} {module["cumulative_ms"]:>9.1f}'
+            )
@@ -0,0 +1,71 @@
+import time
+from uuid import UUID
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.models import IdempotencyKey, Tombstone, User, UserShard
+from core.sharding import ShardMoveError, copy_user, shard_databases
+
+
+class Command(BaseCommand):
+    help = "Move a user's rows to another shard while the user stays online."
+
+    def add_arguments(self, parser):
+        parser.add_argument('user', help='Email or public_id of the user to move.')
+        parser.add_argument('target', help='Alias of the destination shard.')
+        parser.add_argument('--drain-seconds', type=float, default=2.0,
+                            help='Wait this long after locking so in-flight writes finish.')
+
+    def find_entry(self, ref):
+        try:
+            filters = {'public_id': UUID(ref)}
+        except ValueError:
+            filters = {'email': ref}
+        directory = UserShard.objects.using(DEFAULT_DB_ALIAS)
+        entry = directory.filter(**filters).first()
+        if entry is not None:
+            return entry
+        # Users loaded in bulk (seed_data, fixtures) may have no directory row yet.
+        for alias in shard_databases():
+            user = User.objects.using(alias).filter(**filters).first()
+            if user is not None:
+                return directory.create(user_id=user.pk, public_id=user.public_id,
+                                        email=user.email, shard=alias)
+        raise CommandError(f'No user matches "{ref}".')
+
+    def handle(self, *args, **options):
+        target = options['target']
+        if target not in shard_databases():
+            raise CommandError(f'"{target}" is not one of SHARD_DATABASES: {settings.SHARD_DATABASES}')
+        entry = self.find_entry(options['user'])
+        source = entry.shard
+        if source == target:
+            raise CommandError(f'{entry.email} is already on {target}.')
+
+        directory = UserShard.objects.using(DEFAULT_DB_ALIAS).filter(pk=entry.pk)
+        if not directory.filter(locked=False).update(locked=True):
+            raise CommandError(f'{entry.email} is already being moved.')
+        self.stdout.write(f'Locked {entry.email} for writes; moving {source} -> {target}.')
+        try:
+            time.sleep(options['drain_seconds'])
+            copied = copy_user(entry.user_id, source, target)
+        except ShardMoveError as exc:
+            directory.update(locked=False)
+            raise CommandError(str(exc))
+        except Exception:
+            directory.update(locked=False)
+            raise
+
+        # Reads switch to the target as soon as the directory points there.
+        directory.update(shard=target, locked=False)
+        User.objects.using(source).filter(pk=entry.user_id).delete()
+        # Deleting the old copies left tombstones that no sync should see.
+        Tombstone.objects.using(source).filter(user_id=entry.user_id).delete()
+        IdempotencyKey.objects.using(source).filter(user_id=entry.user_id).delete()
+
+        for label, count in copied.items():
+            if count:
+                self.stdout.write(f'  {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(f'Moved {entry.email} to {target}.'))
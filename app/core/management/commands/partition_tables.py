@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Count
+
+from core.models import Application, Interview, User
+from core.partitioning import STRATEGIES, convert_all, explain
+
+
+class Command(BaseCommand):
+    help = 'Partition applications, interviews and their tags (PostgreSQL), or report partition pruning.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--strategy', choices=STRATEGIES,
+                            default=settings.DB_PARTITIONING or 'hash')
+        parser.add_argument('--partitions', type=int, default=settings.DB_PARTITION_COUNT,
+                            help='Number of hash partitions.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows copied per committed batch.')
+        parser.add_argument('--keep-legacy', action='store_true',
+                            help='Keep the old tables (renamed *_legacy) instead of dropping them.')
+        parser.add_argument('--explain', action='store_true',
+                            help='Only report how many partitions the per-user API queries scan.')
+        parser.add_argument('--user', help='Email of the user to explain for (default: most applications).')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError('Table partitioning requires PostgreSQL.')
+        if not options['explain']:
+            convert_all(
+                connection, options['strategy'], options['partitions'],
+                batch_size=options['batch_size'], keep_legacy=options['keep_legacy'],
+                log=self.stdout.write,
+            )
+        self.report(connection, options)
+
+    def report(self, connection, options):
+        users = User.objects.using(connection.alias)
+        if options['user']:
+            user = users.filter(email=options['user']).first()
+        else:
+            user = users.annotate(n=Count('application')).order_by('-n').first()
+        if user is None:
+            raise CommandError('No user to explain queries for.')
+
+        applications = Application.objects.using(connection.alias).filter(user=user)
+        interviews = Interview.objects.using(connection.alias).filter(user=user)
+        first_application = applications.values_list('id', flat=True).first() or 0
+        first_interview = interviews.values_list('id', flat=True).first() or 0
+        # The queries main.views runs for the application and interview endpoints.
+        queries = [
+            ('application list', applications, 'core_application'),
+            ('application detail', applications.filter(id=first_application), 'core_application'),
+            ('application tags', Application.tags.through.objects.using(connection.alias)
+             .filter(application_id=first_application), 'core_application_tags'),
+            ('interview list', interviews, 'core_interview'),
+            ('interview detail', interviews.filter(id=first_interview), 'core_interview'),
+        ]
+        self.stdout.write(f'\nPartition pruning for {user.email}:')
+        self.stdout.write(f'{"query":<20} {"scanned":>8} {"of":>4} {"ms":>9}')
+        for name, queryset, table in queries:
+            result = explain(connection, queryset, table)
+            self.stdout.write(
+                f'{name:<20} {result["scanned"]:>8} {result["partitions"]:>4} {result["execution_ms"]:>9.3f}'
+            )
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from core.deletion import claim, run
+from core.models import DeletionJob
+from core.sharding import shard_databases
+
+
+class Command(BaseCommand):
+    help = 'Work through queued deletions (DELETE with ?async=true or ASYNC_DELETES).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling.')
+        parser.add_argument('--poll-seconds', type=float, default=2.0)
+        parser.add_argument('--batch-size', type=int, default=settings.DELETION_BATCH_SIZE)
+        parser.add_argument('--retry-failed', action='store_true',
+                            help='Queue failed jobs again before starting.')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            for alias in shard_databases():
+                DeletionJob.objects.using(alias).filter(status='failed').update(status='pending', error='')
+        while True:
+            worked = False
+            for alias in shard_databases():
+                job = claim(alias)
+                if job is None:
+                    continue
+                worked = True
+                job = run(job, batch_size=options['batch_size'])
+                message = f'{job}: {job.processed}/{job.total} rows'
+                if job.status == 'failed':
+                    self.stderr.write(f'{message}; {job.error}')
+                else:
+                    self.stdout.write(message)
+            if not worked:
+                if options['once']:
+                    return
+                time.sleep(options['poll_seconds'])
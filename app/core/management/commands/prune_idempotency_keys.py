@@ -0,0 +1,20 @@
+from django.core.management import BaseCommand
+
+from core.idempotency import prune
+from core.sharding import shard_databases
+
+
+class Command(BaseCommand):
+    help = 'Delete Idempotency-Key records older than IDEMPOTENCY_KEY_HOURS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', action='append',
+                            help='Database alias to process; repeatable (default: every shard).')
+
+    def handle(self, *args, **options):
+        total = 0
+        for alias in options['database'] or shard_databases():
+            count = prune(using=alias)
+            self.stdout.write(f'  {alias}: {count} keys')
+            total += count
+        self.stdout.write(self.style.SUCCESS(f'Pruned {total} keys.'))
@@ -0,0 +1,26 @@
+from django.core.management import BaseCommand
+
+from core.models import Tag
+from core.sharding import shard_databases
+from core.tagging import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recount tag usage counters from the M2M tables and fix any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only tags of the user with this email.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', action='append',
+                            help='Database alias to process; repeatable (default: every shard).')
+
+    def handle(self, *args, **options):
+        queryset = Tag.objects.all()
+        if options['user']:
+            queryset = queryset.filter(user__email=options['user'])
+        fixed = 0
+        for alias in options['database'] or shard_databases():
+            count = reconcile(queryset, using=alias, batch_size=options['batch_size'])
+            self.stdout.write(f'  {alias}: {count} tags fixed')
+            fixed += count
+        self.stdout.write(self.style.SUCCESS(f'Reconciled tag usage; {fixed} tags had drifted.'))
@@ -0,0 +1,304 @@
+import random
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.models import (
+    User, Country, Tag, Company, Resume, Application, Interview,
+    APPLICATION_STATUS_CHOICES,
+)
+from core.tagging import reconcile
+
+SEED_DOMAIN = 'seed.local'
+SEED_PASSWORD = 'seed-pass-123'
+STATUSES = [choice for choice, _ in APPLICATION_STATUS_CHOICES]
+
+
+def copy_escape(value):
+    """Encode one value in PostgreSQL's COPY text format."""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+class RowStream:
+    """File-like object that feeds a row generator to `copy_expert`.
+
+    Rows are encoded lazily, so memory use stays flat regardless of the
+    number of rows loaded.
+    """
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = ''
+        self.count = 0
+
+    def _line(self):
+        row = next(self.rows, None)
+        if row is None:
+            return None
+        self.count += 1
+        return '\t'.join(copy_escape(value) for value in row) + '\n'
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = self._line()
+            if line is None:
+                break
+            self.buffer += line
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+    def readline(self, size=-1):
+        if self.buffer:
+            line, _, rest = self.buffer.partition('\n')
+            self.buffer = rest
+            return line + '\n'
+        return self._line() or ''
+
+
+class UserPlan:
+    """How many rows of each kind one seeded user owns, and their ids."""
+
+    def __init__(self, index, counts, tags_per_object):
+        self.index = index
+        self.counts = counts
+        self.tags_per_object = tags_per_object
+        self.first_id = {}
+
+    def ids(self, kind):
+        start = self.first_id[kind]
+        return range(start, start + self.counts[kind])
+
+
+def plan_users(options, rng):
+    plans = []
+    mean = options['applications_per_user']
+    skew = options['skew']
+    for index in range(options['users']):
+        power = index < options['power_users']
+        if power:
+            applications = options['power_user_applications']
+        elif skew:
+            # Pareto with shape `skew`, scaled so the mean stays `mean`.
+            scale = mean * (skew - 1) / skew if skew > 1 else mean
+            applications = int(rng.paretovariate(skew) * scale)
+        else:
+            applications = mean
+        counts = {
+            'users': 1,
+            'countries': options['countries_per_user'],
+            'tags': options['tags_per_user'],
+            'companies': options['power_user_companies'] if power
+            else options['companies_per_user'],
+            'resumes': options['resumes_per_user'],
+            'applications': applications,
+            'interviews': int(applications * options['interviews_per_application']),
+        }
+        if counts['applications'] and not counts['companies']:
+            counts['companies'] = 1
+        tags_per_object = min(options['tags_per_object'], counts['tags'])
+        for kind in ('companies', 'resumes', 'applications', 'interviews'):
+            counts[f'{kind}_tags'] = counts[kind] * tags_per_object
+        plans.append(UserPlan(index, counts, tags_per_object))
+    return plans
+
+
+def table_of(model):
+    return model._meta.db_table
+
+
+def columns_of(model, names):
+    return [model._meta.get_field(name).column for name in names]
+
+
+def reserve_ids(cursor, model, plans, kind):
+    """Assign each plan a contiguous id block past max(id) and the sequence."""
+    table = table_of(model)
+    cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}')
+    next_id = cursor.fetchone()[0] + 1
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+    sequence = cursor.fetchone()[0]
+    if sequence:
+        cursor.execute(f'SELECT last_value FROM {sequence}')
+        next_id = max(next_id, cursor.fetchone()[0] + 1)
+    for plan in plans:
+        plan.first_id[kind] = next_id
+        next_id += plan.counts[kind]
+    return next_id - 1
+
+
+def bump_sequence(cursor, model, last_id):
+    cursor.execute(
+        "SELECT setval(pg_get_serial_sequence(%s, 'id'), %s, true)",
+        [table_of(model), max(last_id, 1)],
+    )
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a synthetic dataset with PostgreSQL COPY.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--power-users', type=int, default=0,
+                            help='Number of users that get --power-user-applications.')
+        parser.add_argument('--power-user-applications', type=int, default=100000)
+        parser.add_argument('--power-user-companies', type=int, default=500)
+        parser.add_argument('--applications-per-user', type=int, default=50)
+        parser.add_argument('--skew', type=float, default=0,
+                            help='Pareto shape for applications per regular user; '
+                                 '0 gives every user exactly the mean.')
+        parser.add_argument('--interviews-per-application', type=float, default=0.5)
+        parser.add_argument('--countries-per-user', type=int, default=5)
+        parser.add_argument('--tags-per-user', type=int, default=20)
+        parser.add_argument('--companies-per-user', type=int, default=30)
+        parser.add_argument('--resumes-per-user', type=int, default=3)
+        parser.add_argument('--tags-per-object', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('seed_data loads rows with COPY and requires PostgreSQL.')
+        if options['power_users'] > options['users']:
+            raise CommandError('--power-users cannot exceed --users')
+
+        rng = random.Random(options['seed'])
+        run_id = uuid4().hex[:8]
+        plans = plan_users(options, rng)
+        password_hash = make_password(SEED_PASSWORD)
+        now = timezone.now()
+
+        def timestamp():
+            return (now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))).isoformat()
+
+        def tag_links(owner_kind):
+            def rows():
+                for plan in plans:
+                    tag_ids = list(plan.ids('tags'))
+                    through_ids = iter(plan.ids(f'{owner_kind}_tags'))
+                    for owner_id in plan.ids(owner_kind):
+                        for tag_id in rng.sample(tag_ids, plan.tags_per_object):
+                            yield next(through_ids), owner_id, tag_id
+            return rows
+
+        def users():
+            for plan in plans:
+                yield (
+                    plan.first_id['users'], password_hash, None, False, uuid4(),
+                    f'seed-{run_id}-{plan.index}@{SEED_DOMAIN}', f'Seed User {plan.index}',
+                    True, False,
+                )
+
+        def countries():
+            for plan in plans:
+                user_id = plan.first_id['users']
+                for n, pk in enumerate(plan.ids('countries')):
+                    yield pk, user_id, f'Country {n}', False, timestamp()
+
+        def tags():
+            for plan in plans:
+                user_id = plan.first_id['users']
+                for n, pk in enumerate(plan.ids('tags')):
+                    yield pk, user_id, f'tag-{n}', False, 0, 0, 0, 0, timestamp()
+
+        def companies():
+            for plan in plans:
+                user_id = plan.first_id['users']
+                country_ids = list(plan.ids('countries')) or [None]
+                for n, pk in enumerate(plan.ids('companies')):
+                    yield (pk, user_id, f'Company {n}', rng.choice(country_ids),
+                           f'https://company-{n}.example.com', False, timestamp())
+
+        def resumes():
+            for plan in plans:
+                user_id = plan.first_id['users']
+                for pk in plan.ids('resumes'):
+                    created = timestamp()
+                    yield pk, user_id, f'resumes/seed-{run_id}-{pk}.pdf', created, created
+
+        def applications():
+            for plan in plans:
+                user_id = plan.first_id['users']
+                company_ids = list(plan.ids('companies'))
+                country_ids = list(plan.ids('countries')) or [None]
+                resume_ids = list(plan.ids('resumes')) or [None]
+                for n, pk in enumerate(plan.ids('applications')):
+                    created = timestamp()
+                    yield (
+                        pk, user_id, rng.choice(company_ids), rng.choice(country_ids),
+                        rng.choice(resume_ids), f'Engineer {n}', f'https://jobs.example.com/{pk}',
+                        'Generated by seed_data', rng.choice(STATUSES), created, created,
+                    )
+
+        def interviews():
+            for plan in plans:
+                user_id = plan.first_id['users']
+                application_ids = list(plan.ids('applications'))
+                for n, pk in enumerate(plan.ids('interviews')):
+                    day = (now - timedelta(days=rng.randint(0, 365))).date()
+                    yield pk, user_id, rng.choice(application_ids), day, f'Round {n}', timestamp()
+
+        # (kind, model, column names, row generator); order respects FKs.
+        loads = [
+            ('users', User, ['id', 'password', 'last_login', 'is_superuser', 'public_id',
+                             'email', 'name', 'is_active', 'is_staff'], users),
+            ('countries', Country, ['id', 'user', 'name', 'deleting', 'updated_at'], countries),
+            ('tags', Tag, ['id', 'user', 'name', 'deleting', 'company_uses', 'resume_uses',
+                           'application_uses', 'interview_uses', 'updated_at'], tags),
+            ('companies', Company, ['id', 'user', 'name', 'country', 'link', 'deleting', 'updated_at'],
+             companies),
+            ('resumes', Resume, ['id', 'user', 'file', 'created_at', 'updated_at'], resumes),
+            ('applications', Application, ['id', 'user', 'company', 'country', 'resume',
+                                           'position', 'link', 'note', 'status',
+                                           'created_at', 'updated_at'], applications),
+            ('interviews', Interview, ['id', 'user', 'application', 'date', 'note', 'updated_at'], interviews),
+        ]
+        for owner_kind, model, field in (
+            ('companies', Company, 'company'),
+            ('resumes', Resume, 'resume'),
+            ('applications', Application, 'application'),
+            ('interviews', Interview, 'interview'),
+        ):
+            loads.append((
+                f'{owner_kind}_tags', model.tags.through, ['id', field, 'tag'],
+                tag_links(owner_kind),
+            ))
+
+        started = time.monotonic()
+        with transaction.atomic(), connection.cursor() as cursor:
+            tables = ', '.join(table_of(model) for _, model, _, _ in loads)
+            cursor.execute(f'LOCK TABLE {tables} IN SHARE ROW EXCLUSIVE MODE')
+            for kind, model, names, rows in loads:
+                last_id = reserve_ids(cursor, model, plans, kind)
+                stream = RowStream(rows())
+                columns = ', '.join(columns_of(model, names))
+                cursor.copy_expert(f'COPY {table_of(model)} ({columns}) FROM STDIN', stream)
+                bump_sequence(cursor, model, last_id)
+                self.stdout.write(f'{table_of(model):<28} {stream.count:>12,} rows')
+        with connection.cursor() as cursor:
+            for _, model, _, _ in loads:
+                cursor.execute(f'ANALYZE {table_of(model)}')
+        # COPY bypasses the signals that keep tag usage counters current.
+        reconcile(Tag.objects.filter(user_id__in=[plan.first_id['users'] for plan in plans]))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(plans)} users in {time.monotonic() - started:.1f}s '
+            f'(run {run_id}, password "{SEED_PASSWORD}").'
+        ))
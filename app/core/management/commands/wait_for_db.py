@@ -1,21 +1,39 @@
-import time
-from django.db import connections
-from django.db.utils import OperationalError
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+
+from core.startup import DatabaseUnavailable, wait_for_database, warm_up
 
 
 class Command(BaseCommand):
+    help = 'Wait for the database with exponential backoff, then warm up the project.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--timeout', type=float, default=60.0,
+                            help='Give up and exit non-zero after this many seconds.')
+        parser.add_argument('--initial-delay', type=float, default=0.1)
+        parser.add_argument('--max-delay', type=float, default=5.0)
+        parser.add_argument('--skip-warm-up', action='store_true')
+
     def handle(self, *args, **options):
-        connection = None
-        max_attempt = 10
-        while max_attempt > 0:
-            try:
-                connection = connections['default']
-                connection.cursor()  # make connection attempt
-                self.stdout.write('Database initialized.')
-                return
-            except OperationalError:
-                self.stdout.write('Waiting for database to initialize...')
-                max_attempt -= 1
-                time.sleep(1)
-        self.stdout.write('Could not initialize database')
+        def on_retry(attempt, delay, exc):
+            self.stdout.write(
+                f'Waiting for database to initialize (attempt {attempt}, retrying in {delay:.2f}s)...'
+            )
+
+        try:
+            attempts = wait_for_database(
+                alias=options['database'],
+                timeout=options['timeout'],
+                initial_delay=options['initial_delay'],
+                max_delay=options['max_delay'],
+                on_retry=on_retry,
+            )
+        except DatabaseUnavailable as exc:
+            raise CommandError(f'Could not initialize database: {exc}')
+        self.stdout.write(self.style.SUCCESS(f'Database initialized after {attempts} attempt(s).'))
+
+        if not options['skip_warm_up']:
+            summary = warm_up()
+            self.stdout.write(
+                'Warm-up complete: ' + ', '.join(f'{key}={value}' for key, value in summary.items())
+            )
@@ -0,0 +1,334 @@
+"""Process-local metric collection with a Prometheus text endpoint.
+
+Each worker process keeps counters and histograms in memory and
+periodically writes a snapshot to `METRICS_DIR/<pid>-<start>.json`. The
+endpoint merges every snapshot it finds there, so scrapes see the sum over
+all pre-forked workers (of one host) no matter which one answers. Without
+`METRICS_DIR` only the answering process is reported.
+
+Counters must never go down, so the totals of workers that have gone are
+folded into `retired.json` rather than dropped: a worker folds its own on
+exit, and a scrape folds the snapshots of processes that are no longer
+running (killed workers). The start time in the name keeps a reused pid
+from overwriting a dead worker's snapshot.
+
+Scrapes need `Authorization: Bearer <METRICS_TOKEN>` or a staff user.
+"""
+import atexit
+import fcntl
+import glob
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+METRICS = {
+    'jat_http_requests_total': ('counter', 'HTTP requests by route, method and status.'),
+    'jat_http_request_duration_seconds': ('histogram', 'HTTP request latency by route.'),
+    'jat_db_queries_per_request': ('histogram', 'Database queries issued per request.'),
+    'jat_db_time_seconds': ('histogram', 'Database time spent per request.'),
+    'jat_db_connections_opened_total': ('counter', 'Database connections opened by alias.'),
+    'jat_cache_requests_total': ('counter', 'Cache lookups by cache and result.'),
+}
+BUCKETS = {
+    'jat_http_request_duration_seconds': LATENCY_BUCKETS,
+    'jat_db_queries_per_request': QUERY_COUNT_BUCKETS,
+    'jat_db_time_seconds': LATENCY_BUCKETS,
+}
+
+# name -> (help, callable returning [(labels dict, value), ...]); evaluated per scrape.
+_gauges = {}
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Collector:
+    """Counters and histograms for the current process.
+
+    Updates take a lock only long enough to bump a few dict entries, and the
+    snapshot file is rewritten at most once per flush interval.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.last_flush = 0.0
+        self.started = time.time_ns()
+
+    def inc(self, name, labels, amount=1.0):
+        with self.lock:
+            self.counters[(name, _key(labels))] += amount
+        self.maybe_flush()
+
+    def observe(self, name, labels, value):
+        buckets = BUCKETS[name]
+        key = (name, _key(labels))
+        with self.lock:
+            state = self.histograms.get(key)
+            if state is None:
+                state = self.histograms[key] = [[0] * len(buckets), 0.0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, labels, value]
+                             for (name, labels), value in self.counters.items()],
+                'histograms': [[name, labels, list(counts), total, count]
+                               for (name, labels), (counts, total, count)
+                               in self.histograms.items()],
+            }
+
+    def maybe_flush(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        if time.monotonic() - self.last_flush >= interval:
+            self.flush()
+
+    def path(self, directory):
+        return os.path.join(directory, f'{os.getpid()}-{self.started}.json')
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        _write(self.path(directory), self.snapshot())
+
+    def retire(self):
+        """Fold this process's totals into `retired.json` as it exits."""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory or not os.path.isdir(directory):
+            return
+        with _directory_lock(directory):
+            _fold(directory, [self.snapshot()])
+            try:
+                os.remove(self.path(directory))
+            except FileNotFoundError:
+                pass
+
+
+collector = Collector()
+atexit.register(collector.retire)
+
+
+def inc(name, amount=1.0, **labels):
+    collector.inc(name, labels, amount)
+
+
+def observe(name, value, **labels):
+    collector.observe(name, labels, value)
+
+
+def record_cache(cache, hit):
+    inc('jat_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+
+def register_gauge(name, help_text, func):
+    """Expose `func()` -> [(labels, value), ...] as a gauge on every scrape."""
+    _gauges[name] = (help_text, func)
+
+
+def connection_opened(sender, connection, **kwargs):
+    inc('jat_db_connections_opened_total', alias=connection.alias)
+
+
+def _database_backends():
+    if connection.vendor != 'postgresql':
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COALESCE(state, %s), COUNT(*) FROM pg_stat_activity '
+            'WHERE datname = current_database() GROUP BY 1', ['unknown']
+        )
+        return [({'state': state}, count) for state, count in cursor.fetchall()]
+
+
+register_gauge('jat_db_backends', 'PostgreSQL backends connected to this database by state.',
+               _database_backends)
+
+
+RETIRED = 'retired.json'
+
+
+def _write(path, snapshot):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as fh:
+        json.dump(snapshot, fh)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _as_snapshot(counters, histograms):
+    return {
+        'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+        'histograms': [[name, labels, counts, total, count]
+                       for (name, labels), (counts, total, count) in histograms.items()],
+    }
+
+
+@contextmanager
+def _directory_lock(directory):
+    """Serialize scrapes and exiting workers over the snapshot files."""
+    with open(os.path.join(directory, 'metrics.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _fold(directory, snapshots):
+    """Add `snapshots` to the totals of retired workers (under the lock)."""
+    path = os.path.join(directory, RETIRED)
+    retired = _read(path)
+    _write(path, _as_snapshot(*merge(([retired] if retired else []) + snapshots)))
+
+
+def _retire_dead(directory, paths):
+    """Fold the snapshots of processes that are gone; returns the paths still live."""
+    live = []
+    for path in paths:
+        pid = re.match(r'\d+', os.path.basename(path))
+        if pid is None or _alive(int(pid.group())):
+            live.append(path)
+            continue
+        snapshot = _read(path)
+        if snapshot is not None:
+            _fold(directory, [snapshot])
+        os.remove(path)
+    return live
+
+
+def _load_snapshots():
+    """This process's live state, the last snapshot of every other worker and the retired totals."""
+    snapshots = [collector.snapshot()]
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        own, retired = collector.path(directory), os.path.join(directory, RETIRED)
+        with _directory_lock(directory):
+            others = [path for path in glob.glob(os.path.join(directory, '*.json')) if path not in (own, retired)]
+            for path in _retire_dead(directory, others) + [retired]:
+                snapshot = _read(path)
+                if snapshot is not None:
+                    snapshots.append(snapshot)
+    return snapshots
+
+
+def merge(snapshots):
+    counters = defaultdict(float)
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            counters[(name, tuple(map(tuple, labels)))] += value
+        for name, labels, counts, total, count in snapshot['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            state = histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+            state[0] = [a + b for a, b in zip(state[0], counts)]
+            state[1] += total
+            state[2] += count
+    return counters, histograms
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render(snapshots):
+    counters, histograms = merge(snapshots)
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+            continue
+        for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS[name], counts):
+                cumulative += bucket
+                lines.append(f'{name}_bucket{_labels(labels + (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {count}')
+            lines.append(f'{name}_sum{_labels(labels)} {total}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+    for name, (help_text, func) in sorted(_gauges.items()):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        for labels, value in func():
+            lines.append(f'{name}{_labels(_key(labels))} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _allowed(request):
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    expected = getattr(settings, 'METRICS_TOKEN', '')
+    if expected and scheme.lower() == 'bearer':
+        return hmac.compare_digest(credentials.strip().encode(), expected.encode())
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    try:
+        result = TokenAuthentication().authenticate(Request(request))
+    except AuthenticationFailed:
+        return False
+    return result is not None and result[0].is_staff
+
+
+@require_GET
+def metrics_view(request):
+    if not _allowed(request):
+        return HttpResponseForbidden('Scrape with Authorization: Bearer <METRICS_TOKEN>.\n')
+    collector.flush()
+    return HttpResponse(
+        render(_load_snapshots()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,164 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core import metrics
+
+logger = logging.getLogger('core.timing')
+
+TIMING_DEFAULTS = {
+    'SAMPLE_RATE': 1.0,
+    'SLOW_REQUEST_MS': 500,
+    'SLOW_QUERY_MS': 100,
+}
+
+
+class QueryCounter:
+    """Execute wrapper that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, time.perf_counter() - start)
+
+    def record(self, sql, elapsed):
+        self.queries += 1
+        self.db_seconds += elapsed
+
+
+class RequestTiming(QueryCounter):
+    """Phase timings collected for one request."""
+
+    def __init__(self, slow_query_ms):
+        super().__init__()
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_finished = None
+        self.render_finished = None
+        self.slow_queries = []
+
+    def record(self, sql, elapsed):
+        super().record(sql, elapsed)
+        if elapsed >= self.slow_query_seconds:
+            self.slow_queries.append((elapsed, sql))
+
+    def phases(self, finished):
+        """Millisecond durations; `view` excludes time spent in the database."""
+        total = finished - self.started
+        phases = {'db': self.db_seconds, 'total': total}
+        if self.view_started is not None:
+            view_finished = self.view_finished or finished
+            phases['view'] = max(view_finished - self.view_started - self.db_seconds, 0.0)
+            if self.view_finished is not None:
+                phases['render'] = (self.render_finished or finished) - self.view_finished
+        return {name: round(seconds * 1000, 3) for name, seconds in phases.items()}
+
+
+class ServerTimingMiddleware:
+    """Report query count and DB/view/render/total time for each request.
+
+    Timings go out as a `Server-Timing` header and a JSON log line on the
+    `core.timing` logger. Requests slower than `SLOW_REQUEST_MS` are logged
+    at WARNING together with their queries slower than `SLOW_QUERY_MS`.
+    Only a `SAMPLE_RATE` fraction of requests is instrumented.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = {**TIMING_DEFAULTS, **getattr(settings, 'REQUEST_TIMING', {})}
+        self.sample_rate = config['SAMPLE_RATE']
+        self.slow_request_ms = config['SLOW_REQUEST_MS']
+        self.slow_query_ms = config['SLOW_QUERY_MS']
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timing = RequestTiming(self.slow_query_ms)
+        request.timing = timing
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timing))
+            response = self.get_response(request)
+        phases = timing.phases(time.perf_counter())
+
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration}' + (f';desc="{timing.queries} queries"' if name == 'db' else '')
+            for name, duration in phases.items()
+        )
+        self.log(request, response, timing, phases)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, 'timing', None)
+        if timing is not None:
+            timing.view_finished = time.perf_counter()
+            response.add_post_render_callback(lambda _: self._rendered(timing))
+        return response
+
+    def _rendered(self, timing):
+        timing.render_finished = time.perf_counter()
+
+    def log(self, request, response, timing, phases):
+        slow = phases['total'] >= self.slow_request_ms
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': match.route if match else None,
+            'status': response.status_code,
+            'queries': timing.queries,
+            **{f'{name}_ms': duration for name, duration in phases.items()},
+        }
+        if slow:
+            record['slow_queries'] = [
+                {'ms': round(elapsed * 1000, 3), 'sql': sql}
+                for elapsed, sql in sorted(timing.slow_queries, reverse=True)
+            ]
+        logger.log(level, json.dumps(record))
+
+
+class MetricsMiddleware:
+    """Feed per-route request, latency and query metrics to `core.metrics`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        metrics.inc('jat_http_requests_total', route=route, method=request.method,
+                    status=str(response.status_code))
+        metrics.observe('jat_http_request_duration_seconds', elapsed,
+                        route=route, method=request.method)
+        metrics.observe('jat_db_queries_per_request', counter.queries, route=route)
+        metrics.observe('jat_db_time_seconds', counter.db_seconds, route=route)
+        return response
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:07
+
+from django.db import migrations, models
+
+
+def backfill_directory(apps, schema_editor):
+    # Before sharding every user lived on the default database.
+    if schema_editor.connection.alias != 'default':
+        return
+    User = apps.get_model('core', 'User')
+    Token = apps.get_model('authtoken', 'Token')
+    UserShard = apps.get_model('core', 'UserShard')
+    tokens = dict(Token.objects.values_list('user_id', 'key'))
+    UserShard.objects.bulk_create([
+        UserShard(user_id=user_id, public_id=public_id, email=email, shard='default',
+                  token_key=tokens.get(user_id))
+        for user_id, public_id, email in User.objects.values_list('id', 'public_id', 'email')
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_alter_application_note'),
+        ('authtoken', '0003_tokenproxy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(unique=True)),
+                ('public_id', models.UUIDField(unique=True)),
+                ('email', models.EmailField(max_length=255, unique=True)),
+                ('shard', models.CharField(max_length=64)),
+                ('token_key', models.CharField(blank=True, max_length=40, null=True, unique=True)),
+                ('locked', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.RunPython(backfill_directory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_tables(apps, schema_editor):
+    # Opt-in (DB_PARTITIONING); `manage.py partition_tables` does the same later.
+    connection = schema_editor.connection
+    if not settings.DB_PARTITIONING or connection.vendor != 'postgresql':
+        return
+    from core.partitioning import convert_all
+    convert_all(connection, settings.DB_PARTITIONING, settings.DB_PARTITION_COUNT)
+
+
+class Migration(migrations.Migration):
+    # Rows are copied in batches that commit on their own.
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_usershard'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_usage(apps, schema_editor):
+    Tag = apps.get_model('core', 'Tag')
+    using = schema_editor.connection.alias
+    for owner, column in [('Company', 'company_uses'), ('Resume', 'resume_uses'),
+                          ('Application', 'application_uses'), ('Interview', 'interview_uses')]:
+        through = apps.get_model('core', owner).tags.through
+        links = (through.objects.filter(tag_id=OuterRef('pk'))
+                 .order_by().values('tag_id').annotate(n=Count('*')).values('n'))
+        Tag.objects.using(using).update(**{column: Coalesce(Subquery(links), Value(0))})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_deletion_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='application_uses',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='company_uses',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='interview_uses',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='resume_uses',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='company',
+            name='unique_user_company',
+        ),
+        migrations.RemoveConstraint(
+            model_name='country',
+            name='unique_user_country',
+        ),
+        migrations.RemoveConstraint(
+            model_name='tag',
+            name='unique_user_tag',
+        ),
+        migrations.AddConstraint(
+            model_name='company',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleting', False)), fields=('user', 'name'), name='unique_user_company'),
+        ),
+        migrations.AddConstraint(
+            model_name='country',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleting', False)), fields=('user', 'name'), name='unique_user_country'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleting', False)), fields=('user', 'name'), name='unique_user_tag'),
+        ),
+    ]
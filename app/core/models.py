@@ -54,14 +54,36 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+class UserShard(models.Model):
+    """Directory entry: which database holds a user's rows.
+
+    Lives only on the default database and is kept in sync by signals
+    (see core.sharding); authentication looks users up here first.
+    """
+    user_id = models.BigIntegerField(unique=True)
+    public_id = models.UUIDField(unique=True)
+    email = models.EmailField(max_length=255, unique=True)
+    shard = models.CharField(max_length=64)
+    token_key = models.CharField(max_length=40, null=True, blank=True, unique=True)
+    locked = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.email} @ {self.shard}"
+
+
 class Country(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    deleting = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         constraints = [
-            models.UniqueConstraint(fields=['user', 'name'], name='unique_user_country')
+            models.UniqueConstraint(
+                fields=['user', 'name'], condition=models.Q(deleting=False), name='unique_user_country',
+            )
         ]
+        indexes = [models.Index(fields=['user', 'updated_at'], name='country_user_updated_idx')]
 
     def __str__(self):
         return self.name
@@ -70,15 +92,29 @@ class Country(models.Model):
 class Tag(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    deleting = models.BooleanField(default=False)
+    # Maintained by core.tagging; `manage.py reconcile_tag_usage` fixes drift.
+    company_uses = models.PositiveIntegerField(default=0)
+    resume_uses = models.PositiveIntegerField(default=0)
+    application_uses = models.PositiveIntegerField(default=0)
+    interview_uses = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         constraints = [
-            models.UniqueConstraint(fields=['user', 'name'], name='unique_user_tag')
+            models.UniqueConstraint(
+                fields=['user', 'name'], condition=models.Q(deleting=False), name='unique_user_tag',
+            )
         ]
+        indexes = [models.Index(fields=['user', 'updated_at'], name='tag_user_updated_idx')]
 
     def __str__(self):
         return self.name
 
+    @property
+    def usage(self):
+        return self.company_uses + self.resume_uses + self.application_uses + self.interview_uses
+
 
 class Company(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -86,11 +122,16 @@ class Company(models.Model):
     country = models.ForeignKey(Country, null=True, blank=True, on_delete=models.SET_NULL)
     link = models.URLField(null=True, blank=True)
     tags = models.ManyToManyField(Tag)
+    deleting = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         constraints = [
-            models.UniqueConstraint(fields=['user', 'name'], name='unique_user_company')
+            models.UniqueConstraint(
+                fields=['user', 'name'], condition=models.Q(deleting=False), name='unique_user_company',
+            )
         ]
+        indexes = [models.Index(fields=['user', 'updated_at'], name='company_user_updated_idx')]
 
     def __str__(self):
         return self.name
@@ -103,6 +144,9 @@ class Resume(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     tags = models.ManyToManyField(Tag)
 
+    class Meta:
+        indexes = [models.Index(fields=['user', 'updated_at'], name='resume_user_updated_idx')]
+
     def __str__(self):
         return f"Resume created @ {str(self.created_at)}"
 
@@ -120,6 +164,9 @@ class Application(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['user', 'updated_at'], name='application_user_updated_idx')]
+
     def __str__(self):
         return f"{self.position} @ {self.company.name}"
 
@@ -130,6 +177,105 @@ class Interview(models.Model):
     tags = models.ManyToManyField(Tag)
     date = models.DateField()
     note = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'updated_at'], name='interview_user_updated_idx')]
 
     def __str__(self):
         return f"{self.application.company.name} on {str(self.date)}"
+
+
+class ArchivedApplication(models.Model):
+    """A closed application moved out of `core_application`; keeps its id."""
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE)
+    country = models.ForeignKey(Country, null=True, blank=True, on_delete=models.SET_NULL)
+    tags = models.ManyToManyField(Tag, related_name='+')
+    resume = models.ForeignKey(Resume, null=True, blank=True, on_delete=models.SET_NULL)
+    position = models.CharField(max_length=255)
+    link = models.URLField(null=True, blank=True)
+    note = models.TextField(null=True, blank=True)
+    status = models.CharField(max_length=32, choices=APPLICATION_STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.position} @ {self.company.name} (archived)"
+
+
+class ArchivedInterview(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    application = models.ForeignKey(ArchivedApplication, on_delete=models.CASCADE)
+    tags = models.ManyToManyField(Tag, related_name='+')
+    date = models.DateField()
+    note = models.TextField()
+
+    def __str__(self):
+        return f"{self.application.company.name} on {str(self.date)} (archived)"
+
+
+class DeletionJob(models.Model):
+    """Background removal of an object and everything that cascades from it.
+
+    `user_id` is the requester and deliberately not a foreign key, so the job
+    outlives a user who deletes their own account.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    user_id = models.BigIntegerField()
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveBigIntegerField(null=True, blank=True)
+    processed = models.PositiveBigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    lease_expires = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'id'])]
+
+    def __str__(self):
+        return f"Delete {self.model} #{self.object_id} ({self.status})"
+
+
+class Tombstone(models.Model):
+    """A deleted row, kept for `SYNC_TOMBSTONE_DAYS` so delta syncs can drop it."""
+    user_id = models.BigIntegerField()
+    model = models.CharField(max_length=32)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user_id', 'deleted_at'])]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted @ {self.deleted_at}"
+
+
+class IdempotencyKey(models.Model):
+    """A POST's `Idempotency-Key` and its response, replayed on retries for `IDEMPOTENCY_KEY_HOURS`."""
+    user_id = models.BigIntegerField()
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status = models.PositiveSmallIntegerField(null=True)
+    content_type = models.CharField(max_length=255, blank=True)
+    body = models.BinaryField(default=bytes)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['user_id', 'key'], name='idempotency_key_unique')]
+        indexes = [models.Index(fields=['created_at'])]
+
+    def __str__(self):
+        return f"{self.key} ({self.status}) @ {self.created_at}"
@@ -0,0 +1,6 @@
+TRUTHY = ('1', 'true', 'yes')
+
+
+def truthy(value):
+    """Whether a query parameter or header value opts in (`1`, `true` or `yes`)."""
+    return (value or '').lower() in TRUTHY
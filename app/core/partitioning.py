@@ -0,0 +1,261 @@
+"""Optional PostgreSQL declarative partitioning of the largest tables.
+
+`core_application`, `core_interview` and their tag through-tables are
+converted online: a partitioned copy is created next to each table, a
+trigger mirrors writes into it while existing rows are copied over in
+batches, then the two are swapped under a short ACCESS EXCLUSIVE lock.
+
+Strategies:
+- `hash`: applications and interviews by `user_id`, so every per-user
+  query the API runs touches a single partition;
+- `range`: applications by `created_at`, interviews by `date`, one
+  partition per year plus a default partition.
+Through-tables are always hashed by their parent's id.
+
+PostgreSQL needs the partition key in every primary key and unique index,
+and foreign keys cannot reference a partitioned table without it. Primary
+keys become `(id, key)`, foreign keys pointing at the converted tables are
+dropped (Django enforces them and emulates ON DELETE itself), and the ORM
+keeps addressing rows by `id` alone.
+"""
+import json
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+STRATEGIES = ('hash', 'range')
+
+# table, hash key, range key (None: always hashed)
+TABLES = [
+    ('core_application', 'user_id', 'created_at'),
+    ('core_interview', 'user_id', 'date'),
+    ('core_application_tags', 'application_id', None),
+    ('core_interview_tags', 'interview_id', None),
+]
+PARTITIONED = {table for table, _, _ in TABLES}
+
+
+def _name(base, suffix):
+    """Identifier `base + suffix` within PostgreSQL's 63-byte limit."""
+    return base[:63 - len(suffix)] + suffix
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid '
+        'WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace',
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def partitions_of(cursor, table):
+    cursor.execute(
+        'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = %s::regclass ORDER BY c.relname',
+        [table],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+class TableConversion:
+    """Convert one table; each step can be run and re-run on its own."""
+
+    def __init__(self, connection, table, hash_key, range_key, strategy, partitions, log=None):
+        self.connection = connection
+        self.table = table
+        self.new = _name(table, '_p')
+        self.legacy = _name(table, '_legacy')
+        self.trigger = _name(table, '_p_sync')
+        self.sequence = _name(table, '_pid_seq')
+        self.partitions = partitions
+        if strategy == 'range' and range_key:
+            self.method, self.key = 'RANGE', range_key
+        else:
+            self.method, self.key = 'HASH', hash_key
+        self.log = log or (lambda message: None)
+
+    def execute(self, sql, params=None):
+        with self.connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall() if cursor.description else None
+
+    def create(self):
+        """Partitioned copy with its partitions, indexes and outgoing FKs."""
+        # Leftovers of an interrupted run.
+        self.execute(f'DROP TRIGGER IF EXISTS {self.trigger} ON {self.table}')
+        self.execute(f'DROP TABLE IF EXISTS {self.new} CASCADE')
+        self.execute(f'CREATE TABLE {self.new} (LIKE {self.table}) PARTITION BY {self.method} ({self.key})')
+        self.execute(f'ALTER TABLE {self.new} ADD PRIMARY KEY (id, {self.key})')
+        if self.method == 'HASH':
+            for remainder in range(self.partitions):
+                self.execute(
+                    f'CREATE TABLE {self.new}{remainder} PARTITION OF {self.new} '
+                    f'FOR VALUES WITH (MODULUS {self.partitions}, REMAINDER {remainder})'
+                )
+        else:
+            first = self.execute(f'SELECT min({self.key}) FROM {self.table}')[0][0]
+            current = timezone.now().year
+            for year in range(min(first.year if first else current, current), current + 2):
+                self.execute(
+                    f'CREATE TABLE {self.new}{year} PARTITION OF {self.new} '
+                    f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+                )
+            self.execute(f'CREATE TABLE {self.new}_default PARTITION OF {self.new} DEFAULT')
+
+        indexes = self.execute(
+            'SELECT i.relname, pg_get_indexdef(x.indexrelid), x.indisunique, '
+            'ARRAY(SELECT a.attname FROM pg_attribute a '
+            '      WHERE a.attrelid = x.indrelid AND a.attnum = ANY(x.indkey)) '
+            'FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid '
+            'WHERE x.indrelid = %s::regclass AND NOT x.indisprimary',
+            [self.table],
+        )
+        for name, definition, unique, columns in indexes:
+            if unique and self.key not in columns:
+                self.log(f'  skipping unique index {name}: it does not include {self.key}')
+                continue
+            definition = re.sub(r' ON (ONLY )?\S+ ', f' ON {self.new} ', definition, count=1)
+            definition = re.sub(r'INDEX \S+ ON', f'INDEX {_name(name, "_p")} ON', definition, count=1)
+            self.execute(definition)
+
+        foreign_keys = self.execute(
+            "SELECT conname, pg_get_constraintdef(oid), confrelid::regclass::text "
+            "FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [self.table],
+        )
+        for name, definition, referenced in foreign_keys:
+            if referenced.split('.')[-1].strip('"') in PARTITIONED:
+                continue
+            self.execute(f'ALTER TABLE {self.new} ADD CONSTRAINT {_name(name, "_p")} {definition}')
+
+    def sync(self):
+        """Mirror every write on the old table into the partitioned copy."""
+        self.execute(f'''
+            CREATE OR REPLACE FUNCTION {self.trigger}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    DELETE FROM {self.new} WHERE id = OLD.id;
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO {self.new} SELECT (NEW).* ON CONFLICT DO NOTHING;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        ''')
+        self.execute(f'DROP TRIGGER IF EXISTS {self.trigger} ON {self.table}')
+        self.execute(
+            f'CREATE TRIGGER {self.trigger} AFTER INSERT OR UPDATE OR DELETE ON {self.table} '
+            f'FOR EACH ROW EXECUTE FUNCTION {self.trigger}()'
+        )
+
+    def backfill(self, batch_size):
+        """Copy existing rows in id order; each batch commits on its own.
+
+        The batch's rows are locked FOR SHARE until it commits: an UPDATE or
+        DELETE of one waits, so its trigger finds (and replaces) the copy
+        instead of missing the uncommitted one and leaving it stale.
+        """
+        last_id, copied = -1, 0
+        while True:
+            with transaction.atomic(using=self.connection.alias):
+                batch_last, count = self.execute(
+                    f'WITH batch AS (SELECT * FROM {self.table} WHERE id > %s ORDER BY id LIMIT %s FOR SHARE), '
+                    f'copied AS (INSERT INTO {self.new} SELECT * FROM batch ON CONFLICT DO NOTHING) '
+                    'SELECT max(id), count(*) FROM batch',
+                    [last_id, batch_size],
+                )[0]
+            if not count:
+                return copied
+            last_id, copied = batch_last, copied + count
+
+    def swap(self, keep_legacy=False):
+        """Put the partitioned copy in place of the old table."""
+        with transaction.atomic(using=self.connection.alias):
+            self.execute(f'LOCK TABLE {self.table} IN ACCESS EXCLUSIVE MODE')
+            self.execute(f'DROP TRIGGER {self.trigger} ON {self.table}')
+            self.execute(f'DROP FUNCTION {self.trigger}()')
+            incoming = self.execute(
+                "SELECT conname, conrelid::regclass::text FROM pg_constraint "
+                "WHERE confrelid = %s::regclass AND contype = 'f'",
+                [self.table],
+            )
+            for name, referencing in incoming:
+                self.log(f'  dropping foreign key {name} on {referencing}')
+                self.execute(f'ALTER TABLE {referencing} DROP CONSTRAINT {name}')
+
+            last_id = self.execute(
+                f"SELECT GREATEST((SELECT max(id) FROM {self.table}), "
+                f"(SELECT last_value FROM pg_sequences WHERE schemaname = current_schema() "
+                f"AND sequencename = split_part(pg_get_serial_sequence(%s, 'id'), '.', 2)), 0)",
+                [self.table],
+            )[0][0]
+            self.execute(f'ALTER TABLE {self.table} RENAME TO {self.legacy}')
+            self.execute(f'ALTER TABLE {self.new} RENAME TO {self.table}')
+            self.execute(f'CREATE SEQUENCE {self.sequence} AS bigint')
+            self.execute('SELECT setval(%s, %s, false)', [self.sequence, last_id + 1])
+            self.execute(f"ALTER TABLE {self.table} ALTER COLUMN id SET DEFAULT nextval('{self.sequence}')")
+            self.execute(f'ALTER SEQUENCE {self.sequence} OWNED BY {self.table}.id')
+
+            if keep_legacy:
+                outgoing = self.execute(
+                    "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+                    [self.legacy],
+                )
+                for (name,) in outgoing:
+                    self.execute(f'ALTER TABLE {self.legacy} DROP CONSTRAINT {name}')
+            else:
+                self.execute(f'DROP TABLE {self.legacy}')
+        self.execute(f'ANALYZE {self.table}')
+
+    def run(self, batch_size=5000, keep_legacy=False):
+        with self.connection.cursor() as cursor:
+            if is_partitioned(cursor, self.table):
+                self.log(f'{self.table}: already partitioned')
+                return False
+        self.log(f'{self.table}: creating {self.method.lower()} partitions on {self.key}')
+        self.create()
+        self.sync()
+        copied = self.backfill(batch_size)
+        self.log(f'{self.table}: copied {copied} rows, swapping')
+        self.swap(keep_legacy=keep_legacy)
+        return True
+
+
+def convert_all(connection, strategy, partitions=16, batch_size=5000, keep_legacy=False, log=None):
+    if strategy not in STRATEGIES:
+        raise ValueError(f'Unknown partitioning strategy "{strategy}"; use one of {STRATEGIES}')
+    return [
+        TableConversion(connection, table, hash_key, range_key, strategy, partitions, log)
+        .run(batch_size=batch_size, keep_legacy=keep_legacy)
+        for table, hash_key, range_key in TABLES
+    ]
+
+
+def _relations(plan):
+    found = [plan['Relation Name']] if 'Relation Name' in plan else []
+    removed = plan.get('Subplans Removed', 0)
+    for child in plan.get('Plans', []):
+        child_found, child_removed = _relations(child)
+        found += child_found
+        removed += child_removed
+    return found, removed
+
+
+def explain(connection, queryset, table):
+    """How many of `table`'s partitions a queryset scans, and how long it takes."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}', params)
+        result = cursor.fetchone()[0]
+        total = len(partitions_of(cursor, table)) if is_partitioned(cursor, table) else 0
+    result = json.loads(result) if isinstance(result, str) else result
+    scanned, removed = _relations(result[0]['Plan'])
+    return {
+        'partitions': total,
+        'scanned': len([name for name in scanned if name != table]) if total else 0,
+        'runtime_pruned': removed,
+        'execution_ms': result[0]['Execution Time'],
+    }
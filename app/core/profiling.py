@@ -0,0 +1,138 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from contextlib import ExitStack
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from core.params import truthy
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = 'profile'
+
+
+class QueryRecorder:
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': self.alias,
+                'sql': sql,
+                'params': params,
+                'many': many,
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+            })
+
+
+def explain(query):
+    """Plan for a recorded SELECT; PostgreSQL plans come from EXPLAIN ANALYZE."""
+    if query['many'] or not query['sql'].lstrip().upper().startswith('SELECT'):
+        return None
+    connection = connections[query['alias']]
+    if connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS)'
+    elif connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN'
+    else:
+        prefix = 'EXPLAIN'
+    # EXPLAIN ANALYZE executes the statement; never let it commit anything.
+    with transaction.atomic(using=query['alias']):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {query["sql"]}', query['params'])
+            plan = '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+        transaction.set_rollback(True, using=query['alias'])
+    return plan
+
+
+class ProfilingMiddleware:
+    """Profile a single request on demand for staff users.
+
+    Send `X-Profile: 1` or `?profile=1` as a staff user (token or session)
+    to run the request under cProfile and capture every SQL statement with
+    its plan. The report is written to `PROFILING_DIR` and its id returned
+    in the `X-Profile-Id` response header. Other values (`0`, `false`)
+    leave the request alone, as does a missing flag.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not truthy(request.headers.get(PROFILE_HEADER)) and not truthy(request.GET.get(PROFILE_PARAM)):
+            return self.get_response(request)
+        if not self.is_staff(request):
+            return self.get_response(request)
+        return self.profile(request)
+
+    def is_staff(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        try:
+            result = TokenAuthentication().authenticate(Request(request))
+        except AuthenticationFailed:
+            return False
+        return result is not None and result[0].is_staff
+
+    def profile(self, request):
+        recorders = [QueryRecorder(connection.alias) for connection in connections.all()]
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection, recorder in zip(connections.all(), recorders):
+                stack.enter_context(connection.execute_wrapper(recorder))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        duration = time.perf_counter() - start
+
+        profile_id = f'{timezone.now():%Y%m%dT%H%M%S}-{uuid4().hex[:8]}'
+        queries = [query for recorder in recorders for query in recorder.queries]
+        max_explains = getattr(settings, 'PROFILING_MAX_EXPLAINS', 50)
+        for query in queries[:max_explains]:
+            query['plan'] = explain(query)
+
+        stats_text = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stats_text)
+        stats.sort_stats('cumulative').print_stats(getattr(settings, 'PROFILING_TOP_FUNCTIONS', 40))
+
+        directory = settings.PROFILING_DIR
+        os.makedirs(directory, exist_ok=True)
+        stats.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+        report = {
+            'id': profile_id,
+            'created_at': timezone.now().isoformat(),
+            'user': str(getattr(request.user, 'email', request.user)),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'query_count': len(queries),
+            'queries': queries,
+            'profile': stats_text.getvalue(),
+        }
+        with open(os.path.join(directory, f'{profile_id}.json'), 'w') as fh:
+            json.dump(report, fh, indent=2, default=str)
+
+        response['X-Profile-Id'] = profile_id
+        return response
@@ -0,0 +1,96 @@
+"""orjson-backed JSON and MessagePack renderers and parsers.
+
+Drop-in replacements for DRF's `JSONRenderer` and `JSONParser` that
+produce the same bytes for our payloads: datetimes, dates, times and
+UUIDs are encoded by orjson itself, everything else (decimals, lazy
+strings, querysets, ...) goes through DRF's own encoder. Without orjson
+installed, or when output is configured or requested to be indented or
+ASCII-only, both classes behave exactly like their DRF base classes.
+orjson only handles 64-bit integers; payloads with wider ones are left to
+the base classes too, so they stay exact.
+
+`application/msgpack` carries the same values as the JSON body in a
+binary encoding; settings only offer it when msgpack is installed.
+"""
+import io
+import re
+
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - exercised only without msgpack
+    msgpack = None
+
+# Integer dict keys (e.g. the `included` section) become strings, as with json.dumps.
+OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+# DRF escapes these so the output stays valid JavaScript.
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+# orjson reads integers outside 64 bits as floats; anything below -2**63 has 19 digits.
+_WIDE_INTEGER = re.compile(rb'\d{19}')
+
+_default = JSONEncoder().default
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        try:
+            ret = orjson.dumps(data, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            # Integers wider than 64 bits, or a value the base class rejects as well.
+            return super().render(data, accepted_media_type, renderer_context)
+        for char, escaped in _LINE_SEPARATORS:
+            ret = ret.replace(char, escaped)
+        return ret
+
+
+class JSONParser(parsers.JSONParser):
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if _WIDE_INTEGER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True)
+
+
+class MessagePackParser(parsers.BaseParser):
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
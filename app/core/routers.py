@@ -0,0 +1,219 @@
+"""Database routers: user shards and read replicas.
+
+`ShardRouter` keeps each user's rows on the shard the `UserShard` directory
+assigns them (see core.sharding); it stands aside when only the default
+database is configured.
+
+`ReplicaRoutingMiddleware` tags each request; `ReplicaRouter` sends the reads
+of GET/HEAD/OPTIONS requests to one of `REPLICA_DATABASES` and everything
+else to `default`. After a user writes, their reads stay on the primary for
+`REPLICA_PIN_SECONDS`. Pins live in the default cache, which every worker
+must share (`REDIS_URL`); `check_pin_cache` warns when it is per-process.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import JsonResponse
+
+from core import sharding
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Authentication reads always go to the primary so that a token or user
+# created a moment ago is found even while the replicas lag behind.
+PRIMARY_ONLY_MODELS = {'authtoken.token', 'sessions.session', 'core.user'}
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def pin_user(user_id):
+    seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+    if seconds > 0:
+        cache.set(_pin_key(user_id), 1, seconds)
+
+
+def is_pinned(user_id):
+    return cache.get(_pin_key(user_id)) is not None
+
+
+def check_pin_cache(app_configs, **kwargs):
+    """Pins written by one worker must be seen by the others."""
+    if not settings.REPLICA_DATABASES or not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache)):
+        return []
+    return [checks.Warning(
+        'Read replicas are configured but the default cache is not shared between processes, '
+        'so reads after a write may go to a lagging replica on another worker.',
+        hint='Set REDIS_URL to a Redis server all workers use.',
+        id='core.W001',
+    )]
+
+
+class ShardRouter:
+    """Route a user's rows to their shard.
+
+    The shard comes from, in order: the database the instance involved was
+    loaded from, the placement of a new user, the shard of the user an
+    unsaved row belongs to, and the shard made current for the request.
+    """
+
+    def _route(self, model, hints):
+        if not sharding.is_sharded():
+            return None
+        if sharding.is_global(model):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None:
+            if instance._state.db:
+                return instance._state.db
+            if instance._meta.label == settings.AUTH_USER_MODEL:
+                return sharding.place(instance.public_id)
+            user = instance._state.fields_cache.get('user')
+            if user is not None and user._state.db:
+                return user._state.db
+        return sharding.current_shard.get()
+
+    def db_for_read(self, model, **hints):
+        return self._route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._route(model, hints)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'core' and model_name == 'usershard':
+            return db == DEFAULT_DB_ALIAS
+        return None
+
+
+class ShardRoutingMiddleware:
+    """Make the shard of the token's user current for the request.
+
+    Unsafe requests from a user who is being moved between shards get a 503
+    with Retry-After; reads keep being served from the old shard.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not sharding.is_sharded():
+            return self.get_response(request)
+        entry = None
+        auth = request.META.get('HTTP_AUTHORIZATION', '').split()
+        if len(auth) == 2 and auth[0].lower() == 'token':
+            entry = sharding.lookup(token_key=auth[1])
+        if entry is not None and entry[1] and request.method not in SAFE_METHODS:
+            response = JsonResponse(
+                {'detail': 'Account is being moved, retry shortly.'}, status=503,
+            )
+            response['Retry-After'] = '5'
+            return response
+        token = sharding.current_shard.set(entry[0] if entry else None)
+        try:
+            return self.get_response(request)
+        finally:
+            sharding.current_shard.reset(token)
+
+
+class RequestRouting:
+    """Where the reads of one request go."""
+
+    def __init__(self, request, replicas):
+        self.request = request
+        self.replica = random.choice(replicas) if replicas and request.method in SAFE_METHODS else None
+        self.wrote = False
+        self.pins = {}
+
+    def read_alias(self):
+        if self.replica is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        user = getattr(self.request, 'user', None)
+        if user is not None and user.is_authenticated:
+            if user.pk not in self.pins:
+                self.pins[user.pk] = is_pinned(user.pk)
+            if self.pins[user.pk]:
+                return DEFAULT_DB_ALIAS
+        return self.replica
+
+
+class ReplicaRouter:
+    """Reads of safe requests go to a replica; everything else to the primary.
+
+    Code running outside a request (management commands, the shell, tests
+    without the middleware) always uses the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None or model._meta.label_lower in PRIMARY_ONLY_MODELS:
+            return None
+        return routing.read_alias()
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in getattr(settings, 'REPLICA_DATABASES', []):
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Set up replica routing for the request and pin users who wrote."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = getattr(settings, 'REPLICA_DATABASES', [])
+        routing = RequestRouting(request, replicas)
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote and replicas:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_user(user.pk)
+        return response
+
+
+def check_replicas():
+    """Readiness probe: every replica answers, with its replay lag on PostgreSQL."""
+    details = {}
+    for alias in settings.REPLICA_DATABASES:
+        connection = connections[alias]
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())'
+                )
+                lag = cursor.fetchone()[0]
+            else:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+                lag = None
+        details[alias] = {
+            'latency_ms': round((time.perf_counter() - start) * 1000, 3),
+            'lag_seconds': None if lag is None else round(float(lag), 3),
+        }
+    return details
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.core import checks
+from rest_framework.utils.encoders import JSONEncoder
+
+from core import metrics
+
+
+def generate_schema():
+    """Build the OpenAPI schema from the code, as plain JSON-compatible data."""
+    # drf-spectacular's generator pulls in most of the package (and
+    # django.test); keep it off the boot path unless a schema is needed.
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return json.loads(json.dumps(schema, cls=JSONEncoder))
+
+
+def load_schema_file():
+    path = getattr(settings, 'SCHEMA_FILE', None)
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+class SchemaCache:
+    """The schema and its rendered bodies, built once per process.
+
+    The schema comes from `SCHEMA_FILE` when the build produced one, and is
+    generated from the code otherwise. Each renderer's output is kept along
+    with an ETag so repeated requests cost a dict lookup.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.schema = None
+        self.rendered = {}
+
+    def get_schema(self):
+        if self.schema is None:
+            with self.lock:
+                if self.schema is None:
+                    self.schema = load_schema_file() or generate_schema()
+        return self.schema
+
+    def render(self, renderer):
+        key = renderer.media_type
+        cached = self.rendered.get(key)
+        metrics.record_cache('openapi_schema', hit=cached is not None)
+        if cached is None:
+            body = renderer.render(self.get_schema(), renderer.media_type, {})
+            etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+            cached = self.rendered[key] = (body, etag)
+        return cached
+
+    def clear(self):
+        self.schema = None
+        self.rendered = {}
+
+
+schema_cache = SchemaCache()
+
+
+def check_schema_drift(app_configs, **kwargs):
+    """`manage.py check --deploy` fails when SCHEMA_FILE no longer matches the code."""
+    cached = load_schema_file()
+    if cached is None or cached == generate_schema():
+        return []
+    return [checks.Error(
+        f'OpenAPI schema file {settings.SCHEMA_FILE} is out of date.',
+        hint='Regenerate it with: python manage.py spectacular '
+             f'--format openapi-json --file {settings.SCHEMA_FILE}',
+        id='core.E001',
+    )]
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from core.schema import schema_cache
+
+
+def cache_control(response):
+    response['Cache-Control'] = f'public, max-age={getattr(settings, "SCHEMA_CACHE_MAX_AGE", 3600)}'
+    return response
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """`SpectacularAPIView` served from `schema_cache` with ETag and max-age.
+
+    Requests for a specific `lang` or `version` fall back to generating
+    the schema on the fly.
+    """
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('lang') or request.GET.get('version'):
+            return super().get(request, *args, **kwargs)
+        body, etag = schema_cache.render(request.accepted_renderer)
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=request.accepted_renderer.media_type)
+            response['Content-Disposition'] = \
+                f'inline; filename="{self._get_filename(request, None)}"'
+        response['ETag'] = etag
+        return cache_control(response)
+
+
+class CachedSwaggerView(SpectacularSwaggerView):
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        return cache_control(response)
@@ -0,0 +1,188 @@
+"""Horizontal sharding by user.
+
+Each user's rows (the user itself, its token and every model with a `user`
+FK) live together on one of `SHARD_DATABASES`. The `UserShard` directory
+on the default database records where, and is what authentication uses to
+find a user before their shard is known. New users are placed by hashing
+`public_id`; `move_user_shard` moves existing ones.
+
+Every shard carries the full schema. On PostgreSQL the id sequences of
+shard N start at N * SHARD_ID_OFFSET so ids stay unique across shards and
+rows can move without renumbering.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from rest_framework.authtoken.models import Token
+
+from core.models import UserShard
+
+SHARD_ID_OFFSET = 10 ** 12
+
+# Shared tables read from the default database; every other model follows
+# the user it belongs to.
+DIRECTORY_MODELS = {'core.usershard'}
+GLOBAL_APPS = {'contenttypes', 'sessions'}
+GLOBAL_MODELS = {'auth.permission', 'auth.group', 'auth.group_permissions'}
+
+current_shard = ContextVar('current_shard', default=None)
+
+
+def shard_databases():
+    return getattr(settings, 'SHARD_DATABASES', [DEFAULT_DB_ALIAS])
+
+
+def is_sharded():
+    return len(shard_databases()) > 1
+
+
+def place(public_id):
+    """Shard for a new user."""
+    shards = shard_databases()
+    return shards[public_id.int % len(shards)]
+
+
+def is_global(model):
+    opts = model._meta
+    return opts.app_label in GLOBAL_APPS or opts.label_lower in GLOBAL_MODELS \
+        or opts.label_lower in DIRECTORY_MODELS
+
+
+@contextmanager
+def use_shard(alias):
+    """Route unhinted queries (e.g. `Tag.objects.filter(...)`) to `alias`."""
+    token = current_shard.set(alias)
+    try:
+        yield
+    finally:
+        current_shard.reset(token)
+
+
+def lookup(**filters):
+    """`(shard, locked)` from the directory, or None."""
+    return UserShard.objects.using(DEFAULT_DB_ALIAS) \
+        .filter(**filters).values_list('shard', 'locked').first()
+
+
+# Directory upkeep. Raw saves (fixtures, shard moves) and rows deleted from
+# a shard the directory no longer points at are left alone.
+
+def user_saved(sender, instance, created, raw, using, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'email' not in update_fields):
+        return
+    UserShard.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        user_id=instance.pk,
+        defaults={'public_id': instance.public_id, 'email': instance.email, 'shard': using},
+    )
+
+
+def user_deleted(sender, instance, using, **kwargs):
+    UserShard.objects.using(DEFAULT_DB_ALIAS).filter(user_id=instance.pk, shard=using).delete()
+
+
+def token_saved(sender, instance, raw, using, **kwargs):
+    if raw:
+        return
+    UserShard.objects.using(DEFAULT_DB_ALIAS) \
+        .filter(user_id=instance.user_id, shard=using).update(token_key=instance.key)
+
+
+def token_deleted(sender, instance, using, **kwargs):
+    UserShard.objects.using(DEFAULT_DB_ALIAS) \
+        .filter(user_id=instance.user_id, shard=using, token_key=instance.key).update(token_key=None)
+
+
+def offset_sequences(sender, using, **kwargs):
+    """post_migrate: move shard N's id sequences to N * SHARD_ID_OFFSET."""
+    shards = shard_databases()
+    connection = connections[using]
+    if using not in shards or shards.index(using) == 0 or connection.vendor != 'postgresql':
+        return
+    start = shards.index(using) * SHARD_ID_OFFSET
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for model, _, keep_ids in copy_plan():
+            pk = model._meta.pk
+            if not keep_ids or pk.get_internal_type() != 'BigAutoField':
+                continue
+            cursor.execute(
+                'SELECT setval(pg_get_serial_sequence(%s, %s), GREATEST(%s, '
+                f'(SELECT COALESCE(MAX({quote(pk.column)}), 0) + 1 FROM {quote(model._meta.db_table)})), false)',
+                [model._meta.db_table, pk.column, start],
+            )
+
+
+class ShardedModelBackend(ModelBackend):
+    """ModelBackend that finds the user's shard in the directory first.
+
+    The shard is also made current for the rest of the request, so the
+    token created on login lands next to the user.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        email = username or kwargs.get('email')
+        entry = lookup(email=email) if email and is_sharded() else None
+        if entry is not None:
+            current_shard.set(entry[0])
+        return super().authenticate(request, username=username, password=password, **kwargs)
+
+    def get_user(self, user_id):
+        entry = lookup(user_id=user_id) if is_sharded() else None
+        if entry is not None:
+            current_shard.set(entry[0])
+        return super().get_user(user_id)
+
+
+def copy_plan():
+    """Sharded models in insert order, as (model, lookup selecting one user's rows, keep_ids).
+
+    Admin log entries use 32-bit ids outside the shard offsets and are
+    copied with fresh ids.
+    """
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    plan = [
+        (User, 'pk', True),
+        (User.groups.through, 'user_id', True),
+        (User.user_permissions.through, 'user_id', True),
+        (Token, 'user_id', True),
+        (apps.get_model('admin', 'LogEntry'), 'user_id', False),
+        (apps.get_model('core', 'DeletionJob'), 'user_id', True),
+        (apps.get_model('core', 'Tombstone'), 'user_id', True),
+        (apps.get_model('core', 'IdempotencyKey'), 'user_id', True),
+    ]
+    for name in ['Country', 'Tag', 'Company', 'Resume', 'Application', 'Interview',
+                 'ArchivedApplication', 'ArchivedInterview']:
+        model = apps.get_model('core', name)
+        plan.append((model, 'user_id', True))
+        for field in model._meta.local_many_to_many:
+            plan.append((field.remote_field.through, f'{field.m2m_field_name()}__user_id', True))
+    return plan
+
+
+class ShardMoveError(Exception):
+    pass
+
+
+def copy_user(user_id, source, target):
+    """Copy a user's rows from `source` to `target` in one transaction.
+
+    Ids are kept, so the copy refuses to run if any of them is already taken
+    on the target. Returns the number of rows copied per model.
+    """
+    copied = {}
+    with transaction.atomic(using=target):
+        for model, lookup_name, keep_ids in copy_plan():
+            rows = list(model._base_manager.using(source).filter(**{lookup_name: user_id}))
+            if keep_ids and model._base_manager.using(target).filter(pk__in=[row.pk for row in rows]).exists():
+                raise ShardMoveError(f'{model._meta.label} ids already exist on {target}')
+            for row in rows:
+                if not keep_ids:
+                    row.pk = None
+                # Raw saves keep auto_now timestamps and skip the directory signals.
+                row.save_base(raw=True, force_insert=True, using=target)
+            copied[model._meta.label] = len(rows)
+    return copied
@@ -0,0 +1,130 @@
+import inspect
+import random
+import time
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.password_validation import get_default_password_validators
+from django.db import connections
+from django.db.utils import OperationalError
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.serializers import BaseSerializer
+
+# Project packages that are routed to but not listed in INSTALLED_APPS.
+PROJECT_PACKAGES = ['main', 'auth']
+WARM_UP_SUBMODULES = ['urls', 'views', 'serializers', 'admin']
+
+
+class DatabaseUnavailable(Exception):
+    pass
+
+
+def wait_for_database(alias='default', timeout=60.0, initial_delay=0.1, max_delay=5.0,
+                      on_retry=None):
+    """Connect to `alias`, retrying with exponential backoff and full jitter.
+
+    Raises `DatabaseUnavailable` once `timeout` seconds have passed without
+    a successful connection. Returns the number of attempts made.
+    """
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            connections[alias].ensure_connection()
+            return attempt
+        except OperationalError as exc:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DatabaseUnavailable(
+                    f'Database "{alias}" unavailable after {attempt} attempts: {exc}'
+                ) from exc
+            delay = min(remaining, random.uniform(0, min(max_delay, initial_delay * 2 ** attempt)))
+            if on_retry:
+                on_retry(attempt, delay, exc)
+            time.sleep(delay)
+
+
+def _import_project_modules():
+    # Third-party apps are left to the URLconf; importing all of their views
+    # would load optional machinery such as drf-spectacular's generator.
+    packages = [
+        config.name for config in apps.get_app_configs()
+        if config.path.startswith(str(settings.BASE_DIR))
+    ] + PROJECT_PACKAGES
+    modules = []
+    for package in packages:
+        for submodule in WARM_UP_SUBMODULES:
+            try:
+                modules.append(import_module(f'{package}.{submodule}'))
+            except ModuleNotFoundError as exc:
+                if exc.name not in (f'{package}.{submodule}', package):
+                    raise
+    return modules
+
+
+def _resolve_patterns(resolver):
+    count = 0
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            count += _resolve_patterns(pattern)
+        elif isinstance(pattern, URLPattern):
+            pattern.callback
+            count += 1
+    return count
+
+
+def _build_serializer_fields(modules):
+    count = 0
+    seen = set()
+    for module in modules:
+        if not module.__file__.startswith(str(settings.BASE_DIR)):
+            continue
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if not issubclass(cls, BaseSerializer) or cls.__module__ != module.__name__ \
+                    or cls in seen or not hasattr(cls, 'get_fields'):
+                continue
+            seen.add(cls)
+            cls().fields
+            count += 1
+    return count
+
+
+def warm_up():
+    """Do the one-off work a cold process would otherwise do on its first requests.
+
+    Imports the project apps' urls/views/serializers/admin modules, resolves
+    the whole URLconf (views wrapped in `core.lazy.lazy_view` stay unloaded),
+    builds the fields of every serializer the project defines, loads or
+    generates the OpenAPI schema and loads the password validators
+    (including the common-password list).
+    Returns a summary with the time taken by each step.
+    """
+    timings = {}
+    start = time.perf_counter()
+    modules = _import_project_modules()
+    timings['modules'] = len(modules)
+    timings['import_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    step = time.perf_counter()
+    resolver = get_resolver()
+    resolver.reverse_dict
+    timings['url_patterns'] = _resolve_patterns(resolver)
+    timings['urls_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    timings['serializers'] = _build_serializer_fields(modules)
+    timings['serializers_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    from core.schema import schema_cache
+    schema_cache.get_schema()
+    timings['schema_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    timings['password_validators'] = len(get_default_password_validators())
+    timings['password_validators_ms'] = round((time.perf_counter() - step) * 1000, 1)
+
+    timings['total_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
@@ -0,0 +1,120 @@
+"""Delta sync: what changed for a user since a cursor.
+
+Every synced model has an indexed `(user, updated_at)`. Saves stamp it
+through `auto_now`, tag link changes through `links_changed`, and deletes
+leave a `Tombstone` behind (`row_deleted`). Rows hidden for a background
+delete (`deleting`), and the applications and interviews of a company
+being deleted, already count as deleted. Deleting a tag or country
+does not touch the rows that referenced it: clients drop the reference
+along with the tombstoned object.
+
+A cursor is the server time taken before reading, moved back by
+`SYNC_OVERLAP_SECONDS`, so that rows a concurrent transaction commits late
+(or a host with a slightly slow clock stamps) are sent again rather than
+lost; clients apply rows as idempotent upserts. Tombstones are kept for
+`SYNC_TOMBSTONE_DAYS`, and an older cursor gets a full `reset` instead.
+"""
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.models import Application, Company, Country, Interview, Resume, Tag, Tombstone
+
+SYNCED = [Tag, Country, Company, Resume, Application, Interview]
+# Hidden along with the company above them, as in main.views.
+HIDDEN_WITH = {Application: 'company__', Interview: 'application__company__'}
+
+
+def _hidden_by(model):
+    """Lookup prefix of the row whose `deleting` flag hides `model`'s rows, or None."""
+    if any(field.name == 'deleting' for field in model._meta.concrete_fields):
+        return ''
+    return HIDDEN_WITH.get(model)
+
+
+def row_deleted(sender, instance, using, **kwargs):
+    Tombstone.objects.using(using).create(
+        user_id=instance.user_id, model=sender._meta.model_name, object_id=instance.pk,
+    )
+
+
+def links_changed(sender, instance, action, reverse, model, pk_set, using, **kwargs):
+    """Stamp the rows whose `tags` changed; `tag.<owner>_set` changes stamp the owners."""
+    owner = model if reverse else type(instance)
+    owners = owner._base_manager.using(using)
+    if action in ('post_add', 'post_remove') and pk_set:
+        owners = owners.filter(pk__in=pk_set) if reverse else owners.filter(pk=instance.pk)
+    elif action == 'pre_clear':
+        owners = owners.filter(tags=instance.pk) if reverse else owners.filter(pk=instance.pk)
+    else:
+        return
+    owners.update(updated_at=timezone.now())
+
+
+def forget(model, ids, using=DEFAULT_DB_ALIAS):
+    """Drop the tombstones of rows that exist again (restored from the archive)."""
+    Tombstone.objects.using(using).filter(model=model._meta.model_name, object_id__in=ids).delete()
+
+
+def prune(using=DEFAULT_DB_ALIAS):
+    """Delete tombstones past `SYNC_TOMBSTONE_DAYS`; returns how many."""
+    cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    return Tombstone.objects.using(using).filter(deleted_at__lt=cutoff).delete()[0]
+
+
+def format_cursor(moment):
+    return moment.astimezone(dt_timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def parse_cursor(value):
+    """The moment a `format_cursor` string stands for; ValueError if it is not one."""
+    moment = parse_datetime(value)
+    if moment is None or timezone.is_naive(moment):
+        raise ValueError(value)
+    return moment
+
+
+class Delta:
+    """What changed for `user` since `since` (None: everything, as a reset)."""
+
+    def __init__(self, user, since=None):
+        now = timezone.now()
+        if since is not None and since < now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+            since = None
+        self.since = since
+        self.reset = since is None
+        self.cursor = now - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        self.user = user
+
+    def changed(self, model):
+        """Live rows of `model` saved since the cursor."""
+        rows = model.objects.filter(user=self.user)
+        prefix = _hidden_by(model)
+        if prefix is not None:
+            rows = rows.filter(**{f'{prefix}deleting': False})
+        if self.since is not None:
+            rows = rows.filter(updated_at__gt=self.since)
+        return rows
+
+    def deleted(self):
+        """{model name: [ids]} deleted, or hidden for deletion, since the cursor."""
+        if self.since is None:
+            return {}
+        result = defaultdict(list)
+        tombstones = Tombstone.objects.filter(user_id=self.user.pk, deleted_at__gt=self.since)
+        for model, object_id in tombstones.values_list('model', 'object_id'):
+            result[model].append(object_id)
+        for model in SYNCED:
+            prefix = _hidden_by(model)
+            if prefix is None:
+                continue
+            # Hiding stamps the hidden row, not the rows below it.
+            hidden = model.objects.filter(
+                user=self.user, **{f'{prefix}deleting': True, f'{prefix}updated_at__gt': self.since},
+            )
+            result[model._meta.model_name] += hidden.values_list('pk', flat=True)
+        return {model: ids for model, ids in result.items() if ids}
@@ -0,0 +1,94 @@
+"""Per-tag usage counters.
+
+Each tag carries how many companies, resumes, applications and interviews
+use it, so the tag cloud needs no COUNT joins over the M2M tables. The
+counters follow `m2m_changed` on the four `tags` relations (both
+directions) and `pre_delete` of the owning rows, whose links the ORM
+removes without an `m2m_changed`. Code that writes links in bulk (seed
+data, archive restore, background deletes) calls `reconcile` instead.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from core.models import Application, Company, Interview, Resume, Tag
+
+# owner model -> counter column
+COUNTERS = {
+    Company: 'company_uses',
+    Resume: 'resume_uses',
+    Application: 'application_uses',
+    Interview: 'interview_uses',
+}
+
+
+def _owner_column(through):
+    """`company_id`-style column of a `<Owner>.tags` through model."""
+    for model in COUNTERS:
+        if model.tags.through is through:
+            return model, f'{model.tags.field.m2m_field_name()}_id'
+    raise LookupError(through)
+
+
+def _bump(using, column, tag_ids, amount):
+    if not tag_ids or not amount:
+        return
+    Tag.objects.using(using).filter(pk__in=tag_ids).update(
+        **{column: Greatest(F(column) + amount, Value(0))}
+    )
+
+
+def tags_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    model, owner = _owner_column(sender)
+    column = COUNTERS[model]
+    links = sender.objects.using(using)
+    if action == 'post_add' and pk_set:
+        # pk_set only holds the links that were actually inserted.
+        if reverse:
+            _bump(using, column, [instance.pk], len(pk_set))
+        else:
+            _bump(using, column, list(pk_set), 1)
+    elif action == 'pre_remove' and pk_set:
+        # pk_set may name links that do not exist; count the real ones.
+        if reverse:
+            removed = links.filter(tag_id=instance.pk, **{f'{owner}__in': pk_set}).count()
+            _bump(using, column, [instance.pk], -removed)
+        else:
+            removed = links.filter(**{owner: instance.pk}, tag_id__in=pk_set)
+            _bump(using, column, list(removed.values_list('tag_id', flat=True)), -1)
+    elif action == 'pre_clear':
+        if reverse:
+            Tag.objects.using(using).filter(pk=instance.pk).update(**{column: 0})
+        else:
+            removed = links.filter(**{owner: instance.pk}).values_list('tag_id', flat=True)
+            _bump(using, column, list(removed), -1)
+
+
+def owner_deleted(sender, instance, using, **kwargs):
+    _, owner = _owner_column(sender.tags.through)
+    links = sender.tags.through.objects.using(using).filter(**{owner: instance.pk})
+    _bump(using, COUNTERS[sender], list(links.values_list('tag_id', flat=True)), -1)
+
+
+def actual_counts():
+    """Annotations counting each tag's links, one correlated subquery per relation."""
+    annotations = {}
+    for model, column in COUNTERS.items():
+        links = (model.tags.through.objects.filter(tag_id=OuterRef('pk'))
+                 .order_by().values('tag_id').annotate(n=Count('*')).values('n'))
+        annotations[column] = Coalesce(Subquery(links), Value(0))
+    return annotations
+
+
+def reconcile(queryset=None, using=DEFAULT_DB_ALIAS, batch_size=1000):
+    """Recount `queryset`'s tags (default: all) and fix drifted ones; returns how many."""
+    queryset = (Tag.objects.all() if queryset is None else queryset).using(using)
+    actual = actual_counts()
+    expected = queryset.annotate(**{f'actual_{column}': expr for column, expr in actual.items()})
+    drifted = Q()
+    for column in COUNTERS.values():
+        drifted |= ~Q(**{column: F(f'actual_{column}')})
+    ids = list(expected.filter(drifted).values_list('pk', flat=True))
+    for start in range(0, len(ids), batch_size):
+        Tag.objects.using(using).filter(pk__in=ids[start:start + batch_size]).update(**actual)
+    return len(ids)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.archive import archive, archivable
+from core.models import Application, ArchivedApplication, ArchivedInterview, Interview, Tag
+from core.tests.test_application_api import sample_application, sample_tag
+
+User = get_user_model()
+
+INTERVIEWS_URL = reverse('interview-list-create')
+
+
+def detail_url(app_id):
+    return reverse('app-detail', kwargs={'id': app_id})
+
+
+def closed_application(user, status='rejected', days_ago=365):
+    application = sample_application(user)
+    application.tags.add(sample_tag(user))
+    interview = Interview.objects.create(user=user, application=application,
+                                         date='2024-01-10', note='Phone screen')
+    interview.tags.add(sample_tag(user))
+    Application.objects.filter(id=application.id).update(
+        status=status, updated_at=timezone.now() - timedelta(days=days_ago),
+    )
+    application.refresh_from_db()
+    return application
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_only_old_closed_applications_are_archivable(self):
+        old = closed_application(self.user)
+        closed_application(self.user, days_ago=1)
+        closed_application(self.user, status='interviewing')
+        self.assertEqual(list(archivable().values_list('id', flat=True)), [old.id])
+
+    def test_archive_and_restore_round_trip(self):
+        application = closed_application(self.user, status='accepted')
+        interview = application.interview_set.get()
+        tags = set(application.tags.values_list('id', flat=True))
+        interview_tags = set(interview.tags.values_list('id', flat=True))
+
+        out = StringIO()
+        call_command('archive_applications', '--batch-size', '1', stdout=out)
+        self.assertIn('Archived 1 applications and 1 interviews', out.getvalue())
+        self.assertFalse(Application.objects.exists())
+        self.assertFalse(Interview.objects.exists())
+        self.assertEqual(Tag.objects.get(id__in=tags).application_uses, 0)
+        archived = ArchivedApplication.objects.get(id=application.id)
+        self.assertEqual(set(archived.tags.values_list('id', flat=True)), tags)
+        self.assertEqual(set(ArchivedInterview.objects.get(id=interview.id).tags.values_list('id', flat=True)),
+                         interview_tags)
+
+        call_command('archive_applications', '--restore', str(application.id), stdout=StringIO())
+        restored = Application.objects.get(id=application.id)
+        self.assertEqual((restored.status, restored.created_at), (application.status, application.created_at))
+        # The restore is a change as far as delta syncs are concerned.
+        self.assertGreater(restored.updated_at, application.updated_at)
+        self.assertEqual(set(restored.tags.values_list('id', flat=True)), tags)
+        self.assertEqual(set(Interview.objects.get(id=interview.id).tags.values_list('id', flat=True)),
+                         interview_tags)
+        self.assertFalse(ArchivedApplication.objects.exists())
+        self.assertFalse(ArchivedInterview.objects.exists())
+        self.assertEqual(Tag.objects.get(id__in=tags).application_uses, 1)
+
+    def test_archived_rows_are_read_with_archive_parameter(self):
+        application = closed_application(self.user)
+        archive()
+
+        res = self.client.get(detail_url(application.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.get(detail_url(application.id), {'archive': 'true'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['position'], application.position)
+        self.assertIn('archived_at', res.data)
+
+        self.assertEqual(self.client.get(INTERVIEWS_URL).data, [])
+        res = self.client.get(INTERVIEWS_URL, {'archive': 'true'})
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['application'], application.id)
+
+    def test_restore_endpoint(self):
+        application = closed_application(self.user)
+        archive()
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        url = reverse('app-restore', kwargs={'id': application.id})
+
+        client = APIClient()
+        client.force_authenticate(other)
+        self.assertEqual(client.post(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        res = self.client.post(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['id'], application.id)
+        self.assertEqual(self.client.get(detail_url(application.id)).status_code, status.HTTP_200_OK)
+
+    def test_restore_endpoint_conflicts_with_a_concurrent_move(self):
+        application = closed_application(self.user)
+        archive()
+        # What restore() returns when another transaction holds the row lock.
+        with mock.patch('main.views.restore', return_value=(0, 0)):
+            res = self.client.post(reverse('app-restore', kwargs={'id': application.id}))
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Application.objects.filter(id=application.id).exists())
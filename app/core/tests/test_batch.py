@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, Company, Interview, Tag
+
+User = get_user_model()
+
+BATCH_URL = reverse('batch')
+
+
+class BatchApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def batch(self, *operations):
+        return self.client.post(BATCH_URL, {'operations': list(operations)}, format='json')
+
+    def test_requires_auth(self):
+        res = APIClient().post(BATCH_URL, {'operations': []}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_later_operations_refer_to_earlier_results(self):
+        res = self.batch(
+            {'method': 'POST', 'path': '/api/company/', 'body': {'name': 'Acme'}},
+            {'method': 'POST', 'path': '/api/application/',
+             'body': {'company_id': '{{0.id}}', 'position': 'Backend Engineer', 'status': 'applied'}},
+            {'method': 'POST', 'path': '/api/interview/',
+             'body': {'application': '{{1.id}}', 'date': '2024-01-15', 'note': 'Interview at {{0.name}}'}},
+            {'method': 'GET', 'path': '/api/company/{{0.id}}?fields=name'},
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.data['results']
+        self.assertEqual([r['status'] for r in results], [201, 201, 201, 200])
+        interview = Interview.objects.get()
+        self.assertEqual(interview.application.company.name, 'Acme')
+        self.assertEqual(interview.note, 'Interview at Acme')
+        self.assertEqual(interview.application.user, self.user)
+        self.assertEqual(results[3]['body'], {'name': 'Acme'})
+
+    def test_failure_rolls_back_the_whole_batch(self):
+        res = self.batch(
+            {'method': 'POST', 'path': '/api/tags/', 'body': {'name': 'backend'}},
+            {'method': 'POST', 'path': '/api/application/', 'body': {'position': 'Backend Engineer'}},
+            {'method': 'POST', 'path': '/api/tags/', 'body': {'name': 'never-run'}},
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([r['status'] for r in res.data['results']], [201, 400])
+        self.assertFalse(Tag.objects.exists())
+        self.assertFalse(Application.objects.exists())
+
+    def test_operations_act_as_the_batch_user(self):
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        company = Company.objects.create(user=other, name='Theirs')
+        res = self.batch({'method': 'DELETE', 'path': f'/api/company/{company.id}'})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Company.objects.filter(id=company.id).exists())
+
+    def test_only_api_views_can_be_batched(self):
+        for path in ['/api/batch/', '/api/events/', '/api/nowhere/', '/admin/']:
+            res = self.batch({'method': 'GET', 'path': path})
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND, path)
+
+    def test_unresolvable_reference(self):
+        res = self.batch(
+            {'method': 'POST', 'path': '/api/tags/', 'body': {'name': 'backend'}},
+            {'method': 'PATCH', 'path': '/api/tags/{{0.missing}}/', 'body': {'name': 'frontend'}},
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('{{0.missing}}', res.data['results'][1]['body']['detail'])
+        res = self.batch({'method': 'GET', 'path': '/api/tags/{{1.id}}/'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tag.objects.exists())
+
+    @override_settings(BATCH_MAX_OPERATIONS=2)
+    def test_rejects_invalid_batches(self):
+        operation = {'method': 'GET', 'path': '/api/tags/'}
+        for payload in [{'operations': []}, {'operations': [operation] * 3},
+                        {'operations': [{'method': 'TRACE', 'path': '/api/tags/'}]}]:
+            res = self.client.post(BATCH_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('operations', res.data)
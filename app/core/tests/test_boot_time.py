@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.importtime import LAZY_MODULES, aggregate, measure_boot, parse
+from core.schema import generate_schema
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     django.utils.version
+import time:       300 |        420 |   django.utils
+import time:        80 |        500 | django
+import time:      1000 |       1000 | yaml
+"""
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_parse_and_aggregate(self):
+        rows = parse(SAMPLE)
+        self.assertEqual(rows[0], ('django.utils.version', 120, 120, 2))
+        packages = aggregate(rows)
+        self.assertEqual(packages[0][0], 'yaml')
+        self.assertEqual(dict(packages)['django'], {'self_us': 500, 'modules': 3})
+
+    def test_command_reports_packages(self):
+        out = StringIO()
+        call_command('importtime', '--module', 'core.lazy', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertIn('django', [package['package'] for package in report['packages']])
+        self.assertGreater(report['total_ms'], 0)
+
+
+class ColdBootTests(SimpleTestCase):
+    def test_wsgi_boot_within_budget(self):
+        seconds = min(measure_boot('app.wsgi')['seconds'] for _ in range(2))
+        self.assertLess(
+            seconds, settings.WSGI_BOOT_BUDGET_SECONDS,
+            f'Cold import of app.wsgi took {seconds:.2f}s; '
+            'run `python manage.py importtime` to see where the time goes.',
+        )
+
+    def test_schema_views_load_lazily(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'openapi-schema.json')
+            with open(path, 'w') as fh:
+                json.dump(generate_schema(), fh)
+            boot = measure_boot('app.wsgi', env={'SCHEMA_FILE': path, 'WARM_UP_ON_STARTUP': 'true'})
+        self.assertIn('main.views', boot['modules'])
+        for module in LAZY_MODULES:
+            self.assertNotIn(module, boot['modules'])
@@ -0,0 +1,191 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.deletion import claim
+from core.models import Application, Company, Country, DeletionJob, Interview, Tag
+from core.tests.test_application_api import sample_application, sample_country, sample_tag
+
+User = get_user_model()
+
+COMPANIES_URL = reverse('company-list-create')
+ME_URL = reverse('me')
+
+
+def company_url(company_id):
+    return reverse('company-update-destroy', kwargs={'id': company_id})
+
+
+def process():
+    call_command('process_deletions', '--once', '--batch-size', '2', stdout=StringIO())
+
+
+class AsyncDeleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_applications(self, company, count):
+        for _ in range(count):
+            application = Application.objects.create(
+                user=self.user, company=company, position='Engineer', status='applied',
+            )
+            application.tags.add(sample_tag(self.user))
+            Interview.objects.create(user=self.user, application=application,
+                                     date='2025-01-10', note='Call')
+
+    def test_company_is_hidden_then_removed_in_batches(self):
+        company = sample_application(self.user).company
+        self.add_applications(company, 3)
+
+        res = self.client.delete(company_url(company.id) + '?async=true')
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(res.data['status'], 'pending')
+        job_url = reverse('deletion-detail', kwargs={'id': res.data['id']})
+        self.assertTrue(res['Location'].endswith(job_url))
+        self.assertEqual(self.client.get(COMPANIES_URL).data, [])
+        self.assertEqual(self.client.get(company_url(company.id)).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(Application.objects.count(), 4)
+
+        process()
+
+        self.assertFalse(Company.objects.exists())
+        self.assertFalse(Application.objects.exists())
+        self.assertFalse(Interview.objects.exists())
+        self.assertFalse(Application.tags.through.objects.exists())
+        self.assertEqual(Tag.objects.count(), 3)
+        res = self.client.get(job_url)
+        self.assertEqual(res.data['status'], 'done')
+        self.assertEqual(res.data['processed'], res.data['total'])
+        self.assertEqual(res.data['progress'], 1.0)
+
+    def test_dependents_of_a_hidden_company_are_hidden(self):
+        application = sample_application(self.user)
+        interview = Interview.objects.create(user=self.user, application=application, date='2025-01-10')
+        self.client.delete(company_url(application.company_id) + '?async=true')
+
+        interview_url = reverse('interview-detail', kwargs={'id': interview.id})
+        self.assertEqual(self.client.get(reverse('interview-list-create')).data, [])
+        self.assertEqual(self.client.get(interview_url).status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.get(reverse('app-detail', kwargs={'id': application.id}))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.post(reverse('interview-list-create'), {'application': application.id, 'date': '2025-02-01'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_hidden_tags_and_countries_are_left_out_of_embeds(self):
+        tag, kept, country = sample_tag(self.user), sample_tag(self.user), sample_country(self.user)
+        application = sample_application(self.user)
+        Application.objects.filter(id=application.id).update(country=country)
+        Company.objects.filter(id=application.company_id).update(country=country)
+        application.tags.add(tag, kept)
+        application.company.tags.add(tag, kept)
+        interview = Interview.objects.create(user=self.user, application=application, date='2025-01-10')
+        interview.tags.add(tag, kept)
+        self.client.delete(reverse('tags-update-destroy', kwargs={'id': tag.id}) + '?async=true')
+        self.client.delete(reverse('country-update-destroy', kwargs={'id': country.id}) + '?async=true')
+
+        app_url = reverse('app-detail', kwargs={'id': application.id})
+        res = self.client.get(app_url, {'expand': 'tags,country'})
+        self.assertEqual([t['id'] for t in res.data['tags']], [kept.id])
+        self.assertIsNone(res.data['country'])
+        # Lists take the fast path, `?sideload=true` the serializer.
+        res = self.client.get(COMPANIES_URL, {'expand': 'tag_details,country_detail'})
+        self.assertEqual([t['id'] for t in res.data[0]['tag_details']], [kept.id])
+        self.assertIsNone(res.data[0]['country_detail'])
+        res = self.client.get(COMPANIES_URL, {'expand': 'tag_details,country_detail', 'sideload': 'true'})
+        self.assertEqual(res.data['data'][0]['tag_details'], [kept.id])
+        self.assertIsNone(res.data['data'][0]['country_detail'])
+        self.assertEqual(list(res.data['included']['tag']), [kept.id])
+        self.assertNotIn('country', res.data['included'])
+        self.assertEqual(self.client.get(reverse('interview-list-create')).data[0]['tags'], [kept.id])
+        res = self.client.get(reverse('interview-detail', kwargs={'id': interview.id}))
+        self.assertEqual(res.data['tags'], [kept.id])
+        res = self.client.patch(app_url, {'position': 'Lead'})
+        self.assertEqual([t['id'] for t in res.data['tags']], [kept.id])
+        self.assertIsNone(res.data['country'])
+
+    def test_names_of_hidden_objects_can_be_reused(self):
+        tag, country = sample_tag(self.user), sample_country(self.user)
+        company = sample_application(self.user).company
+        for url in [reverse('tags-update-destroy', kwargs={'id': tag.id}),
+                    reverse('country-update-destroy', kwargs={'id': country.id}), company_url(company.id)]:
+            self.client.delete(url + '?async=true')
+
+        res = self.client.post(COMPANIES_URL, {'name': company.name, 'tags': [tag.name]}, format='json')
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn(tag.id, [t['id'] for t in res.data['tag_details']])
+        res = self.client.post(reverse('country-list-create'), {'name': country.name})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        process()
+        self.assertEqual(Tag.objects.get().name, tag.name)
+        self.assertEqual(Company.objects.get().tags.count(), 1)
+
+    @override_settings(ASYNC_DELETES=True)
+    def test_setting_makes_deletes_async_and_set_null_is_kept(self):
+        country = sample_country(self.user)
+        application = sample_application(self.user)
+        Application.objects.filter(id=application.id).update(country=country)
+        Company.objects.filter(id=application.company_id).update(country=country)
+
+        res = self.client.delete(reverse('country-update-destroy', kwargs={'id': country.id}))
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        res = self.client.post(reverse('app-create'), {
+            'company_id': application.company_id, 'country_id': country.id,
+            'position': 'Lead', 'status': 'applied',
+        })
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        process()
+
+        self.assertFalse(Country.objects.exists())
+        application.refresh_from_db()
+        self.assertIsNone(application.country_id)
+        self.assertIsNone(Company.objects.get().country_id)
+
+    def test_sync_delete_without_async(self):
+        company = sample_application(self.user).company
+        res = self.client.delete(company_url(company.id) + '?async=false')
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(DeletionJob.objects.exists())
+
+    def test_jobs_are_private(self):
+        tag = sample_tag(self.user)
+        res = self.client.delete(reverse('tags-update-destroy', kwargs={'id': tag.id}) + '?async=true')
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='o@example.com', password='testpass123'))
+        res = other.get(reverse('deletion-detail', kwargs={'id': res.data['id']}))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_deleting_own_account(self):
+        Token.objects.create(user=self.user)
+        sample_application(self.user)
+
+        res = self.client.delete(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(Token.objects.exists())
+
+        process()
+
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Company.objects.exists())
+        self.assertEqual(DeletionJob.objects.get().status, 'done')
+
+    def test_expired_lease_is_claimed_again(self):
+        tag = sample_tag(self.user)
+        job = DeletionJob.objects.create(user_id=self.user.id, model='core.tag', object_id=tag.id,
+                                         status='running', lease_expires=timezone.now() + timedelta(minutes=1))
+        self.assertIsNone(claim('default'))
+        DeletionJob.objects.filter(id=job.id).update(lease_expires=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(claim('default').id, job.id)
@@ -0,0 +1,140 @@
+import json
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import events
+from core.models import Interview
+from core.tests.test_application_api import sample_application, sample_tag
+
+User = get_user_model()
+
+EVENTS_URL = reverse('events')
+TICKET_URL = reverse('events-ticket')
+
+
+def payload(user_id, model, id, action='changed'):
+    return json.dumps({'user': user_id, 'model': model, 'id': id, 'action': action})
+
+
+class PublishTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch('core.events.notify')
+        self.notify = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def published(self):
+        return [json.loads(call.args[1]) for call in self.notify.call_args_list]
+
+    def test_writes_publish_changes(self):
+        res = self.client.post(reverse('tags-list-create'), {'name': 'backend'})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        tag_id = res.data['id']
+        self.client.patch(reverse('tags-update-destroy', kwargs={'id': tag_id}), {'name': 'frontend'})
+        self.assertEqual(self.published(), [
+            {'user': self.user.id, 'model': 'tag', 'id': tag_id, 'action': 'changed'},
+            {'user': self.user.id, 'model': 'tag', 'id': tag_id, 'action': 'changed'},
+        ])
+
+    def test_deletes_publish(self):
+        tag = sample_tag(self.user)
+        interview = Interview.objects.create(user=self.user, application=sample_application(self.user),
+                                             date='2025-01-10')
+        self.client.delete(reverse('tags-update-destroy', kwargs={'id': tag.id}) + '?async=true')
+        self.client.delete(reverse('interview-detail', kwargs={'id': interview.id}))
+        self.assertEqual([(event['model'], event['id'], event['action']) for event in self.published()],
+                         [('tag', tag.id, 'deleted'), ('interview', interview.id, 'deleted')])
+
+    def test_invalid_writes_publish_nothing(self):
+        self.client.post(reverse('tags-list-create'), {})
+        self.notify.assert_not_called()
+
+
+class HubTests(TestCase):
+    async def test_dispatches_to_the_users_streams(self):
+        hub = events.Hub()
+        mine, other = await hub.subscribe(1), await hub.subscribe(2)
+        hub.dispatch(payload(1, 'tag', 5))
+        self.assertEqual(mine.get_nowait(), {'model': 'tag', 'id': 5, 'action': 'changed'})
+        self.assertTrue(other.empty())
+        hub.unsubscribe(1, mine)
+        hub.dispatch(payload(1, 'tag', 6))
+        self.assertEqual(dict(hub.streams), {2: {other}})
+
+    @override_settings(EVENTS_QUEUE_SIZE=2)
+    async def test_overflow_resets_the_stream(self):
+        hub = events.Hub()
+        queue = await hub.subscribe(1)
+        for id in range(3):
+            hub.dispatch(payload(1, 'tag', id))
+        self.assertEqual(queue.get_nowait(), events.RESET)
+        self.assertTrue(queue.empty())
+
+
+class EventStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        cls.token = Token.objects.create(user=cls.user)
+
+    async def test_requires_a_token(self):
+        res = await self.async_client.get(EVENTS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        # Tokens in URLs end up in access logs.
+        res = await self.async_client.get(EVENTS_URL, {'token': self.token.key})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        res = await self.async_client.get(EVENTS_URL, {'ticket': 'nope'})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_ticket_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        res = client.post(TICKET_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(events.redeem(res.data['ticket']), (self.user.id, None))
+        self.assertEqual(APIClient().post(TICKET_URL).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refused_under_wsgi(self):
+        res = self.client.get(EVENTS_URL, headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(res.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    async def test_tickets_expire(self):
+        with mock.patch('time.time', return_value=time.time() - 61):
+            ticket = events.ticket(self.user.id, None)
+        res = await self.async_client.get(EVENTS_URL, {'ticket': ticket})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_streams_the_users_events(self):
+        res = await self.async_client.get(EVENTS_URL, headers={'Authorization': f'Token {self.token.key}'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        content = aiter(res.streaming_content)
+        self.assertEqual(await anext(content), b': connected\n\n')
+
+        hub = events.hub()
+        hub.dispatch(payload(self.user.id + 1, 'tag', 4))
+        hub.dispatch(payload(self.user.id, 'tag', 5, 'deleted'))
+        self.assertEqual(await anext(content), b'event: deleted\ndata: {"model":"tag","id":5}\n\n')
+
+        hub.dispatch(json.dumps({'user': self.user.id, **events.RESET}))
+        self.assertEqual(await anext(content), b'event: reset\ndata: {}\n\n')
+        with self.assertRaises(StopAsyncIteration):
+            await anext(content)
+        self.assertNotIn(self.user.id, hub.streams)
+
+    @override_settings(EVENTS_HEARTBEAT_SECONDS=0)
+    async def test_heartbeats_and_ticket(self):
+        res = await self.async_client.get(EVENTS_URL, {'ticket': events.ticket(self.user.id, None)})
+        content = aiter(res.streaming_content)
+        await anext(content)
+        self.assertEqual(await anext(content), b': keepalive\n\n')
+        await content.aclose()
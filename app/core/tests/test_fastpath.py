@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from rest_framework.request import Request
+
+from core.archive import archive
+from core.models import Application, ArchivedInterview, Company, Interview, Resume, Tag
+from core.renderers import JSONRenderer
+from core.tests.test_application_api import sample_application, sample_country, sample_tag
+from main import fastpath
+from main.fieldsets import optimize, read_context
+from main.serializers import (
+    ArchivedInterviewSerializer, CompanySerializer, InterviewReadSerializer,
+    ResumeReadSerializer, TagCloudSerializer, TagSerializer,
+)
+
+User = get_user_model()
+
+
+class FastPathTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        tags = [sample_tag(self.user) for _ in range(3)]
+        country = sample_country(self.user)
+        for i in range(3):
+            application = sample_application(self.user)
+            Application.objects.filter(id=application.id).update(country=country if i else None)
+            application.tags.set(tags[:i])
+            application.company.tags.set(tags[i:])
+            interview = Interview.objects.create(user=self.user, application=application,
+                                                 date=f'2025-01-1{i}', note=f'Round {i}')
+            interview.tags.set(tags[::2])
+        Resume.objects.create(user=self.user, file='resumes/cv.pdf').tags.set(tags)
+
+    def context(self, **params):
+        return read_context(Request(RequestFactory().get('/', params)))
+
+    def assertSameBytes(self, serializer_class, queryset, **params):
+        fast = serializer_class(many=True, context=self.context(**params))
+        data = fastpath.serialize(fast, queryset)
+        self.assertIsNotNone(data, 'the fast path should handle this serializer')
+        slow = serializer_class(many=True, context=self.context(**params))
+        slow.instance = optimize(queryset, slow)
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(slow.data))
+        return data
+
+    def test_matches_serializers_byte_for_byte(self):
+        self.assertSameBytes(TagSerializer, Tag.objects.all())
+        self.assertSameBytes(TagSerializer, Tag.objects.all(), fields='name')
+        self.assertSameBytes(CompanySerializer, Company.objects.all())
+        self.assertSameBytes(CompanySerializer, Company.objects.all(), expand='country_detail,tag_details')
+        self.assertSameBytes(ResumeReadSerializer, Resume.objects.all(), expand='tags')
+        self.assertSameBytes(InterviewReadSerializer, Interview.objects.all())
+        data = self.assertSameBytes(
+            InterviewReadSerializer, Interview.objects.all(),
+            expand='tags,application.country,application.tags,application.company.tag_details',
+        )
+        self.assertEqual(len(data), 3)
+        self.assertSameBytes(InterviewReadSerializer, Interview.objects.all(),
+                             fields='id,date,application.position,application.company.name')
+
+    def test_archived_rows(self):
+        Application.objects.update(status='rejected')
+        archive(Application.objects.all())
+        self.assertSameBytes(ArchivedInterviewSerializer, ArchivedInterview.objects.all(),
+                             expand='application.company')
+
+    def test_falls_back_for_computed_fields(self):
+        self.assertIsNone(fastpath.build_plan(TagCloudSerializer(many=True)))
+        usage = TagSerializer(many=True, context={**self.context(), 'usage': True})
+        self.assertIsNone(fastpath.serialize(usage, Tag.objects.all()))
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_serializers', '--rows', '5', '--repeat', '1', stdout=out)
+        self.assertIn('interviews expanded', out.getvalue())
+        self.assertEqual(Tag.objects.count(), 3)
@@ -0,0 +1,142 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Interview
+from core.tests.test_application_api import sample_application, sample_country, sample_tag
+from main.fieldsets import parse
+
+User = get_user_model()
+
+INTERVIEWS_URL = reverse('interview-list-create')
+TAGS_URL = reverse('tags-list-create')
+EXPAND_ALL = {'expand': 'tags,application.tags,application.country,application.company.tag_details,'
+                        'application.company.country_detail'}
+
+
+def detail_url(app_id):
+    return reverse('app-detail', kwargs={'id': app_id})
+
+
+class ParseTests(SimpleTestCase):
+    def test_builds_tree(self):
+        self.assertEqual(parse('id, company.name,company.tag_details.name,'),
+                         {'id': {}, 'company': {'name': {}, 'tag_details': {'name': {}}}})
+        self.assertEqual(parse(None), {})
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_interview(self):
+        application = sample_application(self.user)
+        application.country = sample_country(self.user)
+        application.save()
+        application.tags.add(sample_tag(self.user))
+        application.company.tags.add(sample_tag(self.user))
+        interview = Interview.objects.create(user=self.user, application=application,
+                                             date='2025-01-10', note='Phone screen')
+        interview.tags.add(sample_tag(self.user))
+        return interview
+
+    def test_trims_output_and_columns(self):
+        application = self.add_interview().application
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(detail_url(application.id), {'fields': 'id,position,status,company.name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {
+            'id': application.id, 'position': application.position,
+            'status': application.status, 'company': {'name': application.company.name},
+        })
+        sql = [query['sql'] for query in queries if 'core_application' in query['sql']]
+        self.assertEqual(len(sql), 1)
+        self.assertIn('core_company', sql[0])
+        self.assertNotIn('"note"', sql[0])
+        self.assertFalse(any('core_tag' in query['sql'] for query in queries))
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        self.add_interview()
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(INTERVIEWS_URL, EXPAND_ALL)
+        self.add_interview()
+        self.add_interview()
+        with CaptureQueriesContext(connection) as three:
+            res = self.client.get(INTERVIEWS_URL, EXPAND_ALL)
+        self.assertEqual(len(res.data), 3)
+        self.assertEqual(len(one), len(three))
+        self.assertEqual(len(res.data[0]['application']['company']['tag_details']), 1)
+
+    def test_fewer_fields_fewer_queries(self):
+        self.add_interview()
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(INTERVIEWS_URL, EXPAND_ALL)
+        with CaptureQueriesContext(connection) as sparse:
+            res = self.client.get(INTERVIEWS_URL, {'fields': 'id,date,application.position'})
+        self.assertEqual(list(res.data[0]), ['id', 'application', 'date'])
+        self.assertEqual(list(res.data[0]['application']), ['position'])
+        self.assertLess(len(sparse), len(full))
+
+    def test_unknown_fields_are_rejected(self):
+        res = self.client.get(TAGS_URL, {'fields': 'id,colour'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+        res = self.client.get(TAGS_URL, {'fields': 'name.first'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExpandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.application = sample_application(self.user)
+        self.tag = sample_tag(self.user)
+        self.application.tags.add(self.tag)
+        self.interviews = [
+            Interview.objects.create(user=self.user, application=self.application, date=date, note='x')
+            for date in ('2025-01-10', '2025-01-17')
+        ]
+
+    def test_relations_are_ids_by_default(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(INTERVIEWS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['application'], self.application.id)
+        self.assertEqual(res.data[0]['tags'], [])
+        # The company is joined only to hide ones being deleted, never selected.
+        self.assertFalse(any('"core_company"."name"' in query['sql'] for query in queries))
+
+        res = self.client.get(detail_url(self.application.id))
+        self.assertEqual((res.data['company'], res.data['tags']), (self.application.company_id, [self.tag.id]))
+
+    def test_expand_embeds_named_paths(self):
+        res = self.client.get(INTERVIEWS_URL, {'expand': 'application.company'})
+        application = res.data[0]['application']
+        self.assertEqual(application['company']['name'], self.application.company.name)
+        self.assertEqual(application['tags'], [self.tag.id])
+        self.assertEqual(application['company']['tag_details'], [])
+
+    def test_sideload_lists_shared_objects_once(self):
+        res = self.client.get(INTERVIEWS_URL, {'expand': 'application.company,application.tags',
+                                               'sideload': 'true'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['application'] for row in res.data['data']], [self.application.id] * 2)
+        included = res.data['included']
+        self.assertEqual(list(included['application']), [self.application.id])
+        self.assertEqual(included['application'][self.application.id]['company'], self.application.company_id)
+        self.assertEqual(included['company'][self.application.company_id]['name'], self.application.company.name)
+        self.assertEqual(included['tag'][self.tag.id]['name'], self.tag.name)
+
+    def test_unknown_expand_is_rejected(self):
+        res = self.client.get(INTERVIEWS_URL, {'expand': 'application.position'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', res.data)
@@ -0,0 +1,62 @@
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.check import probe_cache
+from core.deletion import check_queue
+from core.models import DeletionJob
+
+LIVE_URL = reverse('health-live')
+READY_URL = reverse('health-ready')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class HealthCheckTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        probe_cache.clear()
+        self.addCleanup(probe_cache.clear)
+
+    def test_liveness_does_no_io(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(LIVE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'status': 'ok'})
+
+    def test_readiness_reports_each_probe(self):
+        res = self.client.get(READY_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['status'], 'ok')
+        self.assertFalse(res.data['cached'])
+        self.assertEqual(set(res.data['checks']), {'database', 'migrations', 'media_root', 'deletion_queue'})
+        self.assertIn('latency_ms', res.data['checks']['database'])
+
+    def test_readiness_result_is_cached(self):
+        self.client.get(READY_URL)
+        with self.assertNumQueries(0):
+            res = self.client.get(READY_URL)
+        self.assertTrue(res.data['cached'])
+
+    def test_readiness_fails_when_a_probe_fails(self):
+        failing = mock.Mock(side_effect=OSError('read-only'))
+        with mock.patch.dict('core.check.PROBES', {'media_root': failing}):
+            res = self.client.get(READY_URL)
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.data['checks']['media_root'], {'status': 'fail', 'error': 'read-only'})
+
+    @override_settings(DELETION_MAX_LAG_SECONDS=60)
+    def test_readiness_reports_deletion_queue_lag(self):
+        job = DeletionJob.objects.create(user_id=1, model='core.tag', object_id=1)
+        self.assertEqual(check_queue()['waiting'], 1)
+        DeletionJob.objects.filter(id=job.id).update(created_at=timezone.now() - timedelta(minutes=5))
+        res = self.client.get(READY_URL)
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.data['checks']['deletion_queue']['status'], 'fail')
+        DeletionJob.objects.filter(id=job.id).update(status='done')
+        self.assertEqual(check_queue(), {'waiting': 0, 'lag_seconds': 0.0})
@@ -0,0 +1,108 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, IdempotencyKey, Resume, Tag
+from core.tests.test_application_api import sample_company
+from core.tests.test_resume_api import make_dummy_file
+
+User = get_user_model()
+
+APP_URL = reverse('app-create')
+TAGS_URL = reverse('tags-list-create')
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.company = sample_company(self.user)
+
+    def post(self, payload, key, url=APP_URL, client=None):
+        return (client or self.client).post(url, payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        payload = {'company_id': self.company.id, 'position': 'Backend Engineer', 'status': 'applied'}
+        first = self.post(payload, 'retry-1')
+        second = self.post(payload, 'retry-1')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertNotIn('Idempotent-Replayed', first)
+        self.assertEqual(Application.objects.count(), 1)
+
+    def test_key_reused_for_another_request(self):
+        self.post({'name': 'backend'}, 'k')
+        res = self.post({'name': 'frontend'}, 'k')
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertIn('Idempotency-Key', res.data)
+        res = self.post({'name': 'backend'}, 'k', url=reverse('country-list-create'))
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_keys_belong_to_a_user(self):
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='other@example.com', password='testpass123'))
+        self.post({'name': 'backend'}, 'shared', url=TAGS_URL)
+        res = self.post({'name': 'backend'}, 'shared', url=TAGS_URL, client=other)
+        self.assertNotIn('Idempotent-Replayed', res)
+        self.assertEqual(Tag.objects.count(), 2)
+
+    def test_client_errors_are_replayed_and_failures_are_not_kept(self):
+        self.assertEqual(self.post({}, 'bad').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post({}, 'bad')['Idempotent-Replayed'], 'true')
+        res = self.client.post(reverse('app-restore', kwargs={'id': 999}), HTTP_IDEMPOTENCY_KEY='missing')
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(IdempotencyKey.objects.filter(key='missing').exists())
+
+    def test_rejects_oversized_keys(self):
+        res = self.post({'name': 'backend'}, 'k' * 256, url=TAGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tag.objects.exists())
+
+    def test_expired_keys_run_again_and_are_pruned(self):
+        self.post({'name': 'backend'}, 'old', url=TAGS_URL)
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=25))
+        res = self.post({'name': 'backend'}, 'old', url=TAGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)  # the tag exists now
+        self.assertNotIn('Idempotent-Replayed', res)
+
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=25))
+        out = StringIO()
+        call_command('prune_idempotency_keys', stdout=out)
+        self.assertIn('Pruned 1 keys', out.getvalue())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class UploadIdempotencyTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='user@example.com', password='testpass123'))
+
+    def upload(self, file):
+        return self.client.post(reverse('resume-list-create'), {'file': file}, format='multipart',
+                                HTTP_IDEMPOTENCY_KEY='cv')
+
+    def test_uploads_are_fingerprinted_by_content(self):
+        self.assertEqual(self.upload(make_dummy_file()).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.upload(make_dummy_file())['Idempotent-Replayed'], 'true')
+        res = self.upload(make_dummy_file(content=b'%PDF-1.4\n%other'))
+        self.assertEqual(res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Resume.objects.count(), 1)
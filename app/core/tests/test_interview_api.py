@@ -451,7 +451,7 @@ class PrivateInterviewApiTests(TestCase):
         interview = sample_interview(self.user, application)
         interview.tags.add(tag)
         
-        res = self.client.get(interview_detail_url(interview.id))
+        res = self.client.get(interview_detail_url(interview.id), {'expand': 'application,tags'})
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         
         # Check response structure
@@ -0,0 +1,106 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import metrics
+
+User = get_user_model()
+
+METRICS_URL = reverse('metrics')
+TAGS_URL = reverse('tags-list-create')
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', ''])
+    process.wait()
+    return process.pid
+
+
+@override_settings(METRICS_TOKEN='scrape-secret')
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir, ignore_errors=True)
+
+    def scrape(self):
+        return self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer scrape-secret')
+
+    def write_worker(self, name, requests):
+        with open(os.path.join(self.metrics_dir, name), 'w') as fh:
+            json.dump({
+                'counters': [['jat_http_requests_total',
+                              [['method', 'GET'], ['route', 'api/other/'], ['status', '200']], requests]],
+                'histograms': [],
+            }, fh)
+
+    def test_requires_the_token_or_a_staff_user(self):
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_403_FORBIDDEN)
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_403_FORBIDDEN)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.client.get(METRICS_URL).status_code, status.HTTP_200_OK)
+
+    def test_reports_per_route_requests_and_histograms(self):
+        user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(user)
+        self.client.get(TAGS_URL)
+        res = self.scrape()
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        body = res.content.decode()
+        self.assertIn('jat_http_requests_total{method="GET",route="api/tags/",status="200"}', body)
+        self.assertIn('jat_http_request_duration_seconds_bucket{method="GET",route="api/tags/",le="+Inf"}', body)
+        self.assertIn('jat_db_queries_per_request_count{route="api/tags/"}', body)
+
+    def test_aggregates_snapshots_from_other_workers(self):
+        self.write_worker(f'{os.getppid()}-1.json', 41.0)
+        with override_settings(METRICS_DIR=self.metrics_dir):
+            res = self.scrape()
+            self.assertTrue(os.path.exists(metrics.collector.path(self.metrics_dir)))
+        self.assertIn(
+            'jat_http_requests_total{method="GET",route="api/other/",status="200"} 41.0',
+            res.content.decode(),
+        )
+
+    def test_dead_workers_are_folded_into_the_retired_totals(self):
+        pid = dead_pid()
+        self.write_worker(f'{pid}-1.json', 41.0)
+        with override_settings(METRICS_DIR=self.metrics_dir):
+            self.scrape()
+            self.assertFalse(os.path.exists(os.path.join(self.metrics_dir, f'{pid}-1.json')))
+            # The pid is reused by a worker that has served one request so far.
+            self.write_worker(f'{pid}-2.json', 1.0)
+            with mock.patch('core.metrics._alive', return_value=True):
+                res = self.scrape()
+        self.assertIn(
+            'jat_http_requests_total{method="GET",route="api/other/",status="200"} 42.0',
+            res.content.decode(),
+        )
+
+    def test_exiting_worker_retires_its_totals(self):
+        with override_settings(METRICS_DIR=self.metrics_dir):
+            collector = metrics.Collector()
+            collector.inc('jat_http_requests_total', {'method': 'GET', 'route': 'api/other/', 'status': '200'}, 3)
+            collector.flush()
+            collector.retire()
+            self.assertFalse(os.path.exists(collector.path(self.metrics_dir)))
+            res = self.scrape()
+        self.assertIn(
+            'jat_http_requests_total{method="GET",route="api/other/",status="200"} 3.0',
+            res.content.decode(),
+        )
@@ -0,0 +1,97 @@
+from io import StringIO
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, Interview
+from core.partitioning import TABLES, _name, _relations, explain, is_partitioned
+from core.tests.test_application_api import sample_application, sample_tag
+
+User = get_user_model()
+
+PARTITIONED_TABLES = [table for table, _, _ in TABLES]
+
+
+class PlanParsingTests(SimpleTestCase):
+    def test_collects_scanned_relations(self):
+        plan = {
+            'Node Type': 'Append',
+            'Subplans Removed': 3,
+            'Plans': [
+                {'Node Type': 'Index Scan', 'Relation Name': 'core_application_p2'},
+                {'Node Type': 'Seq Scan', 'Relation Name': 'core_application_p5'},
+            ],
+        }
+        self.assertEqual(_relations(plan), (['core_application_p2', 'core_application_p5'], 3))
+
+
+@skipIf(connection.vendor == 'postgresql', 'Runs on the other backends.')
+class NonPostgresTests(SimpleTestCase):
+    def test_requires_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('partition_tables', stdout=StringIO())
+
+
+@skipIf(connection.vendor != 'postgresql', 'Partitioning requires PostgreSQL.')
+class PartitionTablesTests(TransactionTestCase):
+    # Conversion needs real commits: deferred FK checks would block ALTER TABLE.
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT conname, conrelid::regclass::text, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE contype = 'f' AND (conrelid = ANY(%s::regclass[]) OR confrelid = ANY(%s::regclass[]))",
+                [PARTITIONED_TABLES, PARTITIONED_TABLES],
+            )
+            self.foreign_keys = cursor.fetchall()
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.application = sample_application(self.user)
+        self.application.tags.add(sample_tag(self.user))
+        Interview.objects.create(user=self.user, application=self.application,
+                                 date='2025-01-10', note='Phone screen')
+
+    def test_hash_partitioning_keeps_api_and_prunes_per_user_queries(self):
+        out = StringIO()
+        call_command('partition_tables', strategy='hash', partitions=4, batch_size=1,
+                     keep_legacy=True, stdout=out)
+        with connection.cursor() as cursor:
+            for table, _, _ in TABLES:
+                self.assertTrue(is_partitioned(cursor, table))
+        self.assertIn('Partition pruning for user@example.com', out.getvalue())
+
+        res = self.client.get(reverse('app-detail', kwargs={'id': self.application.id}))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['position'], 'Software Engineer')
+        res = self.client.post(reverse('app-create'), {
+            'company_id': self.application.company_id, 'position': 'Lead', 'status': 'applied',
+        })
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertGreater(res.data['id'], self.application.id)
+        # Incoming foreign keys are gone; Django still cascades the delete.
+        self.application.delete()
+        self.assertFalse(Interview.objects.filter(user=self.user).exists())
+        self.assertFalse(Application.tags.through.objects.filter(application_id=self.application.id).exists())
+
+        result = explain(connection, Application.objects.filter(user=self.user), 'core_application')
+        self.assertEqual(result['partitions'], 4)
+        self.assertEqual(result['scanned'], 1)
+
+    def tearDown(self):
+        # Put the unpartitioned tables (kept as *_legacy) and their foreign keys
+        # back for the tests that run after this one.
+        with connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                if is_partitioned(cursor, table):
+                    cursor.execute(f'DROP TABLE {table} CASCADE')
+                    cursor.execute(f'ALTER TABLE {_name(table, "_legacy")} RENAME TO {table}')
+            cursor.execute(f'TRUNCATE {", ".join(PARTITIONED_TABLES)}')
+            for name, table, definition in self.foreign_keys:
+                cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}')
+                cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}')
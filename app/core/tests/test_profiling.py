@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Tag
+
+User = get_user_model()
+
+TAGS_URL = reverse('tags-list-create')
+PROFILE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(PROFILING_DIR=PROFILE_DIR)
+class ProfilingTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def authenticate(self, is_staff):
+        user = User.objects.create_user(
+            email='test@example.com', password='testpass123', is_staff=is_staff
+        )
+        Tag.objects.create(user=user, name='backend')
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_staff_request_writes_report_with_plans(self):
+        self.authenticate(is_staff=True)
+        res = self.client.get(TAGS_URL, HTTP_X_PROFILE='1')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        profile_id = res['X-Profile-Id']
+        with open(os.path.join(PROFILE_DIR, f'{profile_id}.json')) as fh:
+            report = json.load(fh)
+        self.assertEqual(report['status'], 200)
+        self.assertIn('cumulative', report['profile'])
+        tag_query = next(q for q in report['queries'] if 'core_tag' in q['sql'])
+        self.assertTrue(tag_query['plan'])
+        self.assertTrue(os.path.exists(os.path.join(PROFILE_DIR, f'{profile_id}.prof')))
+
+    def test_query_parameter_enables_profiling(self):
+        self.authenticate(is_staff=True)
+        res = self.client.get(TAGS_URL, {'profile': '1'})
+        self.assertTrue(res.has_header('X-Profile-Id'))
+
+    def test_only_an_explicit_opt_in_enables_profiling(self):
+        self.authenticate(is_staff=True)
+        for params in [{'profile': '0'}, {'profile': 'false'}, {'xprofile': '1'}]:
+            self.assertFalse(self.client.get(TAGS_URL, params).has_header('X-Profile-Id'))
+        self.assertFalse(self.client.get(TAGS_URL, HTTP_X_PROFILE='0').has_header('X-Profile-Id'))
+        self.assertTrue(self.client.get(TAGS_URL, HTTP_X_PROFILE='true').has_header('X-Profile-Id'))
+
+    def test_non_staff_requests_are_not_profiled(self):
+        self.authenticate(is_staff=False)
+        res = self.client.get(TAGS_URL, HTTP_X_PROFILE='1')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.has_header('X-Profile-Id'))
@@ -0,0 +1,109 @@
+import io
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipIf
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework import parsers, renderers, status
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIClient
+
+from core import renderers as fast
+from core.schema import generate_schema
+from core.tests.test_application_api import sample_tag
+
+User = get_user_model()
+
+MSGPACK = 'application/msgpack'
+
+
+class RendererTests(SimpleTestCase):
+    data = {
+        'id': 1,
+        'public_id': uuid4(),
+        'created_at': datetime(2025, 1, 10, 9, 30, 5, 123456, tzinfo=dt_timezone.utc),
+        'naive': datetime(2025, 1, 10, 9, 30),
+        'day': date(2025, 1, 10),
+        'at': time(9, 30),
+        'elapsed': timedelta(minutes=90),
+        'salary': Decimal('85000.50'),
+        'label': gettext_lazy('Not found.'),
+        'text': 'Zürich\u2028next\u2029line',
+        'included': {7: {'tags': (1, 2)}},
+        'empty': None,
+    }
+
+    def test_matches_drf_output(self):
+        self.assertEqual(fast.JSONRenderer().render(self.data), renderers.JSONRenderer().render(self.data))
+        self.assertEqual(fast.JSONRenderer().render(None), b'')
+
+    def test_indent_falls_back_to_drf(self):
+        self.assertEqual(fast.JSONRenderer().render({'a': 1}, 'application/json; indent=2'), b'{\n  "a": 1\n}')
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(fast, 'orjson', None):
+            self.assertEqual(fast.JSONRenderer().render(self.data), renderers.JSONRenderer().render(self.data))
+            self.assertEqual(fast.JSONParser().parse(io.BytesIO(b'{"a": [1]}')), {'a': [1]})
+
+    def test_parser(self):
+        body = '{"name": "Zürich", "ids": [1, 2.5, null]}'.encode()
+        self.assertEqual(fast.JSONParser().parse(io.BytesIO(body)),
+                         parsers.JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            fast.JSONParser().parse(io.BytesIO(b'{"name": '))
+
+    def test_integers_wider_than_64_bits_stay_exact(self):
+        for value in (123456789012345678901234567890, -2 ** 63 - 1, 2 ** 64):
+            data = {'a': value, 'at': self.data['created_at']}
+            self.assertEqual(fast.JSONRenderer().render(data), renderers.JSONRenderer().render(data))
+            body = f'{{"a": {value}, "b": [1.5, "x"]}}'.encode()
+            self.assertEqual(fast.JSONParser().parse(io.BytesIO(body)), {'a': value, 'b': [1.5, 'x']})
+        with self.assertRaisesMessage(ParseError, 'JSON parse error'):
+            fast.JSONParser().parse(io.BytesIO(b'{"a": 12345678901234567890'))
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_renderers', '--rows', '50', '--repeat', '1', stdout=out)
+        self.assertIn('50 rows', out.getvalue())
+        self.assertIn('orjson output identical to DRF: True', out.getvalue())
+
+
+@skipIf(fast.msgpack is None, 'msgpack is not installed')
+class MessagePackTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_negotiated_response(self):
+        tag = sample_tag(self.user)
+        res = self.client.get(reverse('tags-list-create'), HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], MSGPACK)
+        self.assertEqual(fast.msgpack.unpackb(res.content), [{'id': tag.id, 'name': tag.name}])
+        self.assertEqual(self.client.get(reverse('tags-list-create'))['Content-Type'], 'application/json')
+
+    def test_parses_request_bodies(self):
+        body = fast.msgpack.packb({'name': 'backend'})
+        res = self.client.post(reverse('tags-list-create'), body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(fast.msgpack.unpackb(res.content)['name'], 'backend')
+
+        res = self.client.post(reverse('tags-list-create'), b'\x92\x01', content_type=MSGPACK)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_auth_endpoints_and_schema(self):
+        res = APIClient().post(reverse('token'), fast.msgpack.packb(
+            {'email': 'user@example.com', 'password': 'testpass123'}), content_type=MSGPACK, HTTP_ACCEPT=MSGPACK)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', fast.msgpack.unpackb(res.content))
+
+        operation = generate_schema()['paths']['/api/tags/']['post']
+        self.assertIn(MSGPACK, operation['requestBody']['content'])
+        self.assertIn(MSGPACK, operation['responses']['200']['content'])
@@ -0,0 +1,102 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Tag
+from core.routers import ReplicaRouter, ReplicaRoutingMiddleware, check_pin_cache, is_pinned, pin_user
+
+User = get_user_model()
+
+TAGS_URL = reverse('tags-list-create')
+
+
+def route(method, user=None, write=False, model=Tag):
+    """Run a request through the middleware and return where its reads went."""
+    request = getattr(RequestFactory(), method)('/api/tags/')
+    request.user = user or AnonymousUser()
+    seen = {}
+
+    def view(request):
+        if write:
+            router.db_for_write(model)
+        seen['read'] = router.db_for_read(model)
+        return HttpResponse()
+
+    ReplicaRoutingMiddleware(view)(request)
+    return seen['read']
+
+
+@override_settings(REPLICA_DATABASES=['replica1'], REPLICA_PIN_SECONDS=5)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User(pk=1, email='test@example.com')
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(route('get', self.user), 'replica1')
+        self.assertEqual(route('head'), 'replica1')
+
+    def test_unsafe_requests_use_primary(self):
+        self.assertEqual(route('post', self.user), 'default')
+        self.assertEqual(route('delete', self.user), 'default')
+
+    def test_outside_requests_use_primary(self):
+        self.assertIsNone(ReplicaRouter().db_for_read(Tag))
+        self.assertEqual(router.db_for_read(Tag), 'default')
+
+    def test_auth_models_always_use_primary(self):
+        self.assertEqual(route('get', self.user, model=Token), 'default')
+        self.assertEqual(route('get', self.user, model=User), 'default')
+
+    def test_write_pins_user_to_primary(self):
+        route('post', self.user, write=True)
+        self.assertTrue(is_pinned(self.user.pk))
+        self.assertEqual(route('get', self.user), 'default')
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_pinning_can_be_disabled(self):
+        pin_user(self.user.pk)
+        self.assertEqual(route('get', self.user), 'replica1')
+
+    def test_warns_when_pins_are_per_process(self):
+        self.assertEqual([w.id for w in check_pin_cache(None)], ['core.W001'])
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                              'LOCATION': '/tmp/jat-test-cache'}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_pin_cache(None), [])
+        with override_settings(REPLICA_DATABASES=[]):
+            self.assertEqual(check_pin_cache(None), [])
+
+    def test_replicas_are_never_migrated(self):
+        self.assertFalse(router.allow_migrate('replica1', 'core'))
+        self.assertTrue(router.allow_migrate('default', 'core'))
+
+
+@override_settings(REPLICA_DATABASES=['replica1'])
+class ReadYourWritesTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_get_after_post_reads_from_primary(self):
+        res = self.client.post(TAGS_URL, {'name': 'Remote'})
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(is_pinned(self.user.pk))
+
+        res = self.client.get(TAGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag['name'] for tag in res.data], ['Remote'])
+
+    def test_reads_inside_transaction_use_primary(self):
+        self.assertEqual(route('get', self.user), 'replica1')
+        with transaction.atomic():
+            self.assertEqual(route('get', self.user), 'default')
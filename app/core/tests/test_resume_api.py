@@ -247,7 +247,7 @@ class PrivateResumeApiTests(TestCase):
         self.assertEqual(res_patch.data, None)  # No body on 204
 
         # Fetch detail again: tags should be unchanged due to missing .save()
-        res_detail = self.client.get(resume_detail_url(resume_id))
+        res_detail = self.client.get(resume_detail_url(resume_id), {'expand': 'tags'})
         self.assertEqual(res_detail.status_code, status.HTTP_200_OK)
         names = {t['name'] for t in res_detail.data['tags']}
         self.assertSetEqual(names, {'first'})
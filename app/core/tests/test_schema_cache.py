@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.schema import check_schema_drift, generate_schema, schema_cache
+
+SCHEMA_URL = reverse('schema')
+DOCS_URL = reverse('swagger-ui')
+
+
+@override_settings(SCHEMA_FILE=None)
+class CachedSchemaViewTests(SimpleTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        schema_cache.clear()
+        self.addCleanup(schema_cache.clear)
+
+    def test_schema_is_generated_once_and_served_with_etag(self):
+        with mock.patch('core.schema.generate_schema', wraps=generate_schema) as generate:
+            res = self.client.get(SCHEMA_URL, HTTP_ACCEPT='application/vnd.oai.openapi+json')
+            self.client.get(SCHEMA_URL, HTTP_ACCEPT='application/vnd.oai.openapi+json')
+            self.client.get(SCHEMA_URL)
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(res.content), generate_schema())
+        self.assertIn('max-age=', res['Cache-Control'])
+
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT='application/vnd.oai.openapi+json',
+                              HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_swagger_ui_is_cacheable(self):
+        res = self.client.get(DOCS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('max-age=', res['Cache-Control'])
+
+
+class SchemaDriftCheckTests(SimpleTestCase):
+    def write_schema(self, schema):
+        fd, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as fh:
+            json.dump(schema, fh)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_up_to_date_schema_passes(self):
+        with override_settings(SCHEMA_FILE=self.write_schema(generate_schema())):
+            self.assertEqual(check_schema_drift(None), [])
+
+    def test_stale_schema_fails(self):
+        stale = generate_schema()
+        stale['paths'].pop(next(iter(stale['paths'])))
+        with override_settings(SCHEMA_FILE=self.write_schema(stale)):
+            errors = check_schema_drift(None)
+        self.assertEqual([error.id for error in errors], ['core.E001'])
@@ -0,0 +1,64 @@
+import io
+import random
+
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from unittest import skipIf
+
+from core.management.commands.seed_data import RowStream, copy_escape, plan_users
+from core.models import Application, Interview, User
+
+OPTIONS = {
+    'users': 4,
+    'power_users': 1,
+    'power_user_applications': 40,
+    'power_user_companies': 8,
+    'applications_per_user': 5,
+    'skew': 0,
+    'interviews_per_application': 0.5,
+    'countries_per_user': 2,
+    'tags_per_user': 3,
+    'companies_per_user': 2,
+    'resumes_per_user': 1,
+    'tags_per_object': 2,
+}
+
+
+class SeedDataHelpersTests(SimpleTestCase):
+    def test_copy_escape(self):
+        self.assertEqual(copy_escape(None), '\\N')
+        self.assertEqual(copy_escape(True), 't')
+        self.assertEqual(copy_escape('a\tb\nc\\d'), 'a\\tb\\nc\\\\d')
+
+    def test_row_stream_encodes_all_rows(self):
+        stream = RowStream([(1, 'a'), (2, None)])
+        self.assertEqual(stream.read(3), '1\ta')
+        self.assertEqual(stream.read(), '\n2\t\\N\n')
+        self.assertEqual(stream.read(), '')
+        self.assertEqual(stream.count, 2)
+
+    def test_plan_users_applies_power_user_skew(self):
+        plans = plan_users(OPTIONS, random.Random(0))
+        self.assertEqual(plans[0].counts['applications'], 40)
+        self.assertEqual(plans[0].counts['companies'], 8)
+        self.assertEqual(plans[1].counts['applications'], 5)
+        self.assertEqual(plans[1].counts['applications_tags'], 10)
+
+
+class SeedDataCommandTests(TestCase):
+    @skipIf(connection.vendor == 'postgresql', 'COPY is available')
+    def test_requires_postgresql(self):
+        with self.assertRaises(CommandError):
+            call_command('seed_data', users=1)
+
+    @skipIf(connection.vendor != 'postgresql', 'COPY requires PostgreSQL')
+    def test_seeds_referentially_valid_rows(self):
+        call_command('seed_data', users=3, power_users=1, power_user_applications=20,
+                     applications_per_user=4, seed=1, stdout=io.StringIO())
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Application.objects.count(), 28)
+        for interview in Interview.objects.select_related('application'):
+            self.assertEqual(interview.user_id, interview.application.user_id)
+        user = User.objects.create_user(email='after@example.com', password='testpass123')
+        self.assertGreater(user.id, User.objects.exclude(id=user.id).latest('id').id)
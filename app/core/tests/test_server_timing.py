@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+
+User = get_user_model()
+
+TAGS_URL = reverse('tags-list-create')
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for entry in header.split(', '):
+        name, *params = entry.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.client.force_authenticate(self.user)
+        Tag.objects.create(user=self.user, name='backend')
+
+    def test_reports_phases_and_query_count(self):
+        res = self.client.get(TAGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        metrics = parse_server_timing(res['Server-Timing'])
+        self.assertEqual(set(metrics), {'db', 'view', 'render', 'total'})
+        self.assertEqual(metrics['db']['desc'], '"1 queries"')
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+
+    @override_settings(REQUEST_TIMING={'SAMPLE_RATE': 0})
+    def test_unsampled_requests_have_no_header(self):
+        res = self.client.get(TAGS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.has_header('Server-Timing'))
+
+    @override_settings(REQUEST_TIMING={'SLOW_REQUEST_MS': 0, 'SLOW_QUERY_MS': 0})
+    def test_slow_requests_log_their_slow_queries(self):
+        with self.assertLogs('core.timing', level='WARNING') as logs:
+            self.client.get(TAGS_URL)
+        self.assertIn('slow_queries', logs.output[0])
+        self.assertIn('core_tag', logs.output[0])
@@ -0,0 +1,141 @@
+from io import StringIO
+from unittest import skipUnless
+from uuid import UUID
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.db import router
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Tag, UserShard
+from core.routers import ShardRouter
+from core.sharding import current_shard, use_shard
+
+User = get_user_model()
+
+TAGS_URL = reverse('tags-list-create')
+TOKEN_URL = reverse('token')
+REGISTER_URL = reverse('register')
+
+TWO_SHARDS = ['default', 'shard1']
+
+
+@override_settings(SHARD_DATABASES=TWO_SHARDS)
+class ShardRouterTests(SimpleTestCase):
+    def test_new_users_are_placed_by_public_id(self):
+        self.assertEqual(router.db_for_write(User, instance=User(public_id=UUID(int=1))), 'shard1')
+        self.assertEqual(router.db_for_write(User, instance=User(public_id=UUID(int=2))), 'default')
+
+    def test_rows_follow_their_user(self):
+        user = User(pk=1, public_id=UUID(int=1))
+        user._state.db = 'shard1'
+        self.assertEqual(router.db_for_write(Tag, instance=Tag(user=user, name='x')), 'shard1')
+
+    def test_unhinted_queries_use_current_shard(self):
+        self.assertIsNone(current_shard.get())
+        with use_shard('shard1'):
+            self.assertEqual(router.db_for_read(Tag), 'shard1')
+        self.assertEqual(router.db_for_read(Tag), 'default')
+
+    def test_directory_stays_on_default(self):
+        with use_shard('shard1'):
+            self.assertEqual(router.db_for_read(UserShard), 'default')
+        self.assertFalse(router.allow_migrate('shard1', 'core', model_name='usershard'))
+        self.assertTrue(router.allow_migrate('shard1', 'core', model_name='tag'))
+
+    @override_settings(SHARD_DATABASES=['default'])
+    def test_single_database_is_not_routed(self):
+        self.assertIsNone(ShardRouter().db_for_read(Tag))
+
+
+class UserDirectoryTests(TestCase):
+    databases = '__all__'
+
+    def test_directory_follows_users_and_tokens(self):
+        user = User.objects.create_user(email='test@example.com', password='testpass123')
+        entry = UserShard.objects.get(user_id=user.pk)
+        self.assertEqual((entry.email, entry.public_id, entry.shard),
+                         ('test@example.com', user.public_id, user._state.db))
+
+        with use_shard(user._state.db):
+            token = Token.objects.create(user=user)
+        entry.refresh_from_db()
+        self.assertEqual(entry.token_key, token.key)
+
+        token.delete()
+        entry.refresh_from_db()
+        self.assertIsNone(entry.token_key)
+
+        user.delete()
+        self.assertFalse(UserShard.objects.exists())
+
+    def test_register_rejects_email_taken_on_another_shard(self):
+        UserShard.objects.create(user_id=10 ** 12, public_id=UUID(int=1),
+                                 email='test@example.com', shard='shard1')
+        res = APIClient().post(REGISTER_URL, {'email': 'test@example.com', 'password': 'testpass123!'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', res.data)
+
+
+class ShardRoutingMiddlewareTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        with use_shard(self.user._state.db):
+            self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_login_and_requests_use_directory(self):
+        with self.settings(SHARD_DATABASES=TWO_SHARDS):
+            res = APIClient().post(TOKEN_URL, {'email': 'test@example.com', 'password': 'testpass123'})
+            self.assertEqual(res.data['token'], self.token.key)
+            res = self.client.post(TAGS_URL, {'name': 'Remote'})
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_writes_wait_while_user_is_moved(self):
+        UserShard.objects.filter(user_id=self.user.pk).update(locked=True)
+        with self.settings(SHARD_DATABASES=TWO_SHARDS):
+            res = self.client.post(TAGS_URL, {'name': 'Remote'})
+            self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(res['Retry-After'], '5')
+            res = self.client.get(TAGS_URL)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+@skipUnless(len(settings.SHARD_DATABASES) > 1, 'Needs a second shard (DB_SHARD_HOSTS).')
+class MoveUserShardTests(TestCase):
+    databases = '__all__'
+
+    def test_move_keeps_rows_and_token(self):
+        user = User.objects.create_user(email='test@example.com', password='testpass123')
+        source = UserShard.objects.get(user_id=user.pk).shard
+        target = next(alias for alias in settings.SHARD_DATABASES if alias != source)
+        with use_shard(source):
+            token = Token.objects.create(user=user)
+            Tag.objects.create(user=user, name='Remote')
+
+        call_command('move_user_shard', user.email, target, drain_seconds=0, stdout=StringIO())
+
+        entry = UserShard.objects.get(user_id=user.pk)
+        self.assertEqual((entry.shard, entry.locked, entry.token_key), (target, False, token.key))
+        self.assertFalse(User.objects.using(source).filter(pk=user.pk).exists())
+        moved = User.objects.using(target).get(pk=user.pk)
+        self.assertEqual(moved.password, user.password)
+        self.assertEqual(list(Tag.objects.using(target).values_list('name', flat=True)), ['Remote'])
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        res = client.get(TAGS_URL)
+        self.assertEqual([tag['name'] for tag in res.data], ['Remote'])
+
+    def test_refuses_same_shard(self):
+        user = User.objects.create_user(email='test@example.com', password='testpass123')
+        with self.assertRaises(CommandError):
+            call_command('move_user_shard', user.email, UserShard.objects.get(user_id=user.pk).shard)
@@ -0,0 +1,116 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.archive import archive, restore
+from core.deletion import schedule
+from core.models import Application, Company, Country, Interview, Resume, Tag, Tombstone
+from core.sync import format_cursor
+from core.tests.test_application_api import sample_application, sample_country, sample_tag
+
+User = get_user_model()
+
+SYNC_URL = reverse('sync')
+
+
+@override_settings(SYNC_OVERLAP_SECONDS=0)
+class SyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = sample_tag(self.user)
+        self.country = sample_country(self.user)
+        self.application = sample_application(self.user)
+        self.interview = Interview.objects.create(user=self.user, application=self.application,
+                                                  date='2025-01-10', note='Phone screen')
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        sample_application(other)
+        # Everything above happened an hour ago.
+        hour_ago = timezone.now() - timedelta(hours=1)
+        for model in (Tag, Country, Company, Resume, Application, Interview):
+            model.objects.update(updated_at=hour_ago)
+        self.since = format_cursor(timezone.now() - timedelta(minutes=1))
+
+    def sync(self, since=None):
+        res = self.client.get(SYNC_URL, {'since': since} if since else {})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_full_sync(self):
+        data = self.sync()
+        self.assertTrue(data['reset'])
+        self.assertEqual([row['id'] for row in data['changes']['application']], [self.application.id])
+        self.assertEqual(data['changes']['application'][0]['company'], self.application.company_id)
+        self.assertEqual(data['changes']['interview'][0]['application'], self.application.id)
+        self.assertEqual(len(data['changes']['tag']), 1)
+        self.assertEqual(data['deleted'], {})
+
+    def test_delta_holds_only_changes(self):
+        data = self.sync(self.since)
+        self.assertFalse(data['reset'])
+        self.assertEqual({name: rows for name, rows in data['changes'].items() if rows}, {})
+
+        self.tag.name = 'renamed'
+        self.tag.save()
+        self.application.tags.add(self.tag)
+        interview_id = self.interview.id
+        self.interview.delete()
+        schedule(self.country, self.user)
+
+        data = self.sync(self.since)
+        self.assertEqual([row['name'] for row in data['changes']['tag']], ['renamed'])
+        self.assertEqual(data['changes']['application'][0]['tags'], [self.tag.id])
+        self.assertEqual(data['changes']['country'], [])
+        self.assertEqual(data['deleted'], {'interview': [interview_id], 'country': [self.country.id]})
+
+        # The next cursor starts after these changes.
+        self.assertEqual(self.sync(data['cursor'])['deleted'], {})
+
+    def test_children_of_a_hidden_company_count_as_deleted(self):
+        schedule(self.application.company, self.user)
+
+        data = self.sync()
+        self.assertEqual((data['changes']['application'], data['changes']['interview']), ([], []))
+        data = self.sync(self.since)
+        self.assertEqual(data['deleted'], {
+            'company': [self.application.company_id],
+            'application': [self.application.id],
+            'interview': [self.interview.id],
+        })
+        self.assertEqual(self.sync(data['cursor'])['deleted'], {})
+
+    def test_reverse_link_changes_stamp_owners(self):
+        self.tag.application_set.add(self.application)
+        self.assertEqual(len(self.sync(self.since)['changes']['application']), 1)
+
+    def test_restore_replaces_tombstones(self):
+        archive(Application.objects.all())
+        self.assertEqual(self.sync(self.since)['deleted']['application'], [self.application.id])
+        restore()
+        data = self.sync(self.since)
+        self.assertNotIn('application', data['deleted'])
+        self.assertEqual([row['id'] for row in data['changes']['interview']], [self.interview.id])
+
+    @override_settings(SYNC_TOMBSTONE_DAYS=1)
+    def test_old_cursors_reset_and_tombstones_are_pruned(self):
+        self.interview.delete()
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=2))
+        data = self.sync(format_cursor(timezone.now() - timedelta(days=3)))
+        self.assertTrue(data['reset'])
+
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Pruned 1 tombstones', out.getvalue())
+
+    def test_rejects_bad_cursor(self):
+        res = self.client.get(SYNC_URL, {'since': 'yesterday'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('since', res.data)
@@ -0,0 +1,106 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, Company, Interview, Tag
+from core.tests.test_application_api import sample_application, sample_tag
+
+User = get_user_model()
+
+TAGS_URL = reverse('tags-list-create')
+CLOUD_URL = reverse('tags-cloud')
+
+
+def uses(tag):
+    tag.refresh_from_db()
+    return (tag.company_uses, tag.resume_uses, tag.application_uses, tag.interview_uses)
+
+
+class TagUsageCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.tag = sample_tag(self.user)
+        self.other = sample_tag(self.user)
+
+    def test_counters_follow_m2m_changes(self):
+        application = sample_application(self.user)
+        application.tags.add(self.tag, self.other)
+        application.tags.add(self.tag)
+        application.company.tags.add(self.tag)
+        self.assertEqual(uses(self.tag), (1, 0, 1, 0))
+
+        application.tags.remove(self.tag)
+        application.tags.remove(self.tag)
+        self.assertEqual(uses(self.tag), (1, 0, 0, 0))
+
+        application.tags.set([self.tag])
+        self.assertEqual((uses(self.tag), uses(self.other)), ((1, 0, 1, 0), (0, 0, 0, 0)))
+
+        application.tags.clear()
+        self.assertEqual(uses(self.tag), (1, 0, 0, 0))
+
+    def test_reverse_side_and_deletes(self):
+        first, second = sample_application(self.user), sample_application(self.user)
+        self.tag.application_set.add(first, second)
+        self.assertEqual(uses(self.tag)[2], 2)
+        self.tag.application_set.remove(first)
+        self.assertEqual(uses(self.tag)[2], 1)
+
+        interview = Interview.objects.create(user=self.user, application=second, date='2025-01-10', note='x')
+        interview.tags.add(self.tag)
+        self.assertEqual(uses(self.tag), (0, 0, 1, 1))
+        # Cascades remove links without m2m_changed.
+        second.delete()
+        self.assertEqual(uses(self.tag), (0, 0, 0, 0))
+
+        self.tag.application_set.add(first)
+        self.tag.application_set.clear()
+        self.assertEqual(uses(self.tag)[2], 0)
+
+    def test_reconcile_fixes_drift(self):
+        application = sample_application(self.user)
+        Application.tags.through.objects.create(application=application, tag=self.tag)
+        Company.tags.through.objects.create(company=application.company, tag=self.tag)
+        Tag.objects.filter(id=self.other.id).update(resume_uses=4)
+
+        out = StringIO()
+        call_command('reconcile_tag_usage', stdout=out)
+        self.assertIn('2 tags had drifted', out.getvalue())
+        self.assertEqual(uses(self.tag), (1, 0, 1, 0))
+        self.assertEqual(uses(self.other), (0, 0, 0, 0))
+
+
+class TagCloudApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cloud_orders_by_usage(self):
+        popular, rare, unused = sample_tag(self.user), sample_tag(self.user), sample_tag(self.user)
+        application = sample_application(self.user)
+        application.tags.add(popular, rare)
+        application.company.tags.add(popular)
+        other = User.objects.create_user(email='other@example.com', password='testpass123')
+        sample_application(other).tags.add(sample_tag(other))
+
+        res = self.client.get(CLOUD_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag['id'] for tag in res.data], [popular.id, rare.id])
+        self.assertNotIn(unused.id, [tag['id'] for tag in res.data])
+        self.assertEqual((res.data[0]['usage'], res.data[0]['weight']), (2, 1.0))
+        self.assertEqual((res.data[1]['application_uses'], res.data[1]['weight']), (1, 0.5))
+        self.assertEqual(len(self.client.get(CLOUD_URL, {'limit': 1}).data), 1)
+
+    def test_usage_field_is_opt_in(self):
+        tag = sample_tag(self.user)
+        sample_application(self.user).tags.add(tag)
+
+        self.assertNotIn('usage', self.client.get(TAGS_URL).data[0])
+        self.assertEqual(self.client.get(TAGS_URL, {'usage': 'true'}).data[0]['usage'], 1)
@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import throttling
+
+User = get_user_model()
+
+TOKEN_URL = reverse('token')
+TAGS_URL = reverse('tags-list-create')
+
+
+class TakeTests(SimpleTestCase):
+    def setUp(self):
+        throttling._local.clear()
+
+    def take(self, **buckets):
+        return throttling.take(throttling._local, buckets)
+
+    def test_bucket_bursts_then_refills(self):
+        with mock.patch('core.throttling.time.time', return_value=1000.0) as clock:
+            self.assertEqual([self.take(k=(3, 0.5)) for _ in range(3)], [0, 0, 0])
+            self.assertEqual(self.take(k=(3, 0.5)), 2.0)
+            clock.return_value = 1001.0
+            self.assertEqual(self.take(k=(3, 0.5)), 1.0)
+            clock.return_value = 1002.0
+            self.assertEqual(self.take(k=(3, 0.5)), 0)
+
+    def test_takes_from_all_buckets_or_none(self):
+        with mock.patch('core.throttling.time.time', return_value=1000.0):
+            self.assertEqual(self.take(a=(1, 1.0), b=(2, 1.0)), 0)
+            self.assertEqual(self.take(a=(1, 1.0), b=(2, 1.0)), 1.0)
+            self.assertEqual(self.take(b=(2, 1.0)), 0)
+            self.assertEqual(self.take(b=(2, 1.0)), 1.0)
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate('10/min'), (10, 10 / 60))
+        self.assertEqual(throttling.parse_rate('20/hour'), (20, 20 / 3600))
+
+
+class ThrottleApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        User.objects.create_user(email='user@example.com', password='testpass123')
+
+    def login(self, address='10.0.0.1', **extra):
+        return APIClient().post(TOKEN_URL, {'email': 'user@example.com', 'password': 'wrong'},
+                                REMOTE_ADDR=address, **extra)
+
+    @override_settings(THROTTLE_RATES={'login': {'ip': '2/min'}})
+    def test_login_is_limited_per_address(self):
+        self.assertEqual([self.login().status_code for _ in range(2)], [400, 400])
+        res = self.login(HTTP_X_FORWARDED_FOR='10.9.9.9')
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn(int(res['Retry-After']), range(25, 31))
+        self.assertEqual(self.login('10.0.0.2').status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(THROTTLE_RATES={'write': {'user': '1/min'}})
+    def test_writes_are_limited_per_user(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.get())
+        self.assertEqual(client.post(TAGS_URL, {'name': 'a'}).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(client.post(TAGS_URL, {'name': 'b'}).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(client.get(TAGS_URL).status_code, status.HTTP_200_OK)
+
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(email='other@example.com', password='testpass123'))
+        self.assertEqual(other.post(TAGS_URL, {'name': 'a'}).status_code, status.HTTP_201_CREATED)
+
+    @override_settings(THROTTLE_RATES={'login': {'ip': '1/min'}})
+    def test_falls_back_to_local_memory(self):
+        throttling._local.clear()
+        broken = mock.Mock(**{'get_many.side_effect': ConnectionError})
+        with mock.patch('core.throttling.caches', {'default': broken}), \
+                self.assertLogs('core.throttling', 'WARNING'):
+            self.assertEqual(self.login().status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(self.login().status_code, status.HTTP_429_TOO_MANY_REQUESTS)
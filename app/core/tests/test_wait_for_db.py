@@ -0,0 +1,41 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command, CommandError
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+from core.startup import warm_up
+
+
+@mock.patch('core.startup.time.sleep')
+@mock.patch('core.startup.connections')
+class WaitForDbCommandTests(SimpleTestCase):
+    def test_database_ready_immediately(self, patched_connections, patched_sleep):
+        out = StringIO()
+        call_command('wait_for_db', skip_warm_up=True, stdout=out)
+        patched_connections['default'].ensure_connection.assert_called_once()
+        patched_sleep.assert_not_called()
+        self.assertIn('after 1 attempt', out.getvalue())
+
+    def test_retries_with_bounded_backoff(self, patched_connections, patched_sleep):
+        patched_connections['default'].ensure_connection.side_effect = \
+            [OperationalError] * 4 + [None]
+        call_command('wait_for_db', skip_warm_up=True, max_delay=0.5, stdout=StringIO())
+        self.assertEqual(patched_connections['default'].ensure_connection.call_count, 5)
+        self.assertEqual(patched_sleep.call_count, 4)
+        for call in patched_sleep.call_args_list:
+            self.assertLessEqual(call.args[0], 0.5)
+
+    def test_fails_after_deadline(self, patched_connections, patched_sleep):
+        patched_connections['default'].ensure_connection.side_effect = OperationalError
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=0, skip_warm_up=True, stdout=StringIO())
+
+
+class WarmUpTests(SimpleTestCase):
+    def test_warm_up_touches_urls_serializers_and_validators(self):
+        summary = warm_up()
+        self.assertGreater(summary['url_patterns'], 10)
+        self.assertGreater(summary['serializers'], 5)
+        self.assertEqual(summary['password_validators'], 4)
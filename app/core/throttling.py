@@ -0,0 +1,100 @@
+"""Token-bucket throttles per client IP and per user.
+
+A view's `throttle_scope` names its limits in `THROTTLE_RATES`; views
+without one use `write` for unsafe methods and are not throttled on reads.
+A rate `N/period` is a bucket of N requests, refilled evenly over the
+period, so a client may burst N requests and then gets one every
+period/N. Rejections are `429` with `Retry-After` (rest_framework's
+`Throttled`).
+
+Buckets live in the `THROTTLE_CACHE` cache as `(tokens, timestamp)`; a
+request reads its IP and user buckets together and, if allowed, writes
+them together. The read-modify-write is not atomic, so concurrent requests
+may occasionally slip one past the limit. When the cache is unreachable
+each process falls back to its own memory.
+"""
+import logging
+import math
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+_local = LocMemCache('throttling', {'OPTIONS': {'MAX_ENTRIES': 10000}})
+
+
+@lru_cache
+def parse_rate(rate):
+    """`(capacity, tokens per second)` of a rate such as `10/min`."""
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period[0]]
+
+
+def scope(request, view):
+    explicit = getattr(view, 'throttle_scope', None)
+    if explicit is not None:
+        return explicit
+    return None if request.method in SAFE_METHODS else 'write'
+
+
+def take(cache, buckets):
+    """Take a token from each `{key: (capacity, tokens per second)}` bucket, or from none.
+
+    Returns 0, or the seconds until every bucket has a token again.
+    """
+    now = time.time()
+    states = cache.get_many(buckets)
+    tokens, delay = {}, 0
+    for key, (capacity, refill) in buckets.items():
+        left, stamp = states.get(key, (capacity, now))
+        tokens[key] = min(capacity, left + (now - stamp) * refill)
+        if tokens[key] < 1:
+            delay = max(delay, (1 - tokens[key]) / refill)
+    if delay:
+        return delay
+    # An untouched bucket is full again once its entry expires.
+    timeout = max(math.ceil(capacity / refill) for capacity, refill in buckets.values())
+    cache.set_many({key: (tokens[key] - 1, now) for key in buckets}, timeout)
+    return 0
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """The `ip` and `user` buckets of the view's scope, in one cache round trip each way."""
+
+    def client(self, request, kind):
+        if kind == 'ip':
+            # `NUM_PROXIES` applies, as in rest_framework's throttles.
+            return self.get_ident(request)
+        user = getattr(request, 'user', None)
+        return user.pk if user is not None and user.is_authenticated else None
+
+    def allow_request(self, request, view):
+        self.delay = None
+        name = scope(request, view)
+        rates = settings.THROTTLE_RATES.get(name)
+        if not rates:
+            return True
+        buckets = {}
+        for kind, rate in rates.items():
+            client = self.client(request, kind)
+            if client is not None:
+                buckets[f'throttle:{name}:{kind}:{client}'] = parse_rate(rate)
+        if not buckets:
+            return True
+        try:
+            self.delay = take(caches[settings.THROTTLE_CACHE], buckets)
+        except Exception:
+            logger.warning('Throttle cache unavailable, using local memory', exc_info=True)
+            self.delay = take(_local, buckets)
+        return not self.delay
+
+    def wait(self):
+        return self.delay
@@ -0,0 +1,114 @@
+"""Batch requests: several API calls in one round trip and one transaction.
+
+`run` dispatches each operation straight to its view in `main.views`,
+bypassing the middleware and reusing the batch request's authentication.
+Operations run in order and stop at the first that answers `4xx`/`5xx`;
+the caller rolls the transaction back then.
+
+A string in an operation's `path` or `body` may refer to the response
+body of an earlier operation as `{{N.dotted.path}}` (N counts from 0). A
+string that is only a reference is replaced by the value itself, so ids
+stay numbers; inside a longer string the value is interpolated as text.
+"""
+import io
+import json
+import re
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.views import APIView
+
+REFERENCE = re.compile(r'\{\{\s*(\d+)((?:\.[^.{}\s]+)*)\s*\}\}')
+
+# Headers of the batch request that must not leak into its operations.
+DROPPED_META = {'CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IDEMPOTENCY_KEY', 'wsgi.input'}
+
+
+def _lookup(results, match):
+    index, path = int(match.group(1)), match.group(2)
+    if index >= len(results):
+        raise LookupError(f'{match.group(0)} refers to an operation that has not run yet.')
+    value = results[index]['body']
+    for part in filter(None, path.split('.')):
+        try:
+            value = value[int(part)] if isinstance(value, list) else value[part]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise LookupError(f'{match.group(0)} is not in the response of operation {index}.') from None
+    return value
+
+
+def substitute(value, results):
+    """`value` with its references to `results` resolved; LookupError if one cannot be."""
+    if isinstance(value, str):
+        whole = REFERENCE.fullmatch(value)
+        if whole:
+            return _lookup(results, whole)
+        return REFERENCE.sub(lambda match: str(_lookup(results, match)), value)
+    if isinstance(value, dict):
+        return {key: substitute(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, results) for item in value]
+    return value
+
+
+def batchable(func):
+    view_class = getattr(func, 'view_class', None)
+    return view_class is not None and issubclass(view_class, APIView) \
+        and view_class.__module__ == 'main.views' and getattr(view_class, 'batchable', True)
+
+
+def subrequest(request, method, path, body):
+    """A JSON request for `path` on behalf of `request`'s user."""
+    url = urlsplit(path)
+    payload = b'' if body is None else json.dumps(body).encode()
+    environ = {key: value for key, value in request.META.items() if key not in DROPPED_META}
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(payload)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(payload),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub = WSGIRequest(environ)
+    # rest_framework authenticates a request carrying these as this user.
+    sub._force_auth_user, sub._force_auth_token = request.user, request.auth
+    return sub
+
+
+def _error(code, detail):
+    return {'status': code, 'body': {'detail': detail}}
+
+
+def _execute(request, operation, results):
+    try:
+        path = substitute(operation['path'], results)
+        body = substitute(operation.get('body'), results)
+    except LookupError as exc:
+        return _error(status.HTTP_400_BAD_REQUEST, str(exc))
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        match = None
+    if match is None or not batchable(match.func):
+        return _error(status.HTTP_404_NOT_FOUND, f'{path} is not an endpoint that can be batched.')
+    response = match.func(subrequest(request, operation['method'], path, body), *match.args, **match.kwargs)
+    if hasattr(response, 'data'):
+        data = response.data
+    else:
+        data = json.loads(response.content) if response.content else None
+    return {'status': response.status_code, 'body': data}
+
+
+def run(request, operations):
+    """`[{status, body}]` of `operations` in order, up to and including the first that fails."""
+    results = []
+    for operation in operations:
+        results.append(_execute(request, operation, results))
+        if results[-1]['status'] >= 400:
+            break
+    return results
@@ -0,0 +1,140 @@
+"""Fast read path for list responses.
+
+`build_plan()` turns a shaped read serializer into a plan that builds the
+same output straight from `values_list()` rows: plain columns are copied
+(or passed through the field's own `to_representation`), id relations
+come from one grouped query per many-to-many, and embedded objects are
+built by the plan of their serializer and attached through id maps. No
+model instances are created and no DRF field machinery runs per row.
+
+Anything the plan cannot reproduce exactly -- method fields, properties,
+`source='*'`, custom `to_representation`, side-loaded relations --
+makes `build_plan()` return None, and the caller falls back to DRF.
+"""
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.utils.serializer_helpers import ReturnList
+
+from core.deletion import visible
+
+# Fields whose to_representation() returns database values unchanged.
+IDENTITY = {
+    serializers.IntegerField, serializers.CharField, serializers.BooleanField,
+    serializers.ChoiceField, serializers.URLField, serializers.EmailField,
+}
+
+
+def _model_serializer(field):
+    child = field.child if isinstance(field, serializers.ListSerializer) else field
+    return child if isinstance(child, serializers.ModelSerializer) else None
+
+
+def _grouped(model_field, pks):
+    """{owner pk: [related pks]} over the forward many-to-many `model_field`.
+
+    Joins like the prefetch DRF's path runs, so each list keeps its order;
+    objects hidden for a background delete are left out as there.
+    """
+    owner = model_field.related_query_name()
+    groups = defaultdict(list)
+    for owner_pk, pk in (visible(model_field.related_model._default_manager.all())
+                         .filter(**{f'{owner}__in': pks}).values_list(owner, 'pk')):
+        groups[owner_pk].append(pk)
+    return groups
+
+
+class Plan:
+    def __init__(self, model):
+        self.columns = [model._meta.pk.attname]
+        self.fields = []  # (name, column index or None, convert)
+        self.many_ids = []  # (name, model field)
+        self.nested = []  # (name, model field, plan)
+
+    def column(self, name):
+        if name not in self.columns:
+            self.columns.append(name)
+        return self.columns.index(name)
+
+    def rows(self, queryset):
+        """(pks, output dicts) for `queryset`, in its order."""
+        rows = list(queryset.values_list(*self.columns))
+        pks = [row[0] for row in rows]
+        lookups = {}
+        for name, model_field in self.many_ids:
+            groups = _grouped(model_field, pks)
+            lookups[name] = lambda row, groups=groups: groups.get(row[0], [])
+        for name, model_field, plan in self.nested:
+            lookups[name] = self.attach(model_field, plan, rows, pks)
+
+        out = []
+        for row in rows:
+            item = {}
+            for name, index, convert in self.fields:
+                if index is None:
+                    item[name] = lookups[name](row)
+                    continue
+                value = row[index]
+                item[name] = value if convert is None or value is None else convert(value)
+            out.append(item)
+        return pks, out
+
+    def attach(self, model_field, plan, rows, pks):
+        manager = model_field.related_model._default_manager
+        if model_field.many_to_many:
+            groups = _grouped(model_field, pks)
+            ids = {pk for members in groups.values() for pk in members}
+            related = dict(zip(*plan.rows(manager.filter(pk__in=ids))))
+            return lambda row: [related[pk] for pk in groups.get(row[0], [])]
+        index = self.columns.index(model_field.attname)
+        ids = {row[index] for row in rows if row[index] is not None}
+        related = dict(zip(*plan.rows(visible(manager.filter(pk__in=ids))))) if ids else {}
+        return lambda row: related.get(row[index])
+
+
+def build_plan(serializer):
+    """The Plan rendering `serializer` (or its `many=True` child), or None."""
+    serializer = _model_serializer(serializer)
+    if serializer is None or type(serializer).to_representation is not serializers.Serializer.to_representation:
+        return None
+    model = serializer.Meta.model
+    plan = Plan(model)
+    for field in serializer._readable_fields:
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        nested = _model_serializer(field)
+        forward_m2m = isinstance(model_field, models.ManyToManyField)
+        if nested is not None and (forward_m2m or model_field.many_to_one):
+            sub = build_plan(nested)
+            if sub is None:
+                return None
+            if model_field.many_to_one:
+                plan.column(model_field.attname)
+            plan.nested.append((field.field_name, model_field, sub))
+            plan.fields.append((field.field_name, None, None))
+        elif isinstance(field, serializers.ManyRelatedField) and forward_m2m \
+                and isinstance(field.child_relation, serializers.PrimaryKeyRelatedField) \
+                and field.child_relation.pk_field is None:
+            plan.many_ids.append((field.field_name, model_field))
+            plan.fields.append((field.field_name, None, None))
+        elif isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None \
+                and model_field.many_to_one:
+            plan.fields.append((field.field_name, plan.column(model_field.attname), None))
+        elif model_field.is_relation or isinstance(field, (serializers.FileField, serializers.SerializerMethodField)):
+            return None
+        else:
+            convert = None if type(field) in IDENTITY else field.to_representation
+            plan.fields.append((field.field_name, plan.column(model_field.attname), convert))
+    return plan
+
+
+def serialize(serializer, queryset):
+    """`serializer.data` for the rows of `queryset` without DRF's per-row work, or None."""
+    plan = build_plan(serializer)
+    if plan is None:
+        return None
+    return ReturnList(plan.rows(queryset)[1], serializer=serializer)
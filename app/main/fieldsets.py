@@ -0,0 +1,216 @@
+"""Sparse fieldsets and relation expansion for the read serializers.
+
+Read endpoints render relations as ids. `?expand=application.company,tags`
+embeds those relations instead (dotted paths expand inside an expanded
+object), and `?sideload=true` keeps them as ids while adding every expanded
+object once to an `included` section, keyed by model and id.
+
+`?fields=id,position,company.name` keeps only those fields in the output;
+a dotted path selects inside a nested object (and expands it), a bare name
+keeps the whole of it.
+
+The shaped serializer then decides what the ORM loads: `only()` the
+columns it renders, `select_related` the objects it embeds and `Prefetch`
+the lists, so small views cost fewer queries and less I/O as well as
+fewer bytes.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from rest_framework import serializers
+
+from core.deletion import hidden, hides, visible
+from core.params import truthy
+from main import fastpath
+
+
+def parse(value):
+    """'id,company.name' -> {'id': {}, 'company': {'name': {}}}; empty subtree = everything."""
+    tree = {}
+    for path in filter(None, (part.strip() for part in (value or '').split(','))):
+        node = tree
+        for name in path.split('.'):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _nested(field):
+    """The serializer behind `field` (unwrapping `many=True` and `Included`), or None."""
+    child = getattr(field, 'child', field)
+    return child if isinstance(child, serializers.BaseSerializer) else None
+
+
+def _many(field):
+    return isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)) \
+        or getattr(field, 'many', False)
+
+
+class Included(serializers.Field):
+    """A relation rendered as its id(s), its objects collected into `context['included']`."""
+
+    def __init__(self, serializer, many=False, **kwargs):
+        self.child = serializer
+        self.many = many
+        super().__init__(read_only=True, **kwargs)
+
+    def collect(self, obj):
+        included = self.context['included'].setdefault(obj._meta.model_name, {})
+        if obj.pk not in included:
+            included[obj.pk] = None  # guards against cycles while rendering
+            included[obj.pk] = self.child.to_representation(obj)
+        return obj.pk
+
+    def get_attribute(self, instance):
+        value = super().get_attribute(instance)
+        return None if not self.many and value is not None and hidden(value) else value
+
+    def to_representation(self, value):
+        if self.many:
+            return [self.collect(obj) for obj in value.all()]
+        return self.collect(value)
+
+
+def shape(serializer, expand, fields, sideload=False, path=''):
+    """Collapse the relations `expand` (or a nested `fields` selection) does not ask for to ids."""
+    relations = {name for name, field in serializer.fields.items()
+                 if not field.write_only and _nested(field) is not None}
+    unknown = sorted(f'{path}{name}' for name in expand if name not in relations)
+    if unknown:
+        raise serializers.ValidationError({'expand': [f'Not an expandable relation: {name}' for name in unknown]})
+    for name in relations:
+        field = serializer.fields[name]
+        source = {} if field.source == name else {'source': field.source}
+        if name not in expand and not fields.get(name):
+            serializer.fields[name] = serializers.PrimaryKeyRelatedField(
+                read_only=True, many=_many(field), **source
+            )
+            continue
+        nested = _nested(field)
+        shape(nested, expand.get(name, {}), fields.get(name, {}), sideload, f'{path}{name}.')
+        if sideload:
+            serializer.fields[name] = Included(nested, many=_many(field), **source)
+
+
+def prune(serializer, tree, path=''):
+    """Drop the readable fields of `serializer` that `tree` does not name."""
+    if not tree:
+        return
+    fields = serializer.fields
+    readable = {name for name, field in fields.items() if not field.write_only}
+    unknown = sorted(f'{path}{name}' for name in tree if name not in readable)
+    if unknown:
+        raise serializers.ValidationError({'fields': [f'Unknown field: {name}' for name in unknown]})
+    for name in readable - tree.keys():
+        fields.pop(name)
+    for name, subtree in tree.items():
+        nested = _nested(fields[name])
+        if nested is not None:
+            prune(nested, subtree, f'{path}{name}.')
+        elif subtree:
+            raise serializers.ValidationError({'fields': [f'{path}{name} has no fields to select']})
+
+
+class FieldsetMixin:
+    """Shape to `context['expand']` and prune to `context['fields']` as the root serializer.
+
+    Both are `parse()` trees; without an `expand` key (write responses)
+    relations stay embedded. Nested serializers are created before they
+    have a context, and are shaped by their root instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields') or {}
+        if 'expand' in self.context:
+            shape(self, self.context['expand'], fields, sideload='included' in self.context)
+        if fields:
+            prune(self, fields)
+
+
+def read_context(request, **extra):
+    params = request.query_params
+    context = {
+        'request': request,
+        'fields': parse(params.get('fields')),
+        'expand': parse(params.get('expand')),
+        **extra,
+    }
+    if truthy(params.get('sideload')):
+        context['included'] = {}
+    return context
+
+
+def _payload(data, context):
+    if 'included' not in context:
+        return data
+    return {'data': data, 'included': context['included']}
+
+
+def _plan(model, serializer):
+    """(columns or None for all, select_related paths, Prefetch objects) for `serializer`."""
+    columns, select, prefetch = {model._meta.pk.name}, [], []
+    if hides(model):
+        # Read to leave embedded objects being deleted out (main.serializers.VisibleMixin).
+        columns.add('deleting')
+    exact = True
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            # '*', dotted sources, properties: cannot tell which columns they read.
+            exact = False
+            continue
+        nested = _nested(field)
+        if model_field.many_to_many or model_field.one_to_many:
+            related = visible(model_field.related_model._default_manager.all())
+            # Reverse FKs are matched back to their parent through the FK column.
+            required = [model_field.field.name] if model_field.one_to_many else []
+            if nested is not None:
+                related = optimize(related, nested, required)
+            else:
+                related = related.only(model_field.related_model._meta.pk.name, *required)
+            prefetch.append(Prefetch(field.source, queryset=related))
+        elif model_field.is_relation and nested is not None:
+            columns.add(model_field.name)
+            sub_columns, sub_select, sub_prefetch = _plan(model_field.related_model, nested)
+            select += [field.source] + [f'{field.source}__{path}' for path in sub_select]
+            prefetch += [Prefetch(f'{field.source}__{item.prefetch_through}', queryset=item.queryset)
+                         for item in sub_prefetch]
+            if sub_columns is None:
+                exact = False
+            else:
+                columns |= {f'{field.source}__{column}' for column in sub_columns}
+        else:
+            columns.add(model_field.name)
+    return (columns if exact else None), select, prefetch
+
+
+def optimize(queryset, serializer, required=()):
+    """`queryset` loading just what `serializer` (or its `many=True` child) renders."""
+    columns, select, prefetch = _plan(queryset.model, getattr(serializer, 'child', serializer))
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    if columns is not None:
+        queryset = queryset.only(*columns, *required)
+    return queryset
+
+
+def serialize_list(serializer_class, queryset, context):
+    serializer = serializer_class(many=True, context=context)
+    if 'included' not in context:
+        data = fastpath.serialize(serializer, queryset)
+        if data is not None:
+            return data
+    serializer.instance = optimize(queryset, serializer)
+    return _payload(serializer.data, context)
+
+
+def serialize_object(serializer_class, queryset, context, **lookup):
+    """Data for the object matching `lookup` in `queryset`, or Http404."""
+    serializer = serializer_class(context=context)
+    serializer.instance = get_object_or_404(optimize(queryset, serializer), **lookup)
+    return _payload(serializer.data, context)
@@ -1,29 +1,88 @@
 from rest_framework.serializers import ModelSerializer
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
-from core.models import *
-from django.db import transaction
+from core.models import (
+    Tag, Country, Company, Resume, Application, Interview,
+    ArchivedApplication, ArchivedInterview, DeletionJob,
+)
+from django.conf import settings
+from django.db import models, transaction
 
+from core import events
+from core.deletion import hidden
+from main.fieldsets import FieldsetMixin
 
-class TagSerializer(ModelSerializer):
+
+class PublishMixin:
+    """Announce saved objects on the owner's live event streams (see core.events)."""
+
+    def save(self, **kwargs):
+        instance = super().save(**kwargs)
+        events.publish(instance, 'changed')
+        return instance
+
+
+class VisibleListSerializer(serializers.ListSerializer):
+    """Leaves out the objects hidden for a background delete (see core.deletion)."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return super().to_representation([obj for obj in iterable if not hidden(obj)])
+
+
+class VisibleMixin:
+    """As a nested field, renders an object hidden for a background delete as null."""
+
+    def get_attribute(self, instance):
+        value = super().get_attribute(instance)
+        return None if value is not None and hidden(value) else value
+
+
+class TagSerializer(VisibleMixin, PublishMixin, FieldsetMixin, ModelSerializer):
     user = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )
+    usage = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'user']
+        fields = ['id', 'name', 'user', 'usage']
         read_only_fields = ['id']
+        list_serializer_class = VisibleListSerializer
         validators = [
             UniqueTogetherValidator(
-                queryset=Tag.objects.all(),
+                queryset=Tag.objects.filter(deleting=False),
                 fields=['name', 'user'],
                 message='Names need to be unique for every user'
             )
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Usage counts are opt-in: `context={'usage': True}`.
+        if not self.context.get('usage'):
+            self.fields.pop('usage', None)
+
+
+class TagCloudSerializer(FieldsetMixin, ModelSerializer):
+    usage = serializers.IntegerField(read_only=True)
+    weight = serializers.SerializerMethodField()
 
-class CountrySerializer(ModelSerializer):
+    class Meta:
+        model = Tag
+        fields = [
+            'id', 'name', 'usage', 'weight',
+            'company_uses', 'resume_uses', 'application_uses', 'interview_uses',
+        ]
+        read_only_fields = fields
+
+    def get_weight(self, obj) -> float:
+        """Usage relative to the most used tag in the response, 0..1."""
+        top = self.context.get('top_usage') or 0
+        return round(obj.usage / top, 3) if top else 0.0
+
+
+class CountrySerializer(VisibleMixin, PublishMixin, FieldsetMixin, ModelSerializer):
     user = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )
@@ -32,21 +91,22 @@ class CountrySerializer(ModelSerializer):
         model = Country
         fields = ['id', 'name', 'user']
         read_only_fields = ['id']
+        list_serializer_class = VisibleListSerializer
         validators = [
             UniqueTogetherValidator(
-                queryset=Country.objects.all(),
+                queryset=Country.objects.filter(deleting=False),
                 fields=['name', 'user'],
                 message='Names need to be unique for every user'
             )
         ]
 
 
-class CompanySerializer(ModelSerializer):
+class CompanySerializer(VisibleMixin, PublishMixin, FieldsetMixin, ModelSerializer):
     user = serializers.HiddenField(
         default=serializers.CurrentUserDefault()
     )
     country = serializers.PrimaryKeyRelatedField(
-        queryset=Country.objects.all(),
+        queryset=Country.objects.filter(deleting=False),
         required=False,
         write_only=True
     )
@@ -63,9 +123,10 @@ class CompanySerializer(ModelSerializer):
         model = Company
         fields = ['id', 'user', 'name', 'country', 'country_detail', 'link', 'tags', 'tag_details']
         read_only_fields = ['id', 'country_detail']
+        list_serializer_class = VisibleListSerializer
         validators = [
             UniqueTogetherValidator(
-                queryset=Company.objects.all(),
+                queryset=Company.objects.filter(deleting=False),
                 fields=['user', 'name'],
                 message='Trying to create duplicate country.'
             )
@@ -75,7 +136,7 @@ class CompanySerializer(ModelSerializer):
         obj_list = []
         for tag in tags:
             request = self.context.get('request')
-            tag_obj, _ = Tag.objects.get_or_create(name=tag, user=request.user)
+            tag_obj, _ = Tag.objects.get_or_create(name=tag, user=request.user, deleting=False)
             obj_list.append(tag_obj)
         return obj_list
 
@@ -98,7 +159,7 @@ class CompanySerializer(ModelSerializer):
         return company
 
 
-class ResumeReadSerializer(ModelSerializer):
+class ResumeReadSerializer(FieldsetMixin, ModelSerializer):
     tags = TagSerializer(many=True)
     class Meta:
         model = Resume
@@ -111,7 +172,7 @@ class ResumeReadSerializer(ModelSerializer):
         raise NotImplementedError("ResumeReadSerializer is read-only")
 
 
-class ResumeWriteSerializer(ModelSerializer):
+class ResumeWriteSerializer(PublishMixin, ModelSerializer):
     tags = serializers.ListField(
         child=serializers.CharField(max_length = 255),
         max_length = 5,
@@ -129,7 +190,7 @@ class ResumeWriteSerializer(ModelSerializer):
             raise ValueError('Request must be passed in context')
         objs = []
         for tag in tags:
-            obj, _ = Tag.objects.get_or_create(user=request.user, name=tag)
+            obj, _ = Tag.objects.get_or_create(user=request.user, name=tag, deleting=False)
             objs.append(obj)
         return objs
 
@@ -176,20 +237,20 @@ class ResumeWriteSerializer(ModelSerializer):
         return instance
 
 
-class ApplicationSerializer(ModelSerializer):
+class ApplicationSerializer(PublishMixin, FieldsetMixin, ModelSerializer):
     company = CompanySerializer(read_only=True)
     country = CountrySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
 
     company_id = serializers.PrimaryKeyRelatedField(
-        queryset=Company.objects.all(), source="company", write_only=True
+        queryset=Company.objects.filter(deleting=False), source="company", write_only=True
     )
     country_id = serializers.PrimaryKeyRelatedField(
-        queryset=Country.objects.all(), source="country",
+        queryset=Country.objects.filter(deleting=False), source="country",
         required=False, allow_null=True, write_only=True
     )
     tag_ids = serializers.PrimaryKeyRelatedField(
-        queryset=Tag.objects.all(), source="tags", many=True,
+        queryset=Tag.objects.filter(deleting=False), source="tags", many=True,
         required=False, write_only=True, allow_empty=True
     )
     resume_id = serializers.PrimaryKeyRelatedField(
@@ -224,7 +285,20 @@ class ApplicationSerializer(ModelSerializer):
             instance.tags.set(tags)
         return instance
 
-class InterviewReadSerializer(serializers.ModelSerializer):
+class ArchivedApplicationSerializer(ApplicationSerializer):
+    class Meta(ApplicationSerializer.Meta):
+        model = ArchivedApplication
+        fields = ApplicationSerializer.Meta.fields + ["archived_at"]
+        read_only_fields = fields
+
+    def create(self, validated_data):
+        raise NotImplementedError('Archived applications are read only')
+
+    def update(self, instance, validated_data):
+        raise NotImplementedError('Archived applications are read only')
+
+
+class InterviewReadSerializer(FieldsetMixin, serializers.ModelSerializer):
     application = ApplicationSerializer()
     tags = TagSerializer(many=True)
 
@@ -238,7 +312,7 @@ class InterviewReadSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         raise NotImplementedError('This class is read only')
 
-class InterviewWriteSerializer(serializers.ModelSerializer):
+class InterviewWriteSerializer(PublishMixin, serializers.ModelSerializer):
     tags = serializers.ListField(
         child=serializers.CharField(max_length=255),
         required=False,
@@ -252,7 +326,7 @@ class InterviewWriteSerializer(serializers.ModelSerializer):
         fields = ['user', 'application', 'tags', 'date', 'note']
         read_only_fields = ['user']
         extra_kwargs = {
-            'application': {'write_only': True},
+            'application': {'write_only': True, 'queryset': Application.objects.filter(company__deleting=False)},
             'note': {'required': False, 'allow_blank': True}
         }
 
@@ -271,7 +345,7 @@ class InterviewWriteSerializer(serializers.ModelSerializer):
             raise ValueError('Request must be passed in context')
         objs = []
         for tag in tags:
-            obj, _ = Tag.objects.get_or_create(user=request.user, name=tag)
+            obj, _ = Tag.objects.get_or_create(user=request.user, name=tag, deleting=False)
             objs.append(obj)
         return objs
 
@@ -298,3 +372,44 @@ class InterviewWriteSerializer(serializers.ModelSerializer):
             else:  # If tags list is empty, clear all tags
                 instance.tags.clear()
         return instance
+
+
+class ArchivedInterviewSerializer(InterviewReadSerializer):
+    application = ArchivedApplicationSerializer()
+
+    class Meta(InterviewReadSerializer.Meta):
+        model = ArchivedInterview
+
+
+class DeletionJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DeletionJob
+        fields = [
+            'id', 'model', 'object_id', 'status', 'total', 'processed', 'progress',
+            'error', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_progress(self, obj) -> float | None:
+        if obj.status == 'done':
+            return 1.0
+        if not obj.total:
+            return None
+        return min(obj.processed / obj.total, 1.0)
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField(help_text='An /api/ path; may contain `{{N.field}}` references.')
+    body = serializers.JSONField(required=False, default=None)
+
+
+class BatchSerializer(serializers.Serializer):
+    operations = BatchOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, value):
+        if len(value) > settings.BATCH_MAX_OPERATIONS:
+            raise serializers.ValidationError(f'At most {settings.BATCH_MAX_OPERATIONS} operations per batch.')
+        return value
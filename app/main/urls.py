@@ -3,6 +3,7 @@ from main import views
 
 urlpatterns = [
     path('tags/', views.TagListCreateView.as_view(), name='tags-list-create'),
+    path('tags/cloud/', views.TagCloudView.as_view(), name='tags-cloud'),
     path('tags/<int:id>/', views.TagUpdateDestroyView.as_view(), name='tags-update-destroy'),
     path('country/', views.CountryListCreateView.as_view(), name='country-list-create'),
     path('country/<int:id>/', views.CountryUpdateDestroy.as_view(), name='country-update-destroy'),
@@ -12,6 +13,12 @@ urlpatterns = [
     path('resume/<int:id>/', views.ResumeDetailView.as_view(), name='resume-update'),
     path('application/', views.ApplicationCreateView.as_view(), name='app-create'),
     path('application/<int:id>/', views.ApplicationDetailView.as_view(), name='app-detail'),
+    path('application/<int:id>/restore/', views.ApplicationRestoreView.as_view(), name='app-restore'),
     path('interview/', views.InterviewListCreateView.as_view(), name='interview-list-create'),
     path('interview/<int:id>/', views.InterviewDetailView.as_view(), name='interview-detail'),
+    path('deletion/<int:id>/', views.DeletionJobDetailView.as_view(), name='deletion-detail'),
+    path('sync/', views.SyncView.as_view(), name='sync'),
+    path('batch/', views.BatchView.as_view(), name='batch'),
+    path('events/', views.EventStreamView.as_view(), name='events'),
+    path('events/ticket/', views.EventTicketView.as_view(), name='events-ticket'),
 ]
\ No newline at end of file
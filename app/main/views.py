@@ -1,25 +1,131 @@
 from rest_framework.views import APIView
-from main.serializers import *
-from rest_framework import status
+from main.serializers import (
+    TagSerializer,
+    TagCloudSerializer,
+    CountrySerializer,
+    CompanySerializer,
+    ResumeReadSerializer,
+    ResumeWriteSerializer,
+    ApplicationSerializer,
+    InterviewReadSerializer,
+    InterviewWriteSerializer,
+    ArchivedApplicationSerializer,
+    ArchivedInterviewSerializer,
+    DeletionJobSerializer,
+    BatchSerializer,
+)
+from rest_framework import serializers, status
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from core.models import Tag, Country, Interview
+from core import events, sharding
+from core.archive import restore
+from core.deletion import schedule
+from core.idempotency import idempotent
+from core.models import (
+    Tag, Country, Company, Resume, Application, Interview,
+    ArchivedApplication, ArchivedInterview, DeletionJob,
+)
+from core.params import truthy
+from core.sync import Delta, format_cursor, parse_cursor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DatabaseError, router, transaction
+from django.db.models import F
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import extend_schema
+from django.urls import reverse
+from django.views import View
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+
+from main import batch
+from main.fieldsets import read_context, serialize_list, serialize_object
+from drf_spectacular.utils import OpenApiParameter, extend_schema, inline_serializer
 from rest_framework.parsers import MultiPartParser, FormParser
 
+ARCHIVE_PARAMETER = OpenApiParameter(
+    'archive', bool, description='Read archived (closed, older) rows instead of live ones.'
+)
+
+
+ASYNC_PARAMETER = OpenApiParameter(
+    'async', bool,
+    description='Hide the object now and delete it in the background (202 with a progress link).',
+)
+
+
+FIELDS_PARAMETER = OpenApiParameter(
+    'fields', str, description='Comma-separated fields to return; dotted paths select nested fields, '
+                               'e.g. `id,position,company.name`.'
+)
+EXPAND_PARAMETER = OpenApiParameter(
+    'expand', str, description='Comma-separated relations to embed instead of returning their ids; '
+                               'dotted paths expand inside an embedded object, e.g. `application.company,tags`.'
+)
+SIDELOAD_PARAMETER = OpenApiParameter(
+    'sideload', bool, description='Keep expanded relations as ids and return `{"data": ..., "included": ...}`, '
+                                  'listing each expanded object once per model and id.'
+)
+IDEMPOTENCY_PARAMETER = OpenApiParameter(
+    'Idempotency-Key', str, OpenApiParameter.HEADER,
+    description='Unique per attempted operation; retries with the same key return the first response.',
+)
+USAGE_PARAMETER = OpenApiParameter(
+    'usage', bool, description='Include how many companies, resumes, applications and interviews use each tag.'
+)
+TAG_CLOUD_LIMIT = 200
+
+
+def flag(request, name):
+    return truthy(request.query_params.get(name))
+
+
+def wants_archive(request):
+    return flag(request, 'archive')
+
+
+def wants_async_delete(request):
+    if 'async' not in request.query_params:
+        return settings.ASYNC_DELETES
+    return flag(request, 'async')
+
+
+def deletion_accepted(request, job):
+    url = request.build_absolute_uri(reverse('deletion-detail', kwargs={'id': job.id}))
+    return Response(DeletionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED,
+                    headers={'Location': url})
+
+
+def destroy(request, instance):
+    """Delete now (204), or hide and queue the cascade when asked to (202)."""
+    # The event is sent when the delete commits.
+    with transaction.atomic(using=instance._state.db):
+        events.publish(instance, 'deleted')
+        if wants_async_delete(request):
+            job = schedule(instance, request.user)
+        else:
+            instance.delete()
+            job = None
+    if job is not None:
+        return deletion_accepted(request, job)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class TagListCreateView(APIView):
     serializer_class = TagSerializer
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @extend_schema(parameters=[FIELDS_PARAMETER, USAGE_PARAMETER])
     def get(self, request):
-        tags = Tag.objects.filter(user=request.user)
-        serializer = TagSerializer(instance=tags, many=True)
-        return Response(serializer.data)
+        tags = Tag.objects.filter(user=request.user, deleting=False)
+        context = read_context(request, usage=flag(request, 'usage'))
+        return Response(serialize_list(TagSerializer, tags, context))
 
+    @extend_schema(parameters=[IDEMPOTENCY_PARAMETER])
+    @idempotent
     def post(self, request):
         serializer = TagSerializer(data=request.data, context = {'request': request})
         if serializer.is_valid():
@@ -28,23 +134,50 @@ class TagListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TagCloudView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter('limit', int, description=f'Most used tags to return (max {TAG_CLOUD_LIMIT}).'),
+            FIELDS_PARAMETER,
+        ],
+        responses=TagCloudSerializer(many=True),
+        operation_id="tags_cloud",
+    )
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 50)), TAG_CLOUD_LIMIT)
+        except ValueError:
+            return Response({'limit': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        uses = F('company_uses') + F('resume_uses') + F('application_uses') + F('interview_uses')
+        tags = list(
+            Tag.objects.filter(user=request.user, deleting=False)
+            .annotate(uses=uses).filter(uses__gt=0).order_by('-uses', 'name')[:max(limit, 0)]
+        )
+        top = tags[0].uses if tags else 0
+        context = read_context(request, top_usage=top)
+        return Response(TagCloudSerializer(tags, many=True, context=context).data)
+
+
 class TagUpdateDestroyView(APIView):
     serializer_class = TagSerializer
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def patch(self, request, id):
-        tag = get_object_or_404(Tag, id=id, user=request.user)
+        tag = get_object_or_404(Tag, id=id, user=request.user, deleting=False)
         serializer = TagSerializer(instance=tag, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(parameters=[ASYNC_PARAMETER], responses={204: None, 202: DeletionJobSerializer})
     def delete(self, request, id):
-        tag = get_object_or_404(Tag, id=id, user=request.user)
-        tag.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        tag = get_object_or_404(Tag, id=id, user=request.user, deleting=False)
+        return destroy(request, tag)
 
 
 class CountryListCreateView(APIView):
@@ -52,11 +185,13 @@ class CountryListCreateView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @extend_schema(parameters=[FIELDS_PARAMETER])
     def get(self, request):
-        countries = Country.objects.filter(user=request.user)
-        serializer = CountrySerializer(instance=countries, many=True)
-        return Response(serializer.data)
+        countries = Country.objects.filter(user=request.user, deleting=False)
+        return Response(serialize_list(CountrySerializer, countries, read_context(request)))
 
+    @extend_schema(parameters=[IDEMPOTENCY_PARAMETER])
+    @idempotent
     def post(self, request):
         serializer = CountrySerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
@@ -71,7 +206,7 @@ class CountryUpdateDestroy(APIView):
     permission_classes = [IsAuthenticated]
 
     def patch(self, request, id):
-        country = get_object_or_404(Country, id=id, user=request.user)
+        country = get_object_or_404(Country, id=id, user=request.user, deleting=False)
         serializer = CountrySerializer(instance=country, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -79,10 +214,10 @@ class CountryUpdateDestroy(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+    @extend_schema(parameters=[ASYNC_PARAMETER], responses={204: None, 202: DeletionJobSerializer})
     def delete(self, request, id):
-        country = get_object_or_404(Country, id=id, user=request.user)
-        country.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        country = get_object_or_404(Country, id=id, user=request.user, deleting=False)
+        return destroy(request, country)
 
 
 class CompanyListView(APIView):
@@ -90,11 +225,13 @@ class CompanyListView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @extend_schema(parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER, SIDELOAD_PARAMETER])
     def get(self, request):
-        companies = Company.objects.filter(user=request.user)
-        serializer = CompanySerializer(many=True, instance=companies)
-        return Response(serializer.data)
+        companies = Company.objects.filter(user=request.user, deleting=False)
+        return Response(serialize_list(CompanySerializer, companies, read_context(request)))
 
+    @extend_schema(parameters=[IDEMPOTENCY_PARAMETER])
+    @idempotent
     def post(self, request):
         serializer = CompanySerializer(data=request.data, context={'request':request})
         if serializer.is_valid():
@@ -109,24 +246,23 @@ class CompanyDetailView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
-    @extend_schema(operation_id="company_detail")
+    @extend_schema(operation_id="company_detail", parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER, SIDELOAD_PARAMETER])
     def get(self, request, id):
-        company = get_object_or_404(Company, id=id, user=request.user)
-        serializer = CompanySerializer(instance=company)
-        return Response(serializer.data)
+        companies = Company.objects.filter(user=request.user, deleting=False)
+        return Response(serialize_object(CompanySerializer, companies, read_context(request), id=id))
 
     def patch(self, request, id):
-        company = get_object_or_404(Company, id=id, user=request.user)
+        company = get_object_or_404(Company, id=id, user=request.user, deleting=False)
         serializer = CompanySerializer(instance=company, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(parameters=[ASYNC_PARAMETER], responses={204: None, 202: DeletionJobSerializer})
     def delete(self, request, id):
-        company = get_object_or_404(Company, id=id, user=request.user)
-        company.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        company = get_object_or_404(Company, id=id, user=request.user, deleting=False)
+        return destroy(request, company)
 
 
 class ResumeDetailView(APIView):
@@ -135,12 +271,12 @@ class ResumeDetailView(APIView):
 
     @extend_schema(
         responses=ResumeReadSerializer,
+        parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER, SIDELOAD_PARAMETER],
         operation_id="resume_detail"
     )
     def get(self, request, id):
-        resume = get_object_or_404(Resume, id=id, user=request.user)
-        serializer = ResumeReadSerializer(resume)
-        return Response(serializer.data)
+        resumes = Resume.objects.filter(user=request.user)
+        return Response(serialize_object(ResumeReadSerializer, resumes, read_context(request), id=id))
 
     @extend_schema(
         request=ResumeWriteSerializer,
@@ -160,17 +296,19 @@ class ResumeListView(APIView):
     parser_classes = [MultiPartParser, FormParser]
 
     @extend_schema(
-        responses=ResumeReadSerializer
+        responses=ResumeReadSerializer,
+        parameters=[FIELDS_PARAMETER, EXPAND_PARAMETER, SIDELOAD_PARAMETER]
     )
     def get(self, request):
         resumes = Resume.objects.filter(user=request.user)
-        serializer = ResumeReadSerializer(resumes, many=True)
-        return Response(serializer.data)
+        return Response(serialize_list(ResumeReadSerializer, resumes, read_context(request)))
 
     @extend_schema(
+        parameters=[IDEMPOTENCY_PARAMETER],
         request=ResumeWriteSerializer,
         responses=ResumeReadSerializer
     )
+    @idempotent
     def post(self, request):
         serializer = ResumeWriteSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
@@ -184,13 +322,17 @@ class ApplicationDetailView(APIView):
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @extend_schema(parameters=[ARCHIVE_PARAMETER, FIELDS_PARAMETER, EXPAND_PARAMETER, SIDELOAD_PARAMETER])
     def get(self, request, id):
-        instance = get_object_or_404(Application, id=id, user=request.user)
-        serializer = ApplicationSerializer(instance)
-        return Response(serializer.data)
+        if wants_archive(request):
+            model, serializer_class = ArchivedApplication, ArchivedApplicationSerializer
+        else:
+            model, serializer_class = Application, ApplicationSerializer
+        applications = model.objects.filter(user=request.user, company__deleting=False)
+        return Response(serialize_object(serializer_class, applications, read_context(request), id=id))
 
     def patch(self, request, id):
-        instance = get_object_or_404(Application, id=id, user=request.user)
+        instance = get_object_or_404(Application, id=id, user=request.user, company__deleting=False)
         serializer = ApplicationSerializer(data=request.data, instance=instance, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -198,11 +340,36 @@ class ApplicationDetailView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ApplicationRestoreView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[IDEMPOTENCY_PARAMETER],
+        request=None,
+        responses=ApplicationSerializer,
+        operation_id="application_restore"
+    )
+    @idempotent
+    def post(self, request, id):
+        archived = get_object_or_404(ArchivedApplication, id=id, user=request.user, company__deleting=False)
+        restored, _ = restore(ArchivedApplication.objects.filter(id=id), using=archived._state.db)
+        if not restored:
+            # restore() skips rows locked by a concurrent archive or restore.
+            return Response({'detail': 'This application is being moved by another request, retry shortly.'},
+                            status=status.HTTP_409_CONFLICT)
+        instance = Application.objects.using(archived._state.db).get(id=id)
+        events.publish(instance, 'changed')
+        return Response(ApplicationSerializer(instance).data)
+
+
 class ApplicationCreateView(APIView):
     serializer_class = ApplicationSerializer
     authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
 
+    @extend_schema(parameters=[IDEMPOTENCY_PARAMETER])
+    @idempotent
     def post(self, request):
         serializer = ApplicationSerializer(data=request.data, context={'request':request})
         if serializer.is_valid():
@@ -217,18 +384,24 @@ class InterviewListCreateView(APIView):
 
     @extend_schema(
         responses=InterviewReadSerializer(many=True),
+        parameters=[ARCHIVE_PARAMETER, FIELDS_PARAMETER, EXPAND_PARAMETER, SIDELOAD_PARAMETER],
         operation_id="interview_list"
     )
     def get(self, request):
-        interviews = Interview.objects.filter(user=request.user)
-        serializer = InterviewReadSerializer(interviews, many=True)
-        return Response(serializer.data)
+        if wants_archive(request):
+            model, serializer_class = ArchivedInterview, ArchivedInterviewSerializer
+        else:
+            model, serializer_class = Interview, InterviewReadSerializer
+        interviews = model.objects.filter(user=request.user, application__company__deleting=False)
+        return Response(serialize_list(serializer_class, interviews, read_context(request)))
 
     @extend_schema(
+        parameters=[IDEMPOTENCY_PARAMETER],
         request=InterviewWriteSerializer,
         responses=InterviewReadSerializer,
         operation_id="interview_create"
     )
+    @idempotent
     def post(self, request):
         serializer = InterviewWriteSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
@@ -243,12 +416,16 @@ class InterviewDetailView(APIView):
 
     @extend_schema(
         responses=InterviewReadSerializer,
+        parameters=[ARCHIVE_PARAMETER, FIELDS_PARAMETER, EXPAND_PARAMETER, SIDELOAD_PARAMETER],
         operation_id="interview_detail"
     )
     def get(self, request, id):
-        interview = get_object_or_404(Interview, id=id, user=request.user)
-        serializer = InterviewReadSerializer(interview)
-        return Response(serializer.data)
+        if wants_archive(request):
+            model, serializer_class = ArchivedInterview, ArchivedInterviewSerializer
+        else:
+            model, serializer_class = Interview, InterviewReadSerializer
+        interviews = model.objects.filter(user=request.user, application__company__deleting=False)
+        return Response(serialize_object(serializer_class, interviews, read_context(request), id=id))
 
     @extend_schema(
         request=InterviewWriteSerializer,
@@ -256,7 +433,7 @@ class InterviewDetailView(APIView):
         operation_id="interview_update"
     )
     def patch(self, request, id):
-        interview = get_object_or_404(Interview, id=id, user=request.user)
+        interview = get_object_or_404(Interview, id=id, user=request.user, application__company__deleting=False)
         serializer = InterviewWriteSerializer(instance=interview, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             interview = serializer.save()
@@ -267,6 +444,164 @@ class InterviewDetailView(APIView):
         operation_id="interview_delete"
     )
     def delete(self, request, id):
-        interview = get_object_or_404(Interview, id=id, user=request.user)
-        interview.delete()
+        interview = get_object_or_404(Interview, id=id, user=request.user, application__company__deleting=False)
+        with transaction.atomic(using=interview._state.db):
+            events.publish(interview, 'deleted')
+            interview.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class DeletionJobDetailView(APIView):
+    serializer_class = DeletionJobSerializer
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, id):
+        job = get_object_or_404(DeletionJob, id=id, user_id=request.user.id)
+        return Response(DeletionJobSerializer(job).data)
+
+
+SYNC_SERIALIZERS = {
+    Tag: TagSerializer,
+    Country: CountrySerializer,
+    Company: CompanySerializer,
+    Resume: ResumeReadSerializer,
+    Application: ApplicationSerializer,
+    Interview: InterviewReadSerializer,
+}
+
+
+class SyncView(APIView):
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        parameters=[OpenApiParameter(
+            'since', str, description='`cursor` of the previous sync; omit for a full snapshot.',
+        )],
+        responses=inline_serializer('Sync', fields={
+            'cursor': serializers.CharField(),
+            'reset': serializers.BooleanField(),
+            'changes': serializers.DictField(child=serializers.ListField(child=serializers.DictField())),
+            'deleted': serializers.DictField(child=serializers.ListField(child=serializers.IntegerField())),
+        }),
+        operation_id="sync",
+    )
+    def get(self, request):
+        since = request.query_params.get('since')
+        try:
+            since = parse_cursor(since) if since else None
+        except ValueError:
+            return Response({'since': ['Not a cursor returned by this endpoint.']},
+                            status=status.HTTP_400_BAD_REQUEST)
+        # Read on the primary: a lagging replica could miss rows older than the cursor.
+        with transaction.atomic():
+            delta = Delta(request.user, since)
+            context = {'request': request, 'fields': {}, 'expand': {}}
+            changes = {
+                model._meta.model_name: serialize_list(serializer_class, delta.changed(model), context)
+                for model, serializer_class in SYNC_SERIALIZERS.items()
+            }
+            deleted = delta.deleted()
+        return Response({
+            'cursor': format_cursor(delta.cursor),
+            'reset': delta.reset,
+            'changes': changes,
+            'deleted': deleted,
+        })
+
+
+class BatchView(APIView):
+    """Run several operations in one request and one transaction (see main.batch)."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    batchable = False
+
+    @extend_schema(
+        parameters=[IDEMPOTENCY_PARAMETER],
+        request=BatchSerializer,
+        responses=inline_serializer('Batch', fields={
+            'results': serializers.ListField(child=inline_serializer('BatchResult', fields={
+                'status': serializers.IntegerField(),
+                'body': serializers.JSONField(),
+            })),
+        }),
+        operation_id="batch",
+    )
+    @idempotent
+    def post(self, request):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        using = router.db_for_write(Application)
+        with transaction.atomic(using=using):
+            results = batch.run(request, serializer.validated_data['operations'])
+            code = results[-1]['status']
+            if code >= 400:
+                # Undo the operations before it; the failed one's status is the batch's.
+                transaction.set_rollback(True, using=using)
+                return Response({'results': results}, status=code)
+        return Response({'results': results})
+
+
+def stream_user(request):
+    """The user of the Authorization header's token, or of a `?ticket=` (for EventSource)."""
+    auth = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(auth) == 2 and auth[0].lower() == 'token':
+        # ShardRoutingMiddleware has made the token's shard current.
+        try:
+            return TokenAuthentication().authenticate_credentials(auth[1])[0]
+        except AuthenticationFailed:
+            return None
+    redeemed = events.redeem(request.GET.get('ticket', ''))
+    if redeemed is None:
+        return None
+    user_id, shard = redeemed
+    with sharding.use_shard(shard):
+        return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+class EventTicketView(APIView):
+    """A short-lived `?ticket=` for /api/events/, so the token stays out of URLs and access logs."""
+    authentication_classes = [TokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    batchable = False
+
+    @extend_schema(
+        request=None,
+        responses=inline_serializer('EventTicket', fields={
+            'ticket': serializers.CharField(),
+            'expires_in': serializers.IntegerField(),
+        }),
+        operation_id="events_ticket",
+    )
+    def post(self, request):
+        return Response({
+            'ticket': events.ticket(request.user.pk, sharding.current_shard.get()),
+            'expires_in': settings.EVENTS_TICKET_SECONDS,
+        })
+
+
+class EventStreamView(View):
+    """Server-sent `changed`/`deleted` events for the token's user (see core.events)."""
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            # Under WSGI the endless stream would be consumed before anything is sent.
+            return JsonResponse({'detail': 'Live updates need the ASGI server (app.asgi).'},
+                                status=status.HTTP_501_NOT_IMPLEMENTED)
+        user = await sync_to_async(stream_user)(request)
+        if user is None:
+            return JsonResponse({'detail': 'Invalid or missing token.'}, status=status.HTTP_401_UNAUTHORIZED)
+        hub = events.hub()
+        try:
+            queue = await hub.subscribe(user.pk)
+        except DatabaseError:
+            response = JsonResponse({'detail': 'Live updates are unavailable, retry shortly.'},
+                                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = '5'
+            return response
+        response = StreamingHttpResponse(events.stream(hub, user.pk, queue), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Keep nginx from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response